@@ -0,0 +1,615 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Microbenchmarks of the RPC hot path, compared against a stored baseline.
+
+Run with ``python -m benchmarks.suite``.  Each case is timed as the best
+per-operation time of several runs:
+
+* ``request_model/*``: validated construction of each request type, and
+  ``request_construct/*`` the same without validation.
+* ``codec/*``: encoding and decoding each request, pickled or as the
+  compact envelope.
+* ``legacy_conversion/*``: ``ZMQServer._convert_legacy_message`` for each
+  legacy tuple format.
+* ``config/*``: getting a usable ``CompilerConfig`` from a legacy JSON
+  config, parsed or memoized, an inline config or a ``ConfigRef`` preset.
+* ``serialize_response/*``: encoding ``Results`` replies of 10 to 400,000
+  entries (about 11 MB) as the server does, against pickling
+  ``model_dump()``.
+* ``pickle/*``: pickling and unpickling requests and replies.
+* ``packed_results/*``: packing 100,000-shot readouts and counts, and
+  encoding and decoding replies with legacy or packed results.
+* ``metrics/*``: ``MetricExporter`` overhead, immediate and batched.
+* ``request_log/*``: logging a request as an eager f-string or through
+  ``RequestLogger`` at several sample rates.
+* ``round_trip/*``: ``ZMQClient`` to ``ZMQServer`` over loopback, the
+  server running QAT's echo pipelines (no ``QAT_CONFIG_PATH``).
+
+Cases returning encoded data also record its size in ``payload_bytes``,
+and cases in ``MEMORY_GROUPS`` record the peak memory ``tracemalloc`` sees
+while they run once.  ``SIZE_RATIOS`` compare the payloads of two cases,
+such as packed against legacy results; sizes do not vary between runs, so a
+ratio above its baseline by more than ``SIZE_TOLERANCE`` fails the run.
+
+Times are recorded relative to ``calibration``, a fixed pure-Python loop,
+so that a baseline recorded on one machine holds on another of a different
+speed.  Results are compared with ``benchmarks/baseline.json`` and the run
+fails if any case is slower, or peaks at more memory, than its baseline by
+more than ``--tolerance``.  ``--update-baseline`` records this run as the
+new baseline.
+"""
+
+import argparse
+import io
+import json
+import logging
+import pickle
+import platform
+import random
+import socket
+import sys
+import threading
+import timeit
+import tracemalloc
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Any, NamedTuple
+from unittest.mock import patch
+
+from compiler_config.config import CompilerConfig
+from qat.core.metrics_base import MetricsManager
+
+from qat_rpc.config_presets import ConfigPresets, config_from_json
+from qat_rpc.metrics import MetricExporter, NullReceiverBackend, PrometheusReceiver
+from qat_rpc.models import (
+    CompilePipelinesRequest,
+    CompileRequest,
+    ConfigRef,
+    CouplingsRequest,
+    ExecutePipelinesRequest,
+    ExecuteRequest,
+    HelloRequest,
+    PackageRef,
+    ProfileRequest,
+    ProgramRequest,
+    QpuInfoRequest,
+    QubitInfoRequest,
+    RegisterConfigRequest,
+    ReloadHardwareRequest,
+    Results,
+    UploadPackageRequest,
+    VersionRequest,
+    pack_results,
+    unpack_results,
+)
+from qat_rpc.request_log import RequestLogger
+from qat_rpc.zmq._base import loads
+from qat_rpc.zmq.client import ZMQClient
+from qat_rpc.zmq.server import ZMQServer
+from qat_rpc.zmq.wire import decode_request, encode_request
+
+BASELINE = Path(__file__).parent / "baseline.json"
+DEFAULT_TOLERANCE = 0.5
+REPEAT = 5
+CONFIRM_RUNS = 3
+RESULT_ENTRIES = (10, 1_000, 100_000)
+# About 28 bytes of pickle per entry, so a reply of about 11 MB
+LARGE_RESULT_ENTRIES = 400_000
+MEMORY_GROUPS = ("serialize_response/", "packed_results/")
+SIZE_RATIOS = {
+    f"packed_results/{kind}": (
+        f"packed_results/encode_packed_{kind}",
+        f"packed_results/encode_legacy_{kind}",
+    )
+    for kind in ("readouts", "counts")
+}
+SIZE_TOLERANCE = 0.01
+CALIBRATION = "calibration"
+SHOTS = 100_000
+QUBITS = 16
+PROGRAM_SIZES = (1_000, 1_000_000)
+SAMPLE_RATES = (1.0, 0.1, 0.0)
+
+QASM2_PROGRAM = """
+OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[2];
+h q;
+creg c[2];
+measure q->c;
+"""
+
+Case = Callable[[], object]
+
+
+class Measurements(NamedTuple):
+    """One run's best times in seconds, payload sizes and peak memory in bytes."""
+
+    seconds: dict[str, float]
+    payload_bytes: dict[str, int]
+    peak_memory: dict[str, int]
+
+
+def _config() -> CompilerConfig:
+    config = CompilerConfig()
+    config.results_format.binary_count()
+    config.repeats = 100
+    return config
+
+
+def _results(entries: int) -> Results:
+    counts = {format(i, "024b"): i for i in range(entries)}
+    return Results(results={"c": counts}, execution_metrics=MetricsManager())
+
+
+def _calibration() -> int:
+    return sum(i * i for i in range(1_000))
+
+
+def _request_fields(config: CompilerConfig) -> list[tuple[type, dict[str, Any]]]:
+    return [
+        (ProgramRequest, {"program": QASM2_PROGRAM, "config": config}),
+        (CompileRequest, {"program": QASM2_PROGRAM, "config": ConfigRef(name="default")}),
+        (ExecuteRequest, {"package": PackageRef(digest="0" * 64), "config": config}),
+        (VersionRequest, {}),
+        (CouplingsRequest, {"pipeline": None}),
+        (QubitInfoRequest, {"pipeline": None}),
+        (QpuInfoRequest, {"pipeline": None}),
+        (CompilePipelinesRequest, {}),
+        (ExecutePipelinesRequest, {}),
+        (ReloadHardwareRequest, {}),
+        (ProfileRequest, {"action": "start", "kind": "cpu"}),
+        (UploadPackageRequest, {"package": "{}"}),
+        (RegisterConfigRequest, {"config": config}),
+        (HelloRequest, {"protocol_version": 1, "codecs": ("compact", "pickle")}),
+    ]
+
+
+def _request_models(config: CompilerConfig, validate: bool) -> dict[str, Case]:
+    group = "request_model" if validate else "request_construct"
+    cases: dict[str, Case] = {}
+    for request_type, values in _request_fields(config):
+        build = request_type if validate else request_type.model_construct
+        cases[f"{group}/{request_type.__name__}"] = lambda build=build, values=values: (
+            build(**values)
+        )
+    return cases
+
+
+def _codecs(config: CompilerConfig) -> dict[str, Case]:
+    cases: dict[str, Case] = {}
+    for request_type, values in _request_fields(config):
+        request = request_type(**values)
+        name = request_type.__name__
+        cases[f"codec/pickle_{name}"] = lambda request=request: loads(pickle.dumps(request))
+        if request_type is not HelloRequest:
+            cases[f"codec/compact_{name}"] = lambda request=request: decode_request(
+                encode_request(request)
+            )
+    return cases
+
+
+def _legacy_conversions(config: CompilerConfig) -> dict[str, Case]:
+    config_json = config.to_json()
+    messages = {
+        "program_pre_0.3": (QASM2_PROGRAM, config_json),
+        "program": ("program", QASM2_PROGRAM, config_json),
+        "program_pipelines": ("program", QASM2_PROGRAM, config_json, "", ""),
+        "version": ("version",),
+        "couplings": ("couplings",),
+    }
+    convert = ZMQServer._convert_legacy_message
+    return {
+        f"legacy_conversion/{name}": lambda raw=raw: convert(raw)
+        for name, raw in messages.items()
+    }
+
+
+def _configs(config: CompilerConfig) -> dict[str, Case]:
+    text = config.to_json()
+    presets = ConfigPresets()
+    ref = presets.register(config)
+    inline = pickle.dumps(ProgramRequest(program=QASM2_PROGRAM, config=config))
+    by_ref = pickle.dumps(ProgramRequest(program=QASM2_PROGRAM, config=ref))
+
+    def _inline() -> object:
+        request = loads(inline)
+        return request.config, presets.fingerprint(request.config)
+
+    def _preset() -> object:
+        request = loads(by_ref)
+        return presets.resolve(request.config), presets.fingerprint(request.config)
+
+    return {
+        "config/legacy_json_parsed": lambda: CompilerConfig.create_from_json(text),
+        "config/legacy_json_memoized": lambda: config_from_json(text),
+        "config/inline": _inline,
+        "config/preset": _preset,
+    }
+
+
+def _serialization() -> dict[str, Case]:
+    cases: dict[str, Case] = {}
+    for entries in (*RESULT_ENTRIES, LARGE_RESULT_ENTRIES):
+        response = _results(entries)
+
+        def copy_free(response: Results = response) -> list[Any]:
+            return ZMQServer._encode_reply(ZMQServer._serialize_response(response))
+
+        def model_dump(response: Results = response) -> list[Any]:
+            # Without diagnostics, which the server leaves out when there are none
+            reply = response.model_dump(exclude={"diagnostics"})
+            return [pickle.dumps(reply, protocol=pickle.DEFAULT_PROTOCOL)]
+
+        if loads(copy_free()[0]) != loads(model_dump()[0]):
+            raise SystemExit(f"Replies of {entries} entries differ between encodings.")
+        cases[f"serialize_response/{entries}"] = copy_free
+        cases[f"serialize_response/model_dump_{entries}"] = model_dump
+    return cases
+
+
+def _pickling(config: CompilerConfig) -> dict[str, Case]:
+    request = ProgramRequest(program=QASM2_PROGRAM, config=config)
+    payloads: dict[str, Any] = {"ProgramRequest": request}
+    for entries in RESULT_ENTRIES:
+        payloads[f"reply_{entries}"] = ZMQServer._serialize_response(_results(entries))
+
+    cases: dict[str, Case] = {}
+    for name, payload in payloads.items():
+        pickled = pickle.dumps(payload)
+        cases[f"pickle/dumps_{name}"] = lambda payload=payload: pickle.dumps(payload)
+        cases[f"pickle/loads_{name}"] = lambda data=pickled: loads(data)
+    return cases
+
+
+def _packed_results() -> dict[str, Case]:
+    rng = random.Random(0)  # noqa: S311  # nosec B311
+    readouts = {"c": [[rng.getrandbits(1) for _ in range(QUBITS)] for _ in range(SHOTS)]}
+    shots = (format(rng.getrandbits(QUBITS), f"0{QUBITS}b") for _ in range(SHOTS))
+    counts = {"c": dict(Counter(shots))}
+
+    cases: dict[str, Case] = {}
+    for name, results in (("readouts", readouts), ("counts", counts)):
+        packed = pack_results(results)
+        if unpack_results(packed) != results:
+            raise SystemExit(f"Unpacked {name} differ from the legacy results.")
+        cases[f"packed_results/pack_{name}"] = lambda results=results: pack_results(results)
+        cases[f"packed_results/unpack_{name}"] = lambda packed=packed: unpack_results(
+            packed
+        )
+        for label, reply in (("legacy", results), ("packed", packed)):
+            reply = {"results": reply}
+            frames = ZMQServer._encode_reply(reply)
+            cases[f"packed_results/encode_{label}_{name}"] = lambda reply=reply: (
+                ZMQServer._encode_reply(reply)
+            )
+            cases[f"packed_results/decode_{label}_{name}"] = lambda frames=frames: loads(
+                frames[0], frames[1:]
+            )
+    return cases
+
+
+def _metrics() -> dict[str, Case]:
+    def increment(exporter: MetricExporter) -> None:
+        with exporter.executed_messages() as executed:
+            executed.increment()
+
+    immediate = MetricExporter(NullReceiverBackend())
+
+    def timing() -> None:
+        with immediate.compile_stage_duration():
+            pass
+
+    # Port 0: the scrape endpoint binds an ephemeral port nobody scrapes
+    backends = (("", NullReceiverBackend()), ("prometheus_", PrometheusReceiver(0)))
+    cases: dict[str, Case] = {"metrics/timing": timing}
+    for prefix, backend in backends:
+        for suffix, batched in (("", False), ("_batched", True)):
+            exporter = MetricExporter(backend, batched=batched)
+            cases[f"metrics/{prefix}increment{suffix}"] = lambda exporter=exporter: (
+                increment(exporter)
+            )
+    return cases
+
+
+def _request_logging(stack: ExitStack, config: CompilerConfig) -> dict[str, Case]:
+    logger = logging.getLogger("benchmarks.request_log")
+    # Formatting cost only, not terminal I/O
+    logger.handlers = [logging.StreamHandler(io.StringIO())]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    stack.enter_context(patch("qat_rpc.request_log.log", logger))
+    stack.enter_context(patch("qat_rpc.request_log._info_enabled", lambda: True))
+
+    def structured(request_logger: RequestLogger, request: ProgramRequest) -> None:
+        record = request_logger.start(request)
+        if record is not None:
+            record.finish()
+
+    cases: dict[str, Case] = {}
+    for size in PROGRAM_SIZES:
+        request = ProgramRequest(program="x" * size, config=config)
+        cases[f"request_log/eager_{size}"] = lambda request=request: logger.info(
+            f"Handling request: {type(request).__name__}, {request}"
+        )
+        for rate in SAMPLE_RATES:
+            request_logger = RequestLogger(sample_rate=rate)
+            cases[f"request_log/sampled_{rate:.0%}_{size}"] = (
+                lambda request_logger=request_logger, request=request: structured(
+                    request_logger, request
+                )
+            )
+    return cases
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@contextmanager
+def _echo_client() -> Iterator[ZMQClient]:
+    """A client connected to an echo-mode server running in a thread."""
+    port = _free_port()
+    server = ZMQServer(MetricExporter(NullReceiverBackend()), server_port=port)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    client = ZMQClient(client_port=port)
+    try:
+        yield client
+    finally:
+        client.close()
+        server.stop()
+        thread.join(timeout=5)
+        server.close()
+
+
+def _round_trips(stack: ExitStack, config: CompilerConfig) -> dict[str, Case]:
+    client = stack.enter_context(_echo_client())
+    return {
+        "round_trip/version": client.api_version,
+        "round_trip/program": lambda: client.execute_task(QASM2_PROGRAM, config),
+    }
+
+
+def _time(case: Case) -> float:
+    """Best per-operation time in seconds."""
+    timer = timeit.Timer(case)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=REPEAT, number=number)) / number
+
+
+def _payload_bytes(output: object) -> int | None:
+    """Size of *output* if it is encoded data: a buffer or a list of frames."""
+    frames = output if isinstance(output, list | tuple) else [output]
+    size = 0
+    for frame in frames:
+        if not isinstance(frame, bytes | bytearray | memoryview | pickle.PickleBuffer):
+            return None
+        size += memoryview(frame).nbytes
+    return size if frames else None
+
+
+def _peak_memory(case: Case) -> int:
+    """Peak bytes allocated while running *case* once."""
+    tracemalloc.start()
+    try:
+        case()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run(
+    prefixes: tuple[str, ...] = ("",), limits: dict[str, float] | None = None
+) -> Measurements:
+    """Measure ``calibration`` and every case whose name starts with one of *prefixes*.
+
+    A case slower than its entry in *limits*, in multiples of
+    ``calibration``, is timed again, up to ``CONFIRM_RUNS`` times, keeping
+    its best time, so that one noisy run does not read as a regression.
+    """
+    limits = limits or {}
+    config = _config()
+    with ExitStack() as stack:
+        # Groups are only built when selected, so filtered runs skip the server
+        groups: dict[str, Callable[[], dict[str, Case]]] = {
+            CALIBRATION: lambda: {CALIBRATION: _calibration},
+            "request_model/": lambda: _request_models(config, validate=True),
+            "request_construct/": lambda: _request_models(config, validate=False),
+            "codec/": lambda: _codecs(config),
+            "legacy_conversion/": lambda: _legacy_conversions(config),
+            "config/": lambda: _configs(config),
+            "serialize_response/": _serialization,
+            "pickle/": lambda: _pickling(config),
+            "packed_results/": _packed_results,
+            "metrics/": _metrics,
+            "request_log/": lambda: _request_logging(stack, config),
+            "round_trip/": lambda: _round_trips(stack, config),
+        }
+        measured = Measurements({}, {}, {})
+        results = measured.seconds
+        for group, build in groups.items():
+            if group != CALIBRATION and not any(
+                group.startswith(p) or p.startswith(group) for p in prefixes
+            ):
+                continue
+            for name, case in build().items():
+                if name != CALIBRATION and not name.startswith(prefixes):
+                    continue
+                seconds = _time(case)
+                limit = limits.get(name, float("inf")) * results.get(CALIBRATION, 1.0)
+                for _ in range(CONFIRM_RUNS):
+                    if seconds <= limit:
+                        break
+                    seconds = min(seconds, _time(case))
+                results[name] = seconds
+                size = _payload_bytes(case())
+                if size is not None:
+                    measured.payload_bytes[name] = size
+                if name.startswith(MEMORY_GROUPS):
+                    measured.peak_memory[name] = _peak_memory(case)
+        return measured
+
+
+def _environment() -> dict[str, str]:
+    return {"python": platform.python_version(), "machine": platform.machine()}
+
+
+def _load(path: Path) -> dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _document(measured: Measurements) -> dict[str, Any]:
+    """*measured* as saved, with times in multiples of ``calibration``."""
+    calibration = measured.seconds[CALIBRATION]
+    return {
+        **_environment(),
+        "calibration": calibration,
+        "results": {
+            name: seconds / calibration for name, seconds in measured.seconds.items()
+        },
+        "payload_bytes": measured.payload_bytes,
+        "peak_memory": measured.peak_memory,
+        "size_ratios": _size_ratios(measured.payload_bytes),
+    }
+
+
+def _size_ratios(payload_bytes: dict[str, int]) -> dict[str, float]:
+    """Each of ``SIZE_RATIOS`` whose two cases were both measured."""
+    return {
+        name: payload_bytes[case] / payload_bytes[reference]
+        for name, (case, reference) in SIZE_RATIOS.items()
+        if case in payload_bytes and reference in payload_bytes
+    }
+
+
+def _save(path: Path, document: dict[str, Any]) -> None:
+    path.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def _format_bytes(size: int | None) -> str:
+    if size is None:
+        return "-"
+    for unit, scale in (("MB", 1e6), ("kB", 1e3)):
+        if size >= scale:
+            return f"{size / scale:.2f}{unit}"
+    return f"{size}B"
+
+
+def compare(
+    measured: Measurements, baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Print each case against *baseline*; return the cases that regressed.
+
+    Baseline times are in multiples of ``calibration``, and are scaled by
+    this run's calibration time for display.
+    """
+    calibration = measured.seconds[CALIBRATION]
+    peaks = baseline.get("peak_memory", {})
+    regressions = []
+    print(
+        f"{'case':<44}{'time':>12}{'baseline':>12}{'ratio':>8}{'payload':>11}{'peak':>11}"
+    )
+    for name, seconds in measured.seconds.items():
+        if name == CALIBRATION:
+            continue
+        sizes = "".join(
+            f"{_format_bytes(size):>11}"
+            for size in (measured.payload_bytes.get(name), measured.peak_memory.get(name))
+        )
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<44}{seconds * 1e6:>10.2f}us{'new':>12}{'':>8}{sizes}")
+            continue
+        before *= calibration
+        ratio = seconds / before
+        flags = []
+        if ratio > 1 + tolerance:
+            flags.append("SLOWER")
+        peak, peak_before = measured.peak_memory.get(name), peaks.get(name)
+        if peak is not None and peak_before and peak > peak_before * (1 + tolerance):
+            flags.append("MORE MEMORY")
+        if flags:
+            regressions.append(name)
+        print(
+            f"{name:<44}{seconds * 1e6:>10.2f}us{before * 1e6:>10.2f}us{ratio:>7.2f}x"
+            f"{sizes}{''.join(f'  {flag}' for flag in flags)}"
+        )
+
+    ratios = _size_ratios(measured.payload_bytes)
+    if ratios:
+        print(f"\n{'size ratio':<44}{'ratio':>12}{'baseline':>12}")
+    for name, ratio in ratios.items():
+        before = baseline.get("size_ratios", {}).get(name)
+        if before is None:
+            print(f"{name:<44}{ratio:>12.4f}{'new':>12}")
+            continue
+        larger = ratio > before * (1 + SIZE_TOLERANCE)
+        if larger:
+            regressions.append(name)
+        print(f"{name:<44}{ratio:>12.4f}{before:>12.4f}{'  LARGER' if larger else ''}")
+    return regressions
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the RPC hot path against a stored baseline."
+    )
+    parser.add_argument("--output", type=Path, help="Write this run's results as JSON.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=(
+            "Fail when a case is slower, or peaks at more memory, than baseline "
+            "by more than this fraction."
+        ),
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Record this run as the baseline."
+    )
+    parser.add_argument(
+        "-k", dest="prefixes", action="append", help="Only run cases with this prefix."
+    )
+    args = parser.parse_args(argv)
+
+    prefixes = tuple(args.prefixes or ("",))
+    if args.update_baseline:
+        measured = run(prefixes)
+        document = _document(measured)
+        if args.output is not None:
+            _save(args.output, document)
+        # Cases left out with -k keep their recorded measurements
+        recorded = _load(args.baseline) if args.baseline.exists() else {}
+        for key in ("results", "payload_bytes", "peak_memory", "size_ratios"):
+            document[key] = {**recorded.get(key, {}), **document[key]}
+        _save(args.baseline, document)
+        print(f"Recorded {len(measured.seconds) - 1} cases in {args.baseline}")
+        return
+
+    baseline = _load(args.baseline)
+    limits = {
+        name: relative * (1 + args.tolerance)
+        for name, relative in baseline["results"].items()
+    }
+    measured = run(prefixes, limits)
+    if args.output is not None:
+        _save(args.output, _document(measured))
+    if baseline.get("python") != platform.python_version():
+        print(f"Baseline recorded on Python {baseline.get('python')}", file=sys.stderr)
+    regressions = compare(measured, baseline, args.tolerance)
+    if regressions:
+        raise SystemExit(
+            f"{len(regressions)} case(s) slower, larger in memory or larger on the "
+            f"wire than baseline allows: {', '.join(regressions)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
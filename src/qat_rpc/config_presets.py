@@ -0,0 +1,160 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Named ``CompilerConfig`` presets and memoized config parsing.
+
+Every program request carries a full ``CompilerConfig``, which is pickled,
+sent and validated each time, and legacy clients send it as JSON that the
+server parses per message.  Clients that reuse a handful of configs can
+instead reference a server-side preset by ``ConfigRef``: operators define
+named presets in a JSON file (``CONFIG_PRESETS_PATH``) and clients register
+their own with ``RegisterConfigRequest``.  Referencing a preset the server
+does not hold raises ``ConfigNotFoundError`` so the client can register it
+again.
+
+QAT updates configs while compiling and executing, so presets and parsed
+configs are cached in pickled form and every lookup returns a private copy;
+unpickling is roughly twice as fast as parsing the JSON again.
+"""
+
+import functools
+import hashlib
+import json
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from compiler_config.config import CompilerConfig
+
+from qat_rpc.models import ConfigRef
+
+DEFAULT_MAX_CONFIG_PRESETS = 1024
+
+_PARSED_CONFIGS_CACHE_SIZE = 256
+
+
+class ConfigNotFoundError(KeyError):
+    """A ``ConfigRef`` names a preset the server does not (or no longer) hold."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.name = name
+
+    def __str__(self) -> str:
+        return f"Config preset {self.name!r} not found; register it again."
+
+
+@functools.lru_cache(maxsize=_PARSED_CONFIGS_CACHE_SIZE)
+def _parse(text: str) -> tuple[CompilerConfig, bytes]:
+    config = CompilerConfig.create_from_json(text)
+    return config, pickle.dumps(config, protocol=pickle.DEFAULT_PROTOCOL)
+
+
+def _copy(data: bytes) -> CompilerConfig:
+    # Only ever unpickles configs this process pickled itself
+    return pickle.loads(data)  # noqa: S301  # nosec B301
+
+
+def config_from_json(text: str, shared: bool = False) -> CompilerConfig:
+    """Parse a ``CompilerConfig`` from JSON, memoized by the JSON text.
+
+    Each call returns a fresh copy, since QAT modifies configs it is given.
+    With *shared*, the cached instance itself is returned instead; only use
+    this when the config is serialized or read, never passed to QAT.
+    """
+    config, data = _parse(text)
+    return config if shared else _copy(data)
+
+
+class ConfigPresets:
+    """Registry of ``CompilerConfig`` presets referenced by ``ConfigRef``.
+
+    Operator presets added with ``add`` (or ``load``) are kept for the life of
+    the server.  Presets registered by clients are evicted least-recently-used
+    once there are more than *max_presets* of them.  Safe to use from
+    multiple threads.
+    """
+
+    def __init__(self, max_presets: int = DEFAULT_MAX_CONFIG_PRESETS):
+        if max_presets < 1:
+            raise ValueError(f"max_presets must be at least 1, got {max_presets}.")
+        self._max_presets = max_presets
+        self._lock = threading.Lock()
+        self._operator: dict[str, tuple[bytes, str]] = {}
+        self._registered: OrderedDict[str, tuple[bytes, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._operator) + len(self._registered)
+
+    @staticmethod
+    def _entry(config: CompilerConfig) -> tuple[bytes, str]:
+        """Pickled form and JSON text of *config*."""
+        return pickle.dumps(config, protocol=pickle.DEFAULT_PROTOCOL), config.to_json()
+
+    def add(self, name: str, config: CompilerConfig) -> ConfigRef:
+        """Define the operator preset *name*, replacing any previous one."""
+        entry = self._entry(config)
+        with self._lock:
+            self._operator[name] = entry
+            self._registered.pop(name, None)
+        return ConfigRef(name=name)
+
+    def load(self, path: Path) -> None:
+        """Add operator presets from a JSON file mapping names to configs.
+
+        Each config is either a ``CompilerConfig.to_json()`` object or that
+        object serialized to a string.
+        """
+        presets = json.loads(path.read_text())
+        if not isinstance(presets, dict):
+            raise TypeError(f"Config presets file {path} must contain a JSON object.")
+        for name, config in presets.items():
+            text = config if isinstance(config, str) else json.dumps(config)
+            self.add(name, CompilerConfig.create_from_json(text))
+
+    def register(self, config: CompilerConfig, name: str | None = None) -> ConfigRef:
+        """Store a client's *config*, named by its content hash unless *name* is given."""
+        entry = self._entry(config)
+        name = name or hashlib.sha256(entry[1].encode()).hexdigest()
+        with self._lock:
+            if name in self._operator:
+                raise ValueError(f"Config preset {name!r} is defined by the server.")
+            self._registered[name] = entry
+            self._registered.move_to_end(name)
+            while len(self._registered) > self._max_presets:
+                self._registered.popitem(last=False)
+        return ConfigRef(name=name)
+
+    def _lookup(self, name: str) -> tuple[bytes, str]:
+        with self._lock:
+            entry = self._operator.get(name)
+            if entry is not None:
+                return entry
+            try:
+                entry = self._registered[name]
+            except KeyError:
+                raise ConfigNotFoundError(name) from None
+            self._registered.move_to_end(name)
+        return entry
+
+    def get(self, name: str) -> CompilerConfig:
+        """A private copy of the preset *name*, marking it recently used."""
+        data, _ = self._lookup(name)
+        return _copy(data)
+
+    def resolve(self, config: CompilerConfig | ConfigRef) -> CompilerConfig:
+        """Look up *config* if it is a ``ConfigRef``, else return it unchanged."""
+        if isinstance(config, ConfigRef):
+            return self.get(config.name)
+        return config
+
+    def fingerprint(self, config: CompilerConfig | ConfigRef) -> str:
+        """JSON text identifying *config* by content.
+
+        Presets were serialized when stored, so only inline configs pay for
+        ``to_json()`` here.
+        """
+        if isinstance(config, ConfigRef):
+            _, text = self._lookup(config.name)
+            return text
+        return config.to_json()
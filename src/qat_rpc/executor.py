@@ -0,0 +1,251 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Two-stage compile/execute pipeline for QAT work.
+
+Compilation is independent per program, whereas execution occupies the one
+QPU behind the execute pipelines.  ``PipelinedExecutor`` runs compilation on a
+thread pool that feeds a bounded queue drained by a single execute thread, so
+the next program compiles while the current one executes.  ``SingleFlight``
+lets identical concurrent work share one in-flight future.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Generic, NamedTuple, TypeVar
+
+from qat_rpc.metrics import MetricExporter
+
+DEFAULT_COMPILE_WORKERS = 1
+DEFAULT_EXECUTE_QUEUE_SIZE = 4
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class _ExecuteJob(NamedTuple):
+    """A unit of work waiting on the execute stage."""
+
+    task: Callable[[], Any]
+    future: Future
+    enqueued_at: float
+
+
+class PipelinedExecutor:
+    """Compile stage (thread pool) feeding a bounded queue for one execute thread.
+
+    The bounded queue provides backpressure: once *execute_queue_size*
+    compiled packages are waiting, compile workers block rather than
+    compiling further ahead of the hardware.  Work queued directly with
+    ``execute`` never blocks its caller, which may be a transport's event
+    loop.  Beyond the queue's capacity, all work waits in an overflow list
+    that the execute thread drains in order.  Compile workers wait until
+    their package has left that list, so work runs in the order it was queued.
+
+    Stage busy/idle durations and queue waits are reported through the
+    ``MetricExporter`` so the achieved overlap can be observed, and
+    ``queued`` counts the work waiting for either stage.
+    """
+
+    def __init__(
+        self,
+        metric_exporter: MetricExporter,
+        compile_workers: int = DEFAULT_COMPILE_WORKERS,
+        execute_queue_size: int = DEFAULT_EXECUTE_QUEUE_SIZE,
+    ):
+        if compile_workers < 1:
+            raise ValueError(f"compile_workers must be at least 1, got {compile_workers}.")
+        if execute_queue_size < 1:
+            raise ValueError(
+                f"execute_queue_size must be at least 1, got {execute_queue_size}."
+            )
+        self._metric = metric_exporter
+        self._compile_pool = ThreadPoolExecutor(
+            max_workers=compile_workers, thread_name_prefix="qat-compile"
+        )
+        self._execute_queue: queue.Queue[_ExecuteJob | None] = queue.Queue(
+            maxsize=execute_queue_size
+        )
+        self._overflow: deque[_ExecuteJob | None] = deque()
+        self._overflow_changed = threading.Condition()
+        # Jobs ever parked in, and moved on from, the overflow list
+        self._parked = 0
+        self._admitted = 0
+        self._compiles_waiting = 0
+        self._compiles_lock = threading.Lock()
+        self._execute_thread = threading.Thread(
+            target=self._execute_loop, name="qat-execute", daemon=True
+        )
+        self._execute_thread.start()
+
+    @property
+    def queued(self) -> int:
+        """Compile tasks not yet started plus packages waiting to execute."""
+        return self._compiles_waiting + self._execute_queue.qsize() + len(self._overflow)
+
+    def compile(self, task: Callable[[], T]) -> Future[T]:
+        """Run *task* on the compile stage."""
+        with self._compiles_lock:
+            self._compiles_waiting += 1
+        return self._compile_pool.submit(self._run_compile, task)
+
+    def execute(self, task: Callable[[], R]) -> Future[R]:
+        """Queue *task* on the execute stage without blocking."""
+        future: Future[R] = Future()
+        self._enqueue(_ExecuteJob(task, future, time.perf_counter()), block=False)
+        return future
+
+    def then_execute(self, upstream: Future[T], task: Callable[[T], R]) -> Future[R]:
+        """Queue *task* on the execute stage once *upstream* resolves.
+
+        *task* receives the upstream result.  Upstream failures propagate to
+        the returned future without occupying the execute stage.  The thread
+        completing *upstream*, normally a compile worker, blocks while the
+        queue is full; if *upstream* is already done the caller does not.
+        """
+        downstream: Future[R] = Future()
+        caller = threading.get_ident()
+
+        def _forward(done: Future[T]) -> None:
+            if done.cancelled():
+                downstream.cancel()
+                return
+            error = done.exception()
+            if error is not None:
+                downstream.set_exception(error)
+                return
+            value = done.result()
+            job = _ExecuteJob(lambda: task(value), downstream, time.perf_counter())
+            # Also the caller's thread if upstream finished while registering
+            self._enqueue(job, block=threading.get_ident() != caller)
+
+        if upstream.done():
+            _forward(upstream)
+        else:
+            upstream.add_done_callback(_forward)
+        return downstream
+
+    def pipeline(
+        self, compile_task: Callable[[], T], execute_task: Callable[[T], R]
+    ) -> Future[R]:
+        """Compile then execute, handing the compile result to *execute_task*."""
+        return self.then_execute(self.compile(compile_task), execute_task)
+
+    def shutdown(self) -> None:
+        """Finish all submitted work, then stop both stages."""
+        self._compile_pool.shutdown(wait=True)
+        self._enqueue(None, block=False)
+        self._execute_thread.join()
+
+    def _run_compile(self, task: Callable[[], T]) -> T:
+        with self._compiles_lock:
+            self._compiles_waiting -= 1
+        with self._metric.compile_stage_duration():
+            return task()
+
+    def _enqueue(self, job: _ExecuteJob | None, block: bool) -> None:
+        """Queue *job* behind all earlier work, waiting for room if *block*."""
+        with self._overflow_changed:
+            ticket = self._parked
+            self._parked += 1
+            self._overflow.append(job)
+            self._admit()
+            if block:
+                self._overflow_changed.wait_for(lambda: self._admitted > ticket)
+
+    def _admit(self) -> None:
+        """Move overflow into the queue while it has room; the caller holds the lock."""
+        while self._overflow:
+            try:
+                self._execute_queue.put_nowait(self._overflow[0])
+            except queue.Full:
+                return
+            self._overflow.popleft()
+            self._admitted += 1
+
+    def _drain_overflow(self) -> None:
+        """Admit overflow freed up by a ``get`` and wake the workers waiting on it."""
+        with self._overflow_changed:
+            self._admit()
+            self._overflow_changed.notify_all()
+
+    def _execute_loop(self) -> None:
+        while True:
+            with self._metric.execute_stage_idle():
+                job = self._execute_queue.get()
+            self._drain_overflow()
+            if job is None:
+                return
+
+            with self._metric.execute_queue_wait() as wait:
+                wait.observe(time.perf_counter() - job.enqueued_at)
+
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                with self._metric.execute_stage_duration():
+                    result = job.task()
+            except Exception as e:  # noqa: BLE001 - surfaced through the future
+                job.future.set_exception(e)
+            else:
+                job.future.set_result(result)
+
+
+class SingleFlight(Generic[T]):
+    """Coalesces identical concurrent work onto one in-flight future.
+
+    The first caller for a key starts the work; callers arriving with the
+    same key before it completes receive the same future and are counted as
+    coalesced.  Keys are forgotten on completion, so later callers start
+    fresh work rather than reading a stale result.
+    """
+
+    def __init__(self, metric_exporter: MetricExporter):
+        self._metric = metric_exporter
+        self._lock = threading.Lock()
+        self._in_flight: dict[Hashable, Future[T]] = {}
+
+    def submit(self, key: Hashable, start: Callable[[], Future[T]]) -> Future[T]:
+        """Return the in-flight future for *key*, calling *start* if there is none.
+
+        *start* is called outside the lock, so a slow start only delays callers
+        with the same key.  Its errors are surfaced through the future.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if future is None:
+                future = self._in_flight[key] = Future()
+
+        if not leader:
+            with self._metric.coalesced_requests() as coalesced:
+                coalesced.increment()
+            return future
+
+        future.add_done_callback(lambda done: self._forget(key, done))
+        try:
+            started = start()
+        except Exception as e:  # noqa: BLE001 - surfaced through the future
+            future.set_exception(e)
+            return future
+        started.add_done_callback(lambda done: _copy_outcome(done, future))
+        return future
+
+    def _forget(self, key: Hashable, future: Future[T]) -> None:
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+
+def _copy_outcome(source: Future[T], target: Future[T]) -> None:
+    if source.cancelled():
+        target.cancel()
+        return
+    error = source.exception()
+    if error is not None:
+        target.set_exception(error)
+    else:
+        target.set_result(source.result())
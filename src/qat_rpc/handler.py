@@ -2,11 +2,15 @@
 # Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
 """Transport-agnostic QAT service logic."""
 
+import hashlib
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, cast
 
 from compiler_config.config import CompilerConfig
 from qat import QAT
+from qat.core.metrics_base import MetricsManager
 from qat.executables import Executable
 from qat.integrations.features import OpenPulseFeatures
 from qat.model.hardware_model import PhysicalHardwareModel, QuantumHardwareModel
@@ -14,22 +18,43 @@ from qat.purr.compiler.builders import InstructionBuilder
 from qat.purr.integrations.features import OpenPulseFeatures as PurrOpenPulseFeatures
 from qat.purr.utils.logger import get_default_logger
 
+from qat_rpc.config_presets import ConfigPresets
+from qat_rpc.executor import (
+    DEFAULT_COMPILE_WORKERS,
+    DEFAULT_EXECUTE_QUEUE_SIZE,
+    PipelinedExecutor,
+    SingleFlight,
+)
 from qat_rpc.metrics import MetricExporter
 from qat_rpc.models import (
     CompiledProgram,
     CompilePipelinesRequest,
     CompileRequest,
+    ConfigRef,
     CouplingsRequest,
     ExecutePipelinesRequest,
     ExecuteRequest,
+    PackageRef,
+    ProfileRequest,
     ProgramRequest,
     QpuInfoRequest,
     QubitInfoRequest,
+    RegisterConfigRequest,
+    ReloadHardwareRequest,
     Request,
+    ResourceUsage,
     Response,
     Results,
+    UploadPackageRequest,
     VersionRequest,
+    pack_results,
 )
+from qat_rpc.package_store import DEFAULT_PACKAGE_STORE_BYTES, PackageStore
+from qat_rpc.profiling import Profiler
+from qat_rpc.request_log import RequestLogger
+from qat_rpc.resource_usage import ResourceMeter
+from qat_rpc.simulation import Simulation
+from qat_rpc.tracing import Tracer, new_request_id
 
 log = get_default_logger()
 
@@ -39,7 +64,31 @@ class QATServiceHandler:
 
     Each public method corresponds to an RPC operation.  Transport layers
     (e.g. ``ZMQServer``) call ``handle(message)`` which routes to the
-    correct method via pattern matching.
+    correct method via pattern matching, or ``submit(message)`` which routes
+    compile and execute work through a ``PipelinedExecutor`` so that
+    compilation of one request overlaps execution of another.  Identical
+    compilations submitted while one is already in flight share its result.
+
+    The ``QAT`` instance can be rebuilt in the background with
+    ``reload_hardware()``.  Each request is pinned to the instance that was
+    active when it was submitted, so a swap takes effect between requests and
+    never splits a program's compilation and execution across hardware models.
+
+    Wherever a ``CompilerConfig`` is accepted, a ``ConfigRef`` to one of the
+    handler's ``ConfigPresets`` may be given instead.
+
+    Compilation and execution are recorded as spans on the handler's
+    ``Tracer``, tagged with the request id given to ``submit``.  They are
+    also profiled by the handler's ``Profiler`` while a CPU window is open,
+    or under that request id when slow requests are being profiled.
+
+    The CPU time, wall time and (optionally) peak memory of each compile and
+    execute are measured by the handler's ``ResourceMeter`` and published as
+    metrics, and attached to responses as ``diagnostics`` if it reports them.
+
+    A ``Simulation`` adds latency and faults to compilation, execution and
+    submitted replies, so that load tests against echo pipelines behave
+    like a loaded QPU.
     """
 
     def __init__(
@@ -47,15 +96,66 @@ class QATServiceHandler:
         metric_exporter: MetricExporter,
         qat_config_path: Path | None = None,
         compile_enabled: bool = True,
+        compile_workers: int = DEFAULT_COMPILE_WORKERS,
+        execute_queue_size: int = DEFAULT_EXECUTE_QUEUE_SIZE,
+        request_logger: RequestLogger | None = None,
+        package_store_bytes: int = DEFAULT_PACKAGE_STORE_BYTES,
+        config_presets: ConfigPresets | None = None,
+        tracer: Tracer | None = None,
+        profiler: Profiler | None = None,
+        resource_meter: ResourceMeter | None = None,
+        simulation: Simulation | None = None,
     ):
         self._metric = metric_exporter
+        self._request_log = request_logger or RequestLogger()
+        self._qat_config_path = qat_config_path
         self._qat = QAT(qat_config_path)
         self._compile_enabled = compile_enabled
+        self._executor = PipelinedExecutor(
+            metric_exporter, compile_workers, execute_queue_size
+        )
+        self._compilations: SingleFlight[CompiledProgram] = SingleFlight(metric_exporter)
+        self._reloader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="qat-reload")
+        self._packages = PackageStore(package_store_bytes)
+        self._presets = config_presets or ConfigPresets()
+        self._tracer = tracer or Tracer()
+        self._profiler = profiler or Profiler()
+        self._resources = resource_meter or ResourceMeter()
+        self._simulation = simulation or Simulation()
 
     @property
     def metric(self) -> MetricExporter:
         return self._metric
 
+    @property
+    def request_log(self) -> RequestLogger:
+        return self._request_log
+
+    @property
+    def config_presets(self) -> ConfigPresets:
+        return self._presets
+
+    @property
+    def tracer(self) -> Tracer:
+        return self._tracer
+
+    @property
+    def profiler(self) -> Profiler:
+        return self._profiler
+
+    @property
+    def resource_meter(self) -> ResourceMeter:
+        return self._resources
+
+    @property
+    def simulation(self) -> Simulation:
+        return self._simulation
+
+    @property
+    def queued(self) -> int:
+        """Compile and execute work waiting for a free stage."""
+        return self._executor.queued
+
     # --- Pipeline helpers ---
 
     def _get_default_compile_pipeline_name(self) -> str:
@@ -77,40 +177,182 @@ class QATServiceHandler:
     # --- Operations ---
 
     def compile(
-        self, program: str | bytes, config: CompilerConfig, pipeline: str | None = None
+        self,
+        program: str | bytes,
+        config: CompilerConfig | ConfigRef,
+        pipeline: str | None = None,
     ) -> CompiledProgram:
         """Compile *program* and return the compiled package with metrics."""
-        if pipeline is None:
-            pipeline = self._get_default_compile_pipeline_name()
-        package, metrics = self._qat.compile(program, config, pipeline)
-        return CompiledProgram(package=package, compilation_metrics=metrics)
+        return self._compile_on(self._qat, program, self._presets.resolve(config), pipeline)
+
+    def _compile_on(
+        self,
+        qat: QAT,
+        program: str | bytes,
+        config: CompilerConfig,
+        pipeline: str | None,
+        request_id: str | None = None,
+    ) -> CompiledProgram:
+        label = pipeline or "default"
+        with (
+            self._tracer.span("compile", request_id, pipeline=label),
+            self._profiler.profile(request_id),
+            self._metric.request_phase_duration() as duration,
+            self._resources.measure() as measurement,
+        ):
+            duration.label(phase="compile", pipeline=label)
+            if pipeline is None:
+                pipeline = qat.pipelines.default_compile_pipeline
+            self._simulation.compile(program)
+            package, metrics = qat.compile(program, config, pipeline)
+        self._record_qat_metrics(metrics, "compile", label)
+        return CompiledProgram(
+            package=package,
+            compilation_metrics=metrics,
+            diagnostics=self._record_usage(measurement.usage, "compile", label),
+        )
 
     def execute(
         self,
+        package: InstructionBuilder | Executable | str | PackageRef,
+        config: CompilerConfig | ConfigRef,
+        pipeline: str | None = None,
+        packed_results: bool = False,
+    ) -> Results:
+        """Execute a compiled *package* and return results with metrics.
+
+        *package* may be a ``PackageRef`` to a previously uploaded package.
+        With *packed_results*, counts and readouts are returned as arrays
+        (see ``pack_results``).
+        """
+        return self._execute_on(
+            self._qat,
+            self._packages.resolve(package),
+            self._presets.resolve(config),
+            pipeline,
+            packed_results,
+        )
+
+    def upload_package(
+        self, package: InstructionBuilder | Executable | str
+    ) -> dict[str, str]:
+        """Store *package* for later execution by reference and return its digest."""
+        return {"package_digest": self._packages.put(package).digest}
+
+    def register_config(
+        self, config: CompilerConfig, name: str | None = None
+    ) -> dict[str, str]:
+        """Store *config* as a preset for use by ``ConfigRef`` and return its name."""
+        return {"config_name": self._presets.register(config, name).name}
+
+    def _execute_on(
+        self,
+        qat: QAT,
         package: InstructionBuilder | Executable | str,
         config: CompilerConfig,
-        pipeline: str | None = None,
+        pipeline: str | None,
+        packed_results: bool = False,
+        request_id: str | None = None,
     ) -> Results:
-        """Execute a compiled *package* and return results with metrics."""
-        if pipeline is None:
-            pipeline = self._get_default_execute_pipeline_name()
-        results, metrics = self._qat.execute(package, config, pipeline)
-        return Results(results=results, execution_metrics=metrics)
+        label = pipeline or "default"
+        with (
+            self._tracer.span("execute", request_id, pipeline=label),
+            self._profiler.profile(request_id),
+            self._metric.request_phase_duration() as duration,
+            self._resources.measure() as measurement,
+        ):
+            duration.label(phase="execute", pipeline=label)
+            if pipeline is None:
+                pipeline = qat.pipelines.default_execute_pipeline
+            self._simulation.execute(config)
+            results, metrics = qat.execute(package, config, pipeline)
+        self._record_qat_metrics(metrics, "execute", label)
+        if packed_results:
+            results = pack_results(results)
+        return Results(
+            results=results,
+            execution_metrics=metrics,
+            diagnostics=self._record_usage(measurement.usage, "execute", label),
+        )
+
+    def _record_qat_metrics(
+        self, metrics: MetricsManager, phase: str, pipeline: str
+    ) -> None:
+        """Publish the numeric ``MetricsManager`` fields QAT filled in for *phase*."""
+        count = metrics.optimized_instruction_count
+        if count is not None:
+            with self._metric.optimized_instruction_count() as instructions:
+                instructions.label(phase=phase, pipeline=pipeline)
+                instructions.observe(count)
+        circuit = metrics.optimized_circuit
+        if circuit is not None:
+            with self._metric.optimized_circuit_bytes() as size:
+                size.label(phase=phase, pipeline=pipeline)
+                size.observe(len(circuit.encode()))
+        qubits = metrics.physical_qubit_indices
+        if qubits is not None:
+            with self._metric.physical_qubit_count() as used:
+                used.label(phase=phase, pipeline=pipeline)
+                used.observe(len(qubits))
+
+    def _record_usage(
+        self, usage: ResourceUsage | None, phase: str, pipeline: str
+    ) -> ResourceUsage | None:
+        """Publish the *usage* of a *phase* work unit; return it if it is reported."""
+        if usage is None:
+            return None
+        with self._metric.request_cpu_time() as cpu_time:
+            cpu_time.label(phase=phase, pipeline=pipeline)
+            cpu_time.observe(usage.cpu_time)
+        if usage.peak_memory is not None:
+            with self._metric.request_peak_memory() as peak:
+                peak.label(phase=phase, pipeline=pipeline)
+                peak.observe(usage.peak_memory)
+        return usage if self._resources.report else None
 
     def run_program(
         self,
         program: str | bytes,
-        config: CompilerConfig,
+        config: CompilerConfig | ConfigRef,
         compile_pipeline: str | None = None,
         execute_pipeline: str | None = None,
+        packed_results: bool = False,
     ) -> Results:
         """Compile and execute a program. Pipelines default if not specified."""
-        compile_result = self.compile(program, config, compile_pipeline)
-        execute_result = self.execute(compile_result.package, config, execute_pipeline)
-        metrics = compile_result.compilation_metrics.merge(execute_result.execution_metrics)
+        qat = self._qat
+        config = self._presets.resolve(config)
+        compile_result = self._compile_on(qat, program, config, compile_pipeline)
+        return self._execute_compiled(
+            qat, compile_result, config, execute_pipeline, packed_results
+        )
+
+    def _execute_compiled(
+        self,
+        qat: QAT,
+        compile_result: CompiledProgram,
+        config: CompilerConfig,
+        pipeline: str | None = None,
+        packed_results: bool = False,
+        request_id: str | None = None,
+    ) -> Results:
+        """Execute a compile result, merging compilation and execution metrics.
+
+        Reported resource usage is also merged, so it covers both stages.
+        """
+        execute_result = self._execute_on(
+            qat, compile_result.package, config, pipeline, packed_results, request_id
+        )
+        # Copy first: coalesced requests share one compile result
+        metrics = compile_result.compilation_metrics.model_copy().merge(
+            execute_result.execution_metrics
+        )
+        diagnostics = execute_result.diagnostics
+        if compile_result.diagnostics is not None and diagnostics is not None:
+            diagnostics = compile_result.diagnostics.merge(diagnostics)
         return Results(
             results=execute_result.results,
             execution_metrics=metrics,
+            diagnostics=diagnostics,
         )
 
     def version(self) -> dict[str, str]:
@@ -140,6 +382,41 @@ class QATServiceHandler:
             ]
         return {"couplings": coupling_list}
 
+    def reload_hardware(self) -> Future[dict[str, Any]]:
+        """Rebuild QAT and its pipelines in the background, then swap them in.
+
+        Requests keep being served by the current instance while the new one
+        is built.  Reloads run one at a time; a failed reload leaves the
+        current instance in place.
+        """
+        return self._reloader.submit(self._reload_hardware)
+
+    def _reload_hardware(self) -> dict[str, Any]:
+        log.info("Reloading hardware models and pipelines.")
+        with (
+            self._metric.hardware_reload_duration() as duration,
+            self._metric.hardware_reloaded() as reloaded,
+        ):
+            try:
+                qat = QAT(self._qat_config_path)
+            except Exception:
+                reloaded.fail()
+                log.exception("Hardware reload failed, keeping current hardware.")
+                raise
+            # A single reference assignment: requests submitted from here on use it
+            self._qat = qat
+            reloaded.succeed()
+        log.info(f"Hardware reloaded in {float(duration):.3f}s.")
+        return {"hardware_reloaded": True, "reload_duration": float(duration)}
+
+    def profile(
+        self, action: str, kind: str = "cpu", duration: float | None = None
+    ) -> dict[str, Any]:
+        """Start or stop a profiling window (see ``ProfileRequest``)."""
+        if action == "start":
+            return self._profiler.start(kind, duration)
+        return self._profiler.stop()
+
     def qubit_info(self, pipeline: str | None = None) -> dict[str, Any]:
         """Return per-qubit information (not yet implemented)."""
         raise NotImplementedError(
@@ -172,25 +449,186 @@ class QATServiceHandler:
 
     # --- Message dispatch ---
 
+    def submit(self, request: Request, request_id: str | None = None) -> Future[Response]:
+        """Dispatch a ``Request`` without waiting for compilation or execution.
+
+        Compile work runs on the executor's compile stage and execute work on
+        its single execute stage, so a program can compile while another
+        executes.  Metadata requests are answered inline.  Errors are
+        reported through the returned future.  *request_id* tags the
+        request's tracing spans.
+        """
+        record = self._request_log.start(request)
+        try:
+            future = self._submit(request, request_id)
+        except Exception as e:  # noqa: BLE001 - surfaced through the future
+            future = Future()
+            future.set_exception(e)
+        future = self._simulation.delay_reply(future)
+        if record is not None:
+            future.add_done_callback(record.finish)
+        return future
+
+    def _submit(self, request: Request, request_id: str | None) -> Future[Response]:
+        match request:
+            case ProgramRequest(
+                program=program,
+                config=config,
+                compile_pipeline=compile_pipeline,
+                execute_pipeline=execute_pipeline,
+                packed_results=packed_results,
+            ):
+                qat = self._qat
+                config_key = self._presets.fingerprint(config)
+                config = self._presets.resolve(config)
+                return self._executor.then_execute(
+                    self._submit_compile(
+                        qat, program, config, config_key, compile_pipeline, request_id
+                    ),
+                    lambda compiled: self._execute_compiled(
+                        qat, compiled, config, execute_pipeline, packed_results, request_id
+                    ),
+                )
+
+            case CompileRequest(program=program, config=config, pipeline=pipeline) if (
+                self._compile_enabled
+            ):
+                return cast(
+                    "Future[Response]",
+                    self._submit_compile(
+                        self._qat,
+                        program,
+                        self._presets.resolve(config),
+                        self._presets.fingerprint(config),
+                        pipeline,
+                        request_id,
+                    ),
+                )
+
+            case ExecuteRequest(
+                package=package,
+                config=config,
+                pipeline=pipeline,
+                packed_results=packed_results,
+            ):
+                qat = self._qat
+                return self._executor.execute(
+                    lambda: self._execute_on(
+                        qat,
+                        self._packages.resolve(package),
+                        self._presets.resolve(config),
+                        pipeline,
+                        packed_results,
+                        request_id,
+                    )
+                )
+
+            case ReloadHardwareRequest():
+                return cast("Future[Response]", self.reload_hardware())
+
+        future: Future[Response] = Future()
+        try:
+            future.set_result(self._handle(request))
+        except Exception as e:  # noqa: BLE001 - surfaced through the future
+            future.set_exception(e)
+        return future
+
+    def _submit_compile(
+        self,
+        qat: QAT,
+        program: str | bytes,
+        config: CompilerConfig,
+        config_key: str,
+        pipeline: str | None,
+        request_id: str | None = None,
+    ) -> Future[CompiledProgram]:
+        """Compile on the executor, joining an identical in-flight compilation.
+
+        *config_key* is the config's ``ConfigPresets.fingerprint``.  In-flight
+        compilations are only shared between requests pinned to the same
+        ``QAT`` instance, which stays alive (and so keeps its id) for as long
+        as any of them is running.  A shared compilation is traced under the
+        id of the request that started it.
+        """
+        return self._compilations.submit(
+            (id(qat), self._compile_key(program, config_key, pipeline)),
+            lambda: self._executor.compile(
+                lambda: self._compile_on(qat, program, config, pipeline, request_id)
+            ),
+        )
+
+    @staticmethod
+    def _compile_key(program: str | bytes, config_key: str, pipeline: str | None) -> str:
+        """Content hash identifying a compilation by its program, config and pipeline."""
+        digest = hashlib.sha256()
+        if isinstance(program, str):
+            digest.update(b"str\0" + program.encode())
+        else:
+            digest.update(b"bytes\0" + program)
+        digest.update(b"\0" + config_key.encode())
+        digest.update(b"\0" + (pipeline or "").encode())
+        return digest.hexdigest()
+
+    def shutdown(self) -> None:
+        """Wait for submitted work to finish and stop the executor."""
+        self._executor.shutdown()
+        self._reloader.shutdown(wait=True)
+        self._simulation.close()
+        self._resources.close()
+
     def handle(self, request: Request) -> Response:
-        """Dispatch a ``Request`` to the corresponding operation and return its response."""
-        log.info(f"Handling request: {type(request).__name__}, {request}")
+        """Dispatch a ``Request`` to the corresponding operation and return its response.
+
+        When slow requests are being profiled, the whole call is profiled.
+        """
+        record = self._request_log.start(request)
+        request_id = None
+        if self._profiler.slow_threshold is not None:
+            request_id = new_request_id()
+        started = time.perf_counter()
+        try:
+            with self._profiler.profile(request_id):
+                response = self._handle(request)
+        except Exception as e:
+            if record is not None:
+                record.finish(error=e)
+            raise
+        finally:
+            if request_id is not None:
+                self._profiler.finish(
+                    request_id,
+                    time.perf_counter() - started,
+                    self._request_log.summarize(request).details,
+                )
+        if record is not None:
+            record.finish()
+        return response
+
+    def _handle(self, request: Request) -> Response:
         match request:
             case ProgramRequest(
                 program=program,
                 config=config,
                 compile_pipeline=compile_pipeline,
                 execute_pipeline=execute_pipeline,
+                packed_results=packed_results,
             ):
-                return self.run_program(program, config, compile_pipeline, execute_pipeline)
+                return self.run_program(
+                    program, config, compile_pipeline, execute_pipeline, packed_results
+                )
 
             case CompileRequest(program=program, config=config, pipeline=pipeline):
                 if not self._compile_enabled:
                     raise NotImplementedError("Compile endpoint is disabled.")
                 return self.compile(program, config, pipeline)
 
-            case ExecuteRequest(package=package, config=config, pipeline=pipeline):
-                return self.execute(package, config, pipeline)
+            case ExecuteRequest(
+                package=package,
+                config=config,
+                pipeline=pipeline,
+                packed_results=packed_results,
+            ):
+                return self.execute(package, config, pipeline, packed_results)
 
             case VersionRequest():
                 return self.version()
@@ -210,5 +648,17 @@ class QATServiceHandler:
             case ExecutePipelinesRequest():
                 return self.execute_pipelines()
 
+            case ReloadHardwareRequest():
+                return self.reload_hardware().result()
+
+            case UploadPackageRequest(package=package):
+                return self.upload_package(package)
+
+            case RegisterConfigRequest(config=config, name=name):
+                return self.register_config(config, name)
+
+            case ProfileRequest(action=action, kind=kind, duration=duration):
+                return self.profile(action, kind, duration)
+
             case _:
                 raise ValueError(f"Unrecognized request: {request}")
@@ -0,0 +1,44 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Cheap samples of the server process's memory use.
+
+Long-running servers grow, through hardware models, compiled builders
+and allocator fragmentation, until the OOM killer stops them mid-execution.
+``sample_memory`` reads the two figures the memory watchdog needs: the
+process's resident set size, which is what the OOM killer sees, and the
+number of memory blocks Python's allocator has handed out, which grows
+with live Python objects but not with fragmentation.  Comparing the two
+tells a leak of Python objects from memory Python has freed but the
+process has not returned to the OS.
+"""
+
+import os
+import sys
+from typing import NamedTuple
+
+_STATM = "/proc/self/statm"
+
+
+class MemorySample(NamedTuple):
+    """Memory in use by this process at one moment.
+
+    ``resident_bytes`` is ``None`` where the resident set size cannot be read.
+    """
+
+    resident_bytes: int | None
+    allocated_blocks: int
+
+
+def resident_bytes() -> int | None:
+    """This process's current resident set size, or ``None`` off Linux."""
+    try:
+        with open(_STATM, encoding="ascii") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def sample_memory() -> MemorySample:
+    """Sample this process's memory use; cheap enough to call every few seconds."""
+    return MemorySample(resident_bytes(), sys.getallocatedblocks())
@@ -4,23 +4,86 @@
 
 Backends (e.g. ``PrometheusReceiver``) define the metrics surface.
 ``MetricExporter`` dynamically mirrors a backend's public methods as
-context managers that yield mutable outcome objects.
+context managers that yield mutable outcome objects.  Outcomes of labelled
+metrics also carry their label values, set inside the ``with`` block.
+
+``PrometheusReceiver`` also supports deployments running several server
+processes on one host, aggregating their metrics behind one scrape endpoint.
 """
 
 import abc
+import atexit
 import inspect
+import os
 import re
+import threading
+import time
+import weakref
 from collections.abc import Callable
 from inspect import getmembers, ismethod
-from typing import Generic, TypeVar
-
-from prometheus_client import Counter, Gauge, start_http_server
+from typing import Generic, TypeVar, final
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    multiprocess,
+    start_http_server,
+)
 from qat.purr.utils.logger import get_default_logger
 
 log = get_default_logger()
 
 DEFAULT_PROMETHEUS_PORT = 9250
 
+# Read by prometheus_client when it is imported, so it must be set before start-up
+MULTIPROCESS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Compile and execute stages range from milliseconds (echo mode) to minutes (hardware)
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Request handling also covers sub-millisecond metadata queries and decoding
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, *DURATION_BUCKETS)
+
+# Instruction counts of compiled programs, from a few gates to large circuits
+INSTRUCTION_COUNT_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000)
+
+# Sizes of the optimized circuit text returned to clients
+CIRCUIT_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Request and reply sizes, from metadata queries to multi-megabyte programs and results
+MESSAGE_SIZE_BUCKETS = (
+    64,
+    256,
+    1024,
+    4096,
+    16384,
+    65536,
+    262144,
+    1048576,
+    4194304,
+    16777216,
+    67108864,
+)
+
+# Peak memory a compile or execute work unit allocated, up to large pipelines' gigabytes
+MEMORY_BUCKETS = (
+    65536,
+    262144,
+    1048576,
+    4194304,
+    16777216,
+    67108864,
+    268435456,
+    1073741824,
+    4294967296,
+    17179869184,
+)
+
+REQUEST_LABELS = ("request_type", "pipeline")
+PHASE_LABELS = ("phase", "pipeline")
+
 
 class IncrementMutableOutcome:
     """Accumulator yielded by increment-style metric context managers."""
@@ -65,6 +128,61 @@ class BinaryMutableOutcome:
             return (self is not None and not other) or (other == self._success)
 
 
+class TimingMutableOutcome:
+    """Duration recorder yielded by histogram-style metric context managers.
+
+    Times the ``with`` block by default.  ``observe`` overrides the measured
+    duration for intervals timed elsewhere, such as time spent in a queue.
+    """
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._duration: float | None = None
+
+    def observe(self, seconds: float):
+        self._duration = seconds
+
+    def __float__(self):
+        if self._duration is None:
+            return time.perf_counter() - self._start
+        return self._duration
+
+
+class LabelledTimingMutableOutcome(TimingMutableOutcome):
+    """Duration recorder for histograms with labels, set with ``label``."""
+
+    def __init__(self):
+        super().__init__()
+        self.labels: dict[str, str] = {}
+
+    def label(self, **labels: str):
+        self.labels.update(labels)
+
+
+class ValueMutableOutcome:
+    """Measured value yielded by level-style metrics such as queue depths."""
+
+    def __init__(self):
+        self._value: float = 0.0
+
+    def observe(self, value: float):
+        self._value = value
+
+    def __float__(self):
+        return float(self._value)
+
+
+class LabelledValueMutableOutcome(ValueMutableOutcome):
+    """Measured value with labels, yielded by size and count metrics."""
+
+    def __init__(self):
+        super().__init__()
+        self.labels: dict[str, str] = {}
+
+    def label(self, **labels: str):
+        self.labels.update(labels)
+
+
 class ReceiverBackend(abc.ABC):
     """Abstract metrics backend — defines the metrics surface via its public methods."""
 
@@ -83,6 +201,69 @@ class ReceiverBackend(abc.ABC):
     @abc.abstractmethod
     def hardware_reloaded(self, outcome: BinaryMutableOutcome) -> None: ...
 
+    @abc.abstractmethod
+    def compile_stage_duration(self, outcome: TimingMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def execute_stage_duration(self, outcome: TimingMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def execute_stage_idle(self, outcome: TimingMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def execute_queue_wait(self, outcome: TimingMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def coalesced_requests(self, outcome: IncrementMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def hardware_reload_duration(self, outcome: TimingMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def request_duration(self, outcome: LabelledTimingMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def request_phase_duration(self, outcome: LabelledTimingMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def request_dispatch_wait(self, outcome: LabelledTimingMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def optimized_instruction_count(self, outcome: LabelledValueMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def optimized_circuit_bytes(self, outcome: LabelledValueMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def physical_qubit_count(self, outcome: LabelledValueMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def requests_in_flight(self, outcome: ValueMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def requests_queued(self, outcome: ValueMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def request_bytes(self, outcome: LabelledValueMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def response_bytes(self, outcome: LabelledValueMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def event_loop_lag(self, outcome: TimingMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def request_cpu_time(self, outcome: LabelledTimingMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def request_peak_memory(self, outcome: LabelledValueMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def resident_memory(self, outcome: ValueMutableOutcome) -> None: ...
+
+    @abc.abstractmethod
+    def python_allocated_blocks(self, outcome: ValueMutableOutcome) -> None: ...
+
 
 class NullReceiverBackend(ReceiverBackend):
     """No-op backend for testing or when metrics are disabled."""
@@ -100,27 +281,229 @@ class NullReceiverBackend(ReceiverBackend):
 
     def hardware_reloaded(self, outcome: BinaryMutableOutcome) -> None: ...
 
+    def compile_stage_duration(self, outcome: TimingMutableOutcome) -> None: ...
+
+    def execute_stage_duration(self, outcome: TimingMutableOutcome) -> None: ...
+
+    def execute_stage_idle(self, outcome: TimingMutableOutcome) -> None: ...
+
+    def execute_queue_wait(self, outcome: TimingMutableOutcome) -> None: ...
+
+    def coalesced_requests(self, outcome: IncrementMutableOutcome) -> None: ...
+
+    def hardware_reload_duration(self, outcome: TimingMutableOutcome) -> None: ...
+
+    def request_duration(self, outcome: LabelledTimingMutableOutcome) -> None: ...
+
+    def request_phase_duration(self, outcome: LabelledTimingMutableOutcome) -> None: ...
+
+    def request_dispatch_wait(self, outcome: LabelledTimingMutableOutcome) -> None: ...
+
+    def optimized_instruction_count(self, outcome: LabelledValueMutableOutcome) -> None: ...
+
+    def optimized_circuit_bytes(self, outcome: LabelledValueMutableOutcome) -> None: ...
+
+    def physical_qubit_count(self, outcome: LabelledValueMutableOutcome) -> None: ...
+
+    def requests_in_flight(self, outcome: ValueMutableOutcome) -> None: ...
+
+    def requests_queued(self, outcome: ValueMutableOutcome) -> None: ...
+
+    def request_bytes(self, outcome: LabelledValueMutableOutcome) -> None: ...
+
+    def response_bytes(self, outcome: LabelledValueMutableOutcome) -> None: ...
+
+    def event_loop_lag(self, outcome: TimingMutableOutcome) -> None: ...
+
+    def request_cpu_time(self, outcome: LabelledTimingMutableOutcome) -> None: ...
+
+    def request_peak_memory(self, outcome: LabelledValueMutableOutcome) -> None: ...
+
+    def resident_memory(self, outcome: ValueMutableOutcome) -> None: ...
+
+    def python_allocated_blocks(self, outcome: ValueMutableOutcome) -> None: ...
+
 
 class PrometheusReceiver(ReceiverBackend):
-    """Prometheus-backed metrics receiver."""
+    """Prometheus-backed metrics receiver.
+
+    When ``PROMETHEUS_MULTIPROC_DIR`` names a directory in the environment of
+    every server process on a host before it starts, each process keeps its
+    metrics in memory-mapped files there instead of its own memory.  The
+    process that binds *port* first serves all of them from one endpoint;
+    the others only record.  Counters and histograms are summed across
+    processes, ``receiver_status`` and the memory gauges are reported per
+    process (``pid`` label), hardware status gauges report the worst live
+    process, and ``physical_qubit_count`` the most recent program on any of
+    them.  The directory should be emptied before the processes start.
+    """
 
     def __init__(self, port: int = DEFAULT_PROMETHEUS_PORT):
         super().__init__()
-        start_http_server(port)
-        log.info(f"Starting Prometheus metrics exporter on port {port}.")
+        self._serve(port)
 
+        # multiprocess_mode only applies when PROMETHEUS_MULTIPROC_DIR is set
         self._receiver_status = Gauge(
-            "receiver_status", "Measure the Receiver backend up state"
+            "receiver_status",
+            "Measure the Receiver backend up state",
+            multiprocess_mode="liveall",
         )
         self._failed_messages = Counter("failed_messages", "messages failure counter")
         self._executed_messages = Counter("executed_messages", "messages executed counter")
         self._hardware_connected_status = Gauge(
             "hardware_connected_status",
             "Indicate connected status of live hardware",
+            multiprocess_mode="livemin",
         )
         self._hardware_reloaded_status = Gauge(
             "hardware_reloaded_status",
             "Indicate if hardware reload from calibration succeeded or failed",
+            multiprocess_mode="livemin",
+        )
+        # Stage utilisation is rate(<stage>_duration_seconds_sum) over the scrape window
+        self._compile_stage_duration = Histogram(
+            "compile_stage_duration_seconds",
+            "Time the compile stage spent compiling a program",
+            buckets=DURATION_BUCKETS,
+        )
+        self._execute_stage_duration = Histogram(
+            "execute_stage_duration_seconds",
+            "Time the execute stage spent executing a package",
+            buckets=DURATION_BUCKETS,
+        )
+        self._execute_stage_idle = Histogram(
+            "execute_stage_idle_seconds",
+            "Time the execute stage sat idle waiting for a compiled package",
+            buckets=DURATION_BUCKETS,
+        )
+        self._execute_queue_wait = Histogram(
+            "execute_queue_wait_seconds",
+            "Time a compiled package waited in the queue before execution",
+            buckets=DURATION_BUCKETS,
+        )
+        self._coalesced_requests = Counter(
+            "coalesced_requests",
+            "Requests served by joining an identical in-flight compilation",
+        )
+        self._hardware_reload_duration = Histogram(
+            "hardware_reload_duration_seconds",
+            "Time taken to rebuild hardware models and pipelines, successful or not",
+            buckets=DURATION_BUCKETS,
+        )
+        self._request_duration = Histogram(
+            "request_duration_seconds",
+            "Time from receiving a request to sending its reply",
+            REQUEST_LABELS,
+            buckets=LATENCY_BUCKETS,
+        )
+        self._request_phase_duration = Histogram(
+            "request_phase_duration_seconds",
+            "Time a request spent compiling, executing or serializing its reply",
+            PHASE_LABELS,
+            buckets=LATENCY_BUCKETS,
+        )
+        self._request_dispatch_wait = Histogram(
+            "request_dispatch_wait_seconds",
+            "Time from receiving a request to dispatching it to the handler",
+            ("request_type",),
+            buckets=LATENCY_BUCKETS,
+        )
+        # QAT's MetricsManager fields, so compile output can be compared with latency
+        self._optimized_instruction_count = Histogram(
+            "optimized_instruction_count",
+            "Instructions in a program after QAT's optimization passes",
+            PHASE_LABELS,
+            buckets=INSTRUCTION_COUNT_BUCKETS,
+        )
+        self._optimized_circuit_bytes = Histogram(
+            "optimized_circuit_bytes",
+            "Size of the optimized circuit QAT reports for a program",
+            PHASE_LABELS,
+            buckets=CIRCUIT_SIZE_BUCKETS,
+        )
+        self._physical_qubit_count = Gauge(
+            "physical_qubit_count",
+            "Physical qubits used by the most recent program",
+            PHASE_LABELS,
+            multiprocess_mode="mostrecent",
+        )
+        # Saturation signals for autoscaling; summed across processes on one host
+        self._requests_in_flight = Gauge(
+            "requests_in_flight",
+            "Requests received and not yet replied to",
+            multiprocess_mode="livesum",
+        )
+        self._requests_queued = Gauge(
+            "requests_queued",
+            "Compile and execute work waiting for a free stage",
+            multiprocess_mode="livesum",
+        )
+        self._request_bytes = Histogram(
+            "request_bytes",
+            "Size of each request received",
+            ("request_type",),
+            buckets=MESSAGE_SIZE_BUCKETS,
+        )
+        self._response_bytes = Histogram(
+            "response_bytes",
+            "Size of each reply sent",
+            ("request_type",),
+            buckets=MESSAGE_SIZE_BUCKETS,
+        )
+        self._event_loop_lag = Histogram(
+            "event_loop_lag_seconds",
+            "Time a request waited at the socket before the server loop picked it up",
+            buckets=LATENCY_BUCKETS,
+        )
+        # Resources spent per work unit, for charging back compile-heavy tenants
+        self._request_cpu_time = Histogram(
+            "request_cpu_seconds",
+            "CPU time a request spent compiling or executing",
+            PHASE_LABELS,
+            buckets=LATENCY_BUCKETS,
+        )
+        self._request_peak_memory = Histogram(
+            "request_peak_memory_bytes",
+            "Peak memory a request allocated compiling or executing, when tracked",
+            PHASE_LABELS,
+            buckets=MEMORY_BUCKETS,
+        )
+        # Sampled by the memory watchdog; reported per process like receiver_status
+        self._resident_memory = Gauge(
+            "resident_memory_bytes",
+            "Resident set size of the server process",
+            multiprocess_mode="liveall",
+        )
+        self._python_allocated_blocks = Gauge(
+            "python_allocated_blocks",
+            "Memory blocks currently allocated by Python in the server process",
+            multiprocess_mode="liveall",
+        )
+
+    @staticmethod
+    def _serve(port: int) -> None:
+        """Start the scrape endpoint, aggregating all processes in multiprocess mode."""
+        directory = os.environ.get(MULTIPROCESS_DIR_ENV)
+        if not directory:
+            start_http_server(port)
+            log.info(f"Starting Prometheus metrics exporter on port {port}.")
+            return
+
+        # Drops this process's live gauges from the aggregate when it exits cleanly
+        atexit.register(multiprocess.mark_process_dead, os.getpid(), directory)
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=directory)
+        try:
+            start_http_server(port, registry=registry)
+        except OSError:
+            log.info(
+                f"Metrics port {port} is served by another process, "
+                f"recording metrics to {directory}."
+            )
+            return
+        log.info(
+            f"Starting Prometheus metrics exporter on port {port}, "
+            f"aggregating all processes recording to {directory}."
         )
 
     def receiver_status(self, outcome: BinaryMutableOutcome) -> None:
@@ -138,6 +521,69 @@ class PrometheusReceiver(ReceiverBackend):
     def hardware_reloaded(self, outcome: BinaryMutableOutcome) -> None:
         self._hardware_reloaded_status.set(outcome)
 
+    def compile_stage_duration(self, outcome: TimingMutableOutcome) -> None:
+        self._compile_stage_duration.observe(float(outcome))
+
+    def execute_stage_duration(self, outcome: TimingMutableOutcome) -> None:
+        self._execute_stage_duration.observe(float(outcome))
+
+    def execute_stage_idle(self, outcome: TimingMutableOutcome) -> None:
+        self._execute_stage_idle.observe(float(outcome))
+
+    def execute_queue_wait(self, outcome: TimingMutableOutcome) -> None:
+        self._execute_queue_wait.observe(float(outcome))
+
+    def coalesced_requests(self, outcome: IncrementMutableOutcome) -> None:
+        self._coalesced_requests.inc(float(outcome))
+
+    def hardware_reload_duration(self, outcome: TimingMutableOutcome) -> None:
+        self._hardware_reload_duration.observe(float(outcome))
+
+    def request_duration(self, outcome: LabelledTimingMutableOutcome) -> None:
+        self._request_duration.labels(**outcome.labels).observe(float(outcome))
+
+    def request_phase_duration(self, outcome: LabelledTimingMutableOutcome) -> None:
+        self._request_phase_duration.labels(**outcome.labels).observe(float(outcome))
+
+    def request_dispatch_wait(self, outcome: LabelledTimingMutableOutcome) -> None:
+        self._request_dispatch_wait.labels(**outcome.labels).observe(float(outcome))
+
+    def optimized_instruction_count(self, outcome: LabelledValueMutableOutcome) -> None:
+        self._optimized_instruction_count.labels(**outcome.labels).observe(float(outcome))
+
+    def optimized_circuit_bytes(self, outcome: LabelledValueMutableOutcome) -> None:
+        self._optimized_circuit_bytes.labels(**outcome.labels).observe(float(outcome))
+
+    def physical_qubit_count(self, outcome: LabelledValueMutableOutcome) -> None:
+        self._physical_qubit_count.labels(**outcome.labels).set(float(outcome))
+
+    def requests_in_flight(self, outcome: ValueMutableOutcome) -> None:
+        self._requests_in_flight.set(float(outcome))
+
+    def requests_queued(self, outcome: ValueMutableOutcome) -> None:
+        self._requests_queued.set(float(outcome))
+
+    def request_bytes(self, outcome: LabelledValueMutableOutcome) -> None:
+        self._request_bytes.labels(**outcome.labels).observe(float(outcome))
+
+    def response_bytes(self, outcome: LabelledValueMutableOutcome) -> None:
+        self._response_bytes.labels(**outcome.labels).observe(float(outcome))
+
+    def event_loop_lag(self, outcome: TimingMutableOutcome) -> None:
+        self._event_loop_lag.observe(float(outcome))
+
+    def request_cpu_time(self, outcome: LabelledTimingMutableOutcome) -> None:
+        self._request_cpu_time.labels(**outcome.labels).observe(float(outcome))
+
+    def request_peak_memory(self, outcome: LabelledValueMutableOutcome) -> None:
+        self._request_peak_memory.labels(**outcome.labels).observe(float(outcome))
+
+    def resident_memory(self, outcome: ValueMutableOutcome) -> None:
+        self._resident_memory.set(float(outcome))
+
+    def python_allocated_blocks(self, outcome: ValueMutableOutcome) -> None:
+        self._python_allocated_blocks.set(float(outcome))
+
 
 class ReceiverAdapter(ReceiverBackend):
     """Adapter that delegates to a wrapped ``ReceiverBackend``.
@@ -165,9 +611,80 @@ class ReceiverAdapter(ReceiverBackend):
     def hardware_reloaded(self, outcome: BinaryMutableOutcome) -> None:
         self.decorated.hardware_reloaded(outcome)
 
+    def compile_stage_duration(self, outcome: TimingMutableOutcome) -> None:
+        self.decorated.compile_stage_duration(outcome)
+
+    def execute_stage_duration(self, outcome: TimingMutableOutcome) -> None:
+        self.decorated.execute_stage_duration(outcome)
+
+    def execute_stage_idle(self, outcome: TimingMutableOutcome) -> None:
+        self.decorated.execute_stage_idle(outcome)
+
+    def execute_queue_wait(self, outcome: TimingMutableOutcome) -> None:
+        self.decorated.execute_queue_wait(outcome)
+
+    def coalesced_requests(self, outcome: IncrementMutableOutcome) -> None:
+        self.decorated.coalesced_requests(outcome)
+
+    def hardware_reload_duration(self, outcome: TimingMutableOutcome) -> None:
+        self.decorated.hardware_reload_duration(outcome)
+
+    def request_duration(self, outcome: LabelledTimingMutableOutcome) -> None:
+        self.decorated.request_duration(outcome)
+
+    def request_phase_duration(self, outcome: LabelledTimingMutableOutcome) -> None:
+        self.decorated.request_phase_duration(outcome)
+
+    def request_dispatch_wait(self, outcome: LabelledTimingMutableOutcome) -> None:
+        self.decorated.request_dispatch_wait(outcome)
+
+    def optimized_instruction_count(self, outcome: LabelledValueMutableOutcome) -> None:
+        self.decorated.optimized_instruction_count(outcome)
+
+    def optimized_circuit_bytes(self, outcome: LabelledValueMutableOutcome) -> None:
+        self.decorated.optimized_circuit_bytes(outcome)
+
+    def physical_qubit_count(self, outcome: LabelledValueMutableOutcome) -> None:
+        self.decorated.physical_qubit_count(outcome)
+
+    def requests_in_flight(self, outcome: ValueMutableOutcome) -> None:
+        self.decorated.requests_in_flight(outcome)
+
+    def requests_queued(self, outcome: ValueMutableOutcome) -> None:
+        self.decorated.requests_queued(outcome)
+
+    def request_bytes(self, outcome: LabelledValueMutableOutcome) -> None:
+        self.decorated.request_bytes(outcome)
+
+    def response_bytes(self, outcome: LabelledValueMutableOutcome) -> None:
+        self.decorated.response_bytes(outcome)
+
+    def event_loop_lag(self, outcome: TimingMutableOutcome) -> None:
+        self.decorated.event_loop_lag(outcome)
+
+    def request_cpu_time(self, outcome: LabelledTimingMutableOutcome) -> None:
+        self.decorated.request_cpu_time(outcome)
+
+    def request_peak_memory(self, outcome: LabelledValueMutableOutcome) -> None:
+        self.decorated.request_peak_memory(outcome)
+
+    def resident_memory(self, outcome: ValueMutableOutcome) -> None:
+        self.decorated.resident_memory(outcome)
+
+    def python_allocated_blocks(self, outcome: ValueMutableOutcome) -> None:
+        self.decorated.python_allocated_blocks(outcome)
+
 
 # Generic type variable for outcome types
-T = TypeVar("T", IncrementMutableOutcome, BinaryMutableOutcome)
+T = TypeVar(
+    "T",
+    IncrementMutableOutcome,
+    BinaryMutableOutcome,
+    TimingMutableOutcome,
+    LabelledTimingMutableOutcome,
+    ValueMutableOutcome,
+    LabelledValueMutableOutcome,
+)
 
 
 class MetricFieldWrapper(Generic[T]):
@@ -193,17 +710,92 @@ class MetricFieldWrapper(Generic[T]):
             log.warning(f"Metric setting errored {ex!s}")
 
 
+@final
+class _BatchedIncrement(IncrementMutableOutcome):
+    """Per-thread running total yielded by batched increment metrics.
+
+    Only the owning thread increments it and only the flushing thread moves
+    ``flushed``, so neither side needs a lock.  It is its own context manager,
+    so recording allocates nothing.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.flushed: float = 0.0
+
+    def __enter__(self) -> "_BatchedIncrement":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return None
+
+
+class _BatchedCounterMetric:
+    """No-arg factory for a batched increment metric, one cell per thread.
+
+    Cells of threads that have finished are dropped once flushed, so
+    short-lived worker threads do not grow every later flush.
+    """
+
+    def __init__(self, func: Callable):
+        self._func = func
+        self._local = threading.local()
+        self._cells: list[tuple[weakref.ref[threading.Thread], _BatchedIncrement]] = []
+        self._lock = threading.Lock()
+
+    def __call__(self) -> _BatchedIncrement:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = _BatchedIncrement()
+            owner = weakref.ref(threading.current_thread())
+            with self._lock:
+                self._cells.append((owner, cell))
+            return cell
+
+    def flush(self) -> None:
+        total = 0.0
+        finished = set()
+        with self._lock:
+            cells = list(self._cells)
+        for owner, cell in cells:
+            # Checked before reading, so a finished thread's count is final
+            thread = owner()
+            if thread is None or not thread.is_alive():
+                finished.add(id(cell))
+            count = cell._count
+            total += count - cell.flushed
+            cell.flushed = count
+        if finished:
+            with self._lock:
+                self._cells = [
+                    entry for entry in self._cells if id(entry[1]) not in finished
+                ]
+        if total:
+            outcome = IncrementMutableOutcome()
+            outcome.increment(total)
+            self._func(outcome)
+
+
 class MetricExporter:
     """Dynamic factory for metric context managers.
 
     Introspects a ``ReceiverBackend`` and creates a no-arg method for each
     of its public methods.  Each generated method returns a
     ``MetricFieldWrapper`` context manager.
+
+    With *batched*, increment metrics instead yield a preallocated per-thread
+    accumulator, and reach the backend as one increment per metric when
+    ``flush()`` is called.  Binary and timing metrics are always applied
+    immediately: gauges are state changes, and histograms need every
+    observation, so deferring them would only move the cost into the flush.
     """
 
-    def __init__(self, backend: ReceiverBackend):
+    def __init__(self, backend: ReceiverBackend, batched: bool = False):
         if isinstance(backend, type):
             raise TypeError("Argument must be an instance not a type")
+        self._batched: list[_BatchedCounterMetric] = []
+        self._last_flush = time.monotonic()
         methods = [
             member
             for member in getmembers(backend, predicate=ismethod)
@@ -217,6 +809,10 @@ class MetricExporter:
                 parameters = sign.parameters
                 outcome_param = parameters.get("outcome")
                 outcome_type = outcome_param.annotation
+                if batched and outcome_type is IncrementMutableOutcome:
+                    counter = _BatchedCounterMetric(f)
+                    self._batched.append(counter)
+                    return counter
                 return lambda: MetricFieldWrapper(f, outcome_type())
             except KeyError:
                 log.exception(
@@ -235,6 +831,23 @@ class MetricExporter:
             # build no-arg setting functions on this matching backend public name
             setattr(self, func_name, decorate(func))
 
+    def flush(self, min_interval: float = 0.0) -> None:
+        """Push batched observations to the backend.
+
+        Does nothing if the last flush was less than *min_interval* seconds
+        ago, so it is cheap to call on every turn of a busy loop.  Must only
+        be called from one thread at a time.
+        """
+        now = time.monotonic()
+        if now - self._last_flush < min_interval:
+            return
+        self._last_flush = now
+        for metric in self._batched:
+            try:
+                metric.flush()
+            except Exception as ex:
+                log.warning(f"Metric setting errored {ex!s}")
+
     # Type hints for dynamically created methods (created via setattr in __init__)
     # Each method returns a context manager that yields the specific outcome type
     def receiver_status(self) -> MetricFieldWrapper[BinaryMutableOutcome]: ...
@@ -242,3 +855,30 @@ class MetricExporter:
     def executed_messages(self) -> MetricFieldWrapper[IncrementMutableOutcome]: ...
     def hardware_connected(self) -> MetricFieldWrapper[BinaryMutableOutcome]: ...
     def hardware_reloaded(self) -> MetricFieldWrapper[BinaryMutableOutcome]: ...
+    def compile_stage_duration(self) -> MetricFieldWrapper[TimingMutableOutcome]: ...
+    def execute_stage_duration(self) -> MetricFieldWrapper[TimingMutableOutcome]: ...
+    def execute_stage_idle(self) -> MetricFieldWrapper[TimingMutableOutcome]: ...
+    def execute_queue_wait(self) -> MetricFieldWrapper[TimingMutableOutcome]: ...
+    def coalesced_requests(self) -> MetricFieldWrapper[IncrementMutableOutcome]: ...
+    def hardware_reload_duration(self) -> MetricFieldWrapper[TimingMutableOutcome]: ...
+    def request_duration(self) -> MetricFieldWrapper[LabelledTimingMutableOutcome]: ...
+    def request_phase_duration(
+        self,
+    ) -> MetricFieldWrapper[LabelledTimingMutableOutcome]: ...
+    def request_dispatch_wait(self) -> MetricFieldWrapper[LabelledTimingMutableOutcome]: ...
+    def optimized_instruction_count(
+        self,
+    ) -> MetricFieldWrapper[LabelledValueMutableOutcome]: ...
+    def optimized_circuit_bytes(
+        self,
+    ) -> MetricFieldWrapper[LabelledValueMutableOutcome]: ...
+    def physical_qubit_count(self) -> MetricFieldWrapper[LabelledValueMutableOutcome]: ...
+    def requests_in_flight(self) -> MetricFieldWrapper[ValueMutableOutcome]: ...
+    def requests_queued(self) -> MetricFieldWrapper[ValueMutableOutcome]: ...
+    def request_bytes(self) -> MetricFieldWrapper[LabelledValueMutableOutcome]: ...
+    def response_bytes(self) -> MetricFieldWrapper[LabelledValueMutableOutcome]: ...
+    def event_loop_lag(self) -> MetricFieldWrapper[TimingMutableOutcome]: ...
+    def request_cpu_time(self) -> MetricFieldWrapper[LabelledTimingMutableOutcome]: ...
+    def request_peak_memory(self) -> MetricFieldWrapper[LabelledValueMutableOutcome]: ...
+    def resident_memory(self) -> MetricFieldWrapper[ValueMutableOutcome]: ...
+    def python_allocated_blocks(self) -> MetricFieldWrapper[ValueMutableOutcome]: ...
@@ -5,10 +5,16 @@
 Pydantic models that define the RPC request/response contract between client
 and server, plus the ``Request`` and ``Response`` type aliases used across
 the handler and transport layers.
+
+Results can optionally be packed into array-backed ``CountsArray`` and
+``ReadoutArray`` values (see ``pack_results``), which are far cheaper to
+pickle than dicts and lists of Python objects; ``unpack_results`` restores
+the legacy shapes.
 """
 
-from typing import Any
+from typing import Any, Literal
 
+import numpy as np
 from compiler_config.config import CompilerConfig
 from pydantic import BaseModel, ConfigDict
 from qat.core.metrics_base import MetricsManager
@@ -28,30 +34,71 @@ class _FrozenRequest(BaseModel):
 
     model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
 
+    def __setstate__(self, state: dict[Any, Any]) -> None:
+        """Unpickle, giving fields added since the request was pickled their defaults.
+
+        Pickles from older clients lack those fields, so class patterns that
+        name them would otherwise fail to match.
+        """
+        values = state.get("__dict__", {})
+        missing = {
+            name: field.get_default(call_default_factory=True)
+            for name, field in type(self).model_fields.items()
+            if name not in values and not field.is_required()
+        }
+        if missing:
+            state = {**state, "__dict__": {**missing, **values}}
+        super().__setstate__(state)
+
+
+class ConfigRef(BaseModel):
+    """Reference to a ``CompilerConfig`` preset held by the server.
+
+    *name* is either an operator-defined preset name or the name returned by
+    ``RegisterConfigRequest`` (the config's SHA-256 content hash by default).
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+
 
 class ProgramRequest(_FrozenRequest):
     """Compile and execute a program in a single round-trip."""
 
     program: str | bytes
-    config: CompilerConfig
+    config: CompilerConfig | ConfigRef
     compile_pipeline: str | None = None
     execute_pipeline: str | None = None
+    packed_results: bool = False
 
 
 class CompileRequest(_FrozenRequest):
     """Compile a program without executing it."""
 
     program: str | bytes
-    config: CompilerConfig
+    config: CompilerConfig | ConfigRef
     pipeline: str | None = None
 
 
+class PackageRef(BaseModel):
+    """Reference to a package previously sent with ``UploadPackageRequest``.
+
+    *digest* is the SHA-256 content hash returned by the upload.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    digest: str
+
+
 class ExecuteRequest(_FrozenRequest):
-    """Execute a previously compiled package."""
+    """Execute a previously compiled package, or an uploaded one by reference."""
 
-    package: InstructionBuilder | Executable | str
-    config: CompilerConfig
+    package: InstructionBuilder | Executable | str | PackageRef
+    config: CompilerConfig | ConfigRef
     pipeline: str | None = None
+    packed_results: bool = False
 
 
 class VersionRequest(_FrozenRequest):
@@ -84,6 +131,55 @@ class ExecutePipelinesRequest(_FrozenRequest):
     """Request the list of available execute pipelines."""
 
 
+class ReloadHardwareRequest(_FrozenRequest):
+    """Admin request to rebuild hardware models and pipelines from calibration."""
+
+
+class ProfileRequest(_FrozenRequest):
+    """Admin request to start or stop a profiling window on the server.
+
+    *kind* is ``cpu`` (``cProfile``) or ``memory`` (``tracemalloc``).  A
+    window started with a *duration*, in seconds, stops by itself.  Stopping
+    a CPU window replies with its ``profile_path`` and, if some work units
+    could not be profiled because another profiler was running (Python
+    3.12+), their count as ``unprofiled_work_units``.
+    """
+
+    action: Literal["start", "stop"]
+    kind: Literal["cpu", "memory"] = "cpu"
+    duration: float | None = None
+
+
+class UploadPackageRequest(_FrozenRequest):
+    """Store a compiled package on the server for execution by ``PackageRef``."""
+
+    package: InstructionBuilder | Executable | str
+
+
+class RegisterConfigRequest(_FrozenRequest):
+    """Store a ``CompilerConfig`` on the server for use by ``ConfigRef``.
+
+    Without a *name* the preset is named by its content hash.
+    """
+
+    config: CompilerConfig
+    name: str | None = None
+
+
+class HelloRequest(_FrozenRequest):
+    """Capability handshake: the client's protocol version and what it supports.
+
+    Answered by the transport rather than the handler, with the server's own
+    capabilities in the same shape (see ``qat_rpc.zmq.wire.hello_message``).
+    """
+
+    protocol_version: int
+    codecs: tuple[str, ...] = ()
+    compressions: tuple[str, ...] = ()
+    max_message_size: int | None = None
+    features: tuple[str, ...] = ()
+
+
 Request = (
     ProgramRequest
     | CompileRequest
@@ -94,28 +190,197 @@ Request = (
     | QpuInfoRequest
     | CompilePipelinesRequest
     | ExecutePipelinesRequest
+    | ReloadHardwareRequest
+    | UploadPackageRequest
+    | RegisterConfigRequest
+    | HelloRequest
+    | ProfileRequest
 )
 
 
 # --- Response types (server -> client) ---
 
 
+def _narrow(values: np.ndarray) -> np.ndarray:
+    """Cast integer arrays to the smallest dtype holding their range."""
+    if values.dtype.kind not in "iu" or values.size == 0:
+        return values
+    low, high = values.min(), values.max()
+    if low >= 0:
+        return values.astype(np.min_scalar_type(high))
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype)
+    return values
+
+
+class CountsArray(BaseModel):
+    """Bitstring counts for one register as parallel arrays.
+
+    ``outcomes`` holds each bitstring packed into an unsigned integer (most
+    significant bit first) and ``counts`` the matching counts, in the
+    original dict order.
+    """
+
+    model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
+
+    width: int
+    outcomes: np.ndarray
+    counts: np.ndarray
+
+    @classmethod
+    def from_counts(cls, counts: dict[Any, Any]) -> "CountsArray | None":
+        """Pack a bitstring -> count dict, or ``None`` if it is not one."""
+        if not counts:
+            return None
+        keys = list(counts)
+        width = len(keys[0]) if isinstance(keys[0], str) else 0
+        if not 0 < width <= 64 or any(
+            not isinstance(key, str) or len(key) != width for key in keys
+        ):
+            return None
+        try:
+            text = "".join(keys).encode("ascii")
+        except UnicodeEncodeError:
+            return None
+        bits = np.frombuffer(text, dtype=np.uint8).reshape(len(keys), width) - ord("0")
+        if (bits > 1).any():
+            return None
+        values = np.array(list(counts.values()))
+        if values.dtype.kind not in "iu":
+            return None
+
+        weights = np.left_shift(np.uint64(1), np.arange(width - 1, -1, -1, dtype=np.uint64))
+        outcomes = bits.astype(np.uint64) @ weights
+        return cls(
+            width=width,
+            outcomes=outcomes.astype(np.min_scalar_type((1 << width) - 1)),
+            counts=_narrow(values),
+        )
+
+    def to_dict(self) -> dict[str, int]:
+        """The legacy bitstring -> count dict."""
+        shifts = np.arange(self.width - 1, -1, -1, dtype=np.uint64)
+        bits = (self.outcomes.astype(np.uint64)[:, None] >> shifts) & np.uint64(1)
+        text = (bits.astype(np.uint8) + ord("0")).tobytes().decode("ascii")
+        keys = [text[i : i + self.width] for i in range(0, len(text), self.width)]
+        return dict(zip(keys, self.counts.tolist(), strict=True))
+
+
+class ReadoutArray(BaseModel):
+    """Per-shot readouts for one register as a typed array.
+
+    Integer readouts that are all 0 or 1 are bit-packed into ``values``, with
+    ``shape`` recording the unpacked shape; otherwise ``shape`` is ``None``.
+    """
+
+    model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
+
+    values: np.ndarray
+    shape: tuple[int, ...] | None = None
+
+    @classmethod
+    def from_readouts(cls, readouts: list[Any]) -> "ReadoutArray | None":
+        """Pack (nested) lists of numbers, or ``None`` if they are not regular."""
+        try:
+            values = np.asarray(readouts)
+        except ValueError:
+            return None
+        if values.ndim == 0 or values.dtype.kind not in "biufc":
+            return None
+        values = _narrow(values)
+        if values.dtype == np.uint8 and values.size and values.max() <= 1:
+            return cls(values=np.packbits(values, axis=None), shape=values.shape)
+        return cls(values=values)
+
+    def to_list(self) -> list[Any]:
+        """The legacy (nested) list of readouts."""
+        if self.shape is None:
+            return self.values.tolist()
+        count = int(np.prod(self.shape))
+        return np.unpackbits(self.values, count=count).reshape(self.shape).tolist()
+
+
+def pack_results(results: dict[Any, Any]) -> dict[Any, Any]:
+    """Pack each register's counts or readouts into arrays where possible.
+
+    Registers whose values are neither bitstring counts nor regular numeric
+    readouts are left untouched.
+    """
+    packed: dict[Any, Any] = {}
+    for register, value in results.items():
+        if isinstance(value, dict):
+            packed[register] = CountsArray.from_counts(value) or value
+        elif isinstance(value, list):
+            packed[register] = ReadoutArray.from_readouts(value) or value
+        else:
+            packed[register] = value
+    return packed
+
+
+def unpack_results(results: dict[Any, Any]) -> dict[Any, Any]:
+    """Restore the legacy dicts and lists from ``pack_results`` output."""
+    unpacked: dict[Any, Any] = {}
+    for register, value in results.items():
+        if isinstance(value, CountsArray):
+            unpacked[register] = value.to_dict()
+        elif isinstance(value, ReadoutArray):
+            unpacked[register] = value.to_list()
+        else:
+            unpacked[register] = value
+    return unpacked
+
+
+class ResourceUsage(BaseModel):
+    """Server resources spent compiling and/or executing one request.
+
+    ``wall_time`` and ``cpu_time`` are in seconds; CPU time is that of the
+    threads doing the work.  ``peak_memory`` is the most memory, in bytes,
+    allocated above the level at which the work started, or ``None`` if the
+    server does not track memory.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    wall_time: float
+    cpu_time: float
+    peak_memory: int | None = None
+
+    def merge(self, other: "ResourceUsage") -> "ResourceUsage":
+        """Usage of this and *other* run one after the other."""
+        peaks = [peak for peak in (self.peak_memory, other.peak_memory) if peak is not None]
+        return ResourceUsage(
+            wall_time=self.wall_time + other.wall_time,
+            cpu_time=self.cpu_time + other.cpu_time,
+            peak_memory=max(peaks, default=None),
+        )
+
+
 class Results(BaseModel):
-    """Results from program execution."""
+    """Results from program execution.
+
+    ``diagnostics`` is only set by servers reporting resource usage.
+    """
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     results: dict[Any, Any]
     execution_metrics: MetricsManager
+    diagnostics: ResourceUsage | None = None
 
 
 class CompiledProgram(BaseModel):
-    """Results from program compilation."""
+    """Results from program compilation.
+
+    ``diagnostics`` is only set by servers reporting resource usage.
+    """
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     package: InstructionBuilder | Executable | str
     compilation_metrics: MetricsManager
+    diagnostics: ResourceUsage | None = None
 
 
 Response = Results | CompiledProgram | dict[str, Any]
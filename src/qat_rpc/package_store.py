@@ -0,0 +1,100 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Server-side store of uploaded compiled packages.
+
+Calibration loops execute the same compiled package many times.  Clients
+upload it once (``UploadPackageRequest``) and then execute it by
+``PackageRef``, so the package crosses the wire once rather than on every
+call.  Packages are content-addressed and evicted least-recently-used once
+the store exceeds its byte budget; executing an evicted package raises
+``PackageNotFoundError`` so the client can upload it again.
+"""
+
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from qat_rpc.models import PackageRef
+
+DEFAULT_PACKAGE_STORE_BYTES = 256 * 1024 * 1024
+
+
+class PackageNotFoundError(KeyError):
+    """An executed ``PackageRef`` is not (or no longer) in the store."""
+
+    def __init__(self, digest: str):
+        super().__init__(digest)
+        self.digest = digest
+
+    def __str__(self) -> str:
+        return f"Package {self.digest} not found; upload it again."
+
+
+class PackageStore:
+    """Content-addressed LRU store of compiled packages with a byte budget.
+
+    Package sizes are measured by their serialized form, which is also what
+    the content hash is computed over.  Safe to use from multiple threads.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_PACKAGE_STORE_BYTES):
+        if max_bytes < 1:
+            raise ValueError(f"max_bytes must be at least 1, got {max_bytes}.")
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the stored packages."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _fingerprint(package: Any) -> tuple[str, int]:
+        """Content hash and serialized size of *package*."""
+        if isinstance(package, str):
+            data = package.encode()
+        else:
+            data = pickle.dumps(package, protocol=pickle.DEFAULT_PROTOCOL)
+        return hashlib.sha256(data).hexdigest(), len(data)
+
+    def put(self, package: Any) -> PackageRef:
+        """Store *package*, evicting the least recently used ones to fit."""
+        digest, size = self._fingerprint(package)
+        if size > self._max_bytes:
+            raise ValueError(
+                f"Package of {size} bytes exceeds the store budget of {self._max_bytes}."
+            )
+
+        with self._lock:
+            if digest in self._entries:
+                self._entries.move_to_end(digest)
+            else:
+                self._entries[digest] = (package, size)
+                self._bytes += size
+                while self._bytes > self._max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self._bytes -= evicted
+        return PackageRef(digest=digest)
+
+    def get(self, digest: str) -> Any:
+        """The package stored under *digest*, marking it recently used."""
+        with self._lock:
+            try:
+                package, _ = self._entries[digest]
+            except KeyError:
+                raise PackageNotFoundError(digest) from None
+            self._entries.move_to_end(digest)
+        return package
+
+    def resolve(self, package: Any) -> Any:
+        """Look up *package* if it is a ``PackageRef``, else return it unchanged."""
+        if isinstance(package, PackageRef):
+            return self.get(package.digest)
+        return package
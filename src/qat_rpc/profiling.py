@@ -0,0 +1,288 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""On-demand CPU and memory profiling of a running server.
+
+Metrics and traces say *that* a request was slow; a profile says *why*.
+``Profiler`` captures two kinds of output into a directory:
+
+* **Windows**: ``start("cpu")`` runs ``cProfile`` until ``stop()`` (or for a
+  fixed duration), covering the server loop and every compile and execute
+  work unit, and writes one merged ``cpu-<time>.prof``.  ``start("memory")``
+  runs ``tracemalloc`` instead and writes a ``memory-<time>.snapshot`` plus
+  a text summary of the largest allocation sites.
+* **Slow requests**: with a *slow_threshold*, each request's work units are
+  profiled, and any request taking at least that long has its profile saved
+  as ``slow-<time>-<request id>.prof`` beside a JSON file describing the
+  request.  Profiles of faster requests are discarded.
+
+``cProfile`` slows Python-heavy code such as compilation noticeably, so
+neither is on by default.  Profiling one thread at a time is all
+``cProfile`` supports; work units that start while their thread is already
+being profiled are left to the outer profile.  Python 3.12+ goes further and
+allows one profiler per process, so work units that start while any other is
+running are not profiled.  They are counted as ``unprofiled_work_units`` in
+the window's reply and the slow request's details, and logged.
+"""
+
+import cProfile
+import json
+import pstats
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from qat.purr.utils.logger import get_default_logger
+
+log = get_default_logger()
+
+PROFILE_KINDS = ("cpu", "memory")
+
+DEFAULT_PROFILE_DIR = Path(tempfile.gettempdir()) / "qat_rpc_profiles"
+
+# Stack depth kept per allocation; deeper is more useful and more expensive
+_TRACEMALLOC_FRAMES = 16
+
+# Allocation sites listed in a memory window's text summary
+_TOP_ALLOCATIONS = 50
+
+_NOT_PROFILED: AbstractContextManager[None] = nullcontext()
+
+
+def _timestamp() -> str:
+    return datetime.now().strftime("%Y%m%dT%H%M%S.%f")
+
+
+class Profiler:
+    """Captures profiling windows and profiles of slow requests.
+
+    ``start``, ``stop``, ``toggle`` and ``poll`` manage a window and must be
+    called from one thread (the server loop); ``profile`` and ``finish``
+    may be called from any thread.
+
+    :param output_dir: Directory profiles are written to, created on demand.
+    :param slow_threshold: Requests taking at least this many seconds have
+        their profile saved.  ``None`` disables per-request profiling.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path | str = DEFAULT_PROFILE_DIR,
+        slow_threshold: float | None = None,
+    ):
+        self._output_dir = Path(output_dir)
+        self._slow_threshold = slow_threshold
+        self._lock = threading.Lock()
+        self._window: str | None = None
+        self._deadline: float | None = None
+        self._loop_profile: cProfile.Profile | None = None
+        # Whether a memory window started tracemalloc, and so should stop it
+        self._started_tracing = False
+        self._window_profiles: list[cProfile.Profile] = []
+        self._requests: dict[str, list[cProfile.Profile]] = {}
+        # Work units refused a profiler, for the open window and per request
+        self._window_unprofiled = 0
+        self._unprofiled: dict[str, int] = {}
+
+    @property
+    def output_dir(self) -> Path:
+        return self._output_dir
+
+    @property
+    def slow_threshold(self) -> float | None:
+        return self._slow_threshold
+
+    @property
+    def active(self) -> str | None:
+        """The kind of window being captured, if any."""
+        return self._window
+
+    def start(self, kind: str = "cpu", duration: float | None = None) -> dict[str, Any]:
+        """Open a *kind* window, stopped by ``stop()`` or after *duration* seconds."""
+        if kind not in PROFILE_KINDS:
+            raise ValueError(
+                f"Unknown profile kind {kind!r}, expected one of {PROFILE_KINDS}."
+            )
+        if self._window is not None:
+            raise RuntimeError(f"A {self._window} profile is already running.")
+        if kind == "cpu":
+            with self._lock:
+                self._window_unprofiled = 0
+            loop_profile = cProfile.Profile()
+            try:
+                if self._enable(loop_profile):
+                    self._loop_profile = loop_profile
+            except ValueError:
+                log.warning("Another profiler is running, the server loop is not profiled.")
+        elif not tracemalloc.is_tracing():
+            tracemalloc.start(_TRACEMALLOC_FRAMES)
+            self._started_tracing = True
+        self._window = kind
+        self._deadline = None if duration is None else time.monotonic() + duration
+        log.info(f"Started {kind} profiling{f' for {duration}s' if duration else ''}.")
+        return {"profiling": kind, "duration": duration}
+
+    def stop(self) -> dict[str, Any]:
+        """Close the open window and write its output, returning the file's path."""
+        kind = self._window
+        if kind is None:
+            raise RuntimeError("No profile is running.")
+        self._window = None
+        self._deadline = None
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        if kind == "cpu":
+            with self._lock:
+                profiles, self._window_profiles = self._window_profiles, []
+                unprofiled = self._window_unprofiled
+            if self._loop_profile is not None:
+                self._loop_profile.disable()
+                profiles.append(self._loop_profile)
+                self._loop_profile = None
+            reply: dict[str, Any] = {"profile_path": None}
+            if unprofiled:
+                reply["unprofiled_work_units"] = unprofiled
+                log.warning(
+                    f"{unprofiled} work units were not profiled, "
+                    "another profiler was running."
+                )
+            path = self._output_dir / f"cpu-{_timestamp()}.prof"
+            if not self._dump_stats(path, profiles):
+                log.info("Stopped cpu profiling, nothing was recorded.")
+                return reply
+            log.info(f"Stopped cpu profiling, written to {path}.")
+            return {**reply, "profile_path": str(path)}
+        else:
+            snapshot = tracemalloc.take_snapshot()
+            if self._started_tracing:
+                self._started_tracing = False
+                tracemalloc.stop()
+            path = self._output_dir / f"memory-{_timestamp()}.snapshot"
+            snapshot.dump(str(path))
+            top = snapshot.statistics("lineno")[:_TOP_ALLOCATIONS]
+            path.with_suffix(".txt").write_text(
+                "".join(f"{stat}\n" for stat in top), encoding="utf-8"
+            )
+        log.info(f"Stopped {kind} profiling, written to {path}.")
+        return {"profile_path": str(path)}
+
+    def toggle(self) -> dict[str, Any]:
+        """Stop the open window, or start a CPU window if none is open."""
+        if self._window is None:
+            return self.start("cpu")
+        return self.stop()
+
+    def poll(self) -> None:
+        """Stop a timed window once its duration has elapsed."""
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self.stop()
+
+    def close(self) -> None:
+        """Stop any open window so its output is not lost."""
+        if self._window is not None:
+            self.stop()
+
+    def profile(self, request_id: str | None) -> AbstractContextManager[None]:
+        """Profile the ``with`` block for the open CPU window and request *request_id*.
+
+        A no-op unless a CPU window is open or slow requests are profiled.
+        """
+        slow = self._slow_threshold is not None and request_id is not None
+        if not slow and self._window != "cpu":
+            return _NOT_PROFILED
+        return self._profile(request_id if slow else None)
+
+    @contextmanager
+    def _profile(self, request_id: str | None) -> Iterator[None]:
+        profile = cProfile.Profile()
+        try:
+            enabled = self._enable(profile)
+        except ValueError:
+            enabled = False
+            with self._lock:
+                if self._window == "cpu":
+                    self._window_unprofiled += 1
+                if request_id is not None:
+                    self._unprofiled[request_id] = self._unprofiled.get(request_id, 0) + 1
+        if not enabled:
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                if self._window == "cpu":
+                    self._window_profiles.append(profile)
+                if request_id is not None:
+                    self._requests.setdefault(request_id, []).append(profile)
+
+    @staticmethod
+    def _enable(profile: cProfile.Profile) -> bool:
+        """Enable *profile* unless this thread is already being profiled.
+
+        Raises:
+            ValueError: On Python 3.12+, if any thread is being profiled.
+        """
+        if sys.getprofile() is not None:
+            return False
+        profile.enable()
+        return True
+
+    def finish(
+        self,
+        request_id: str | None,
+        elapsed: float,
+        describe: Callable[[], dict[str, Any]],
+    ) -> Path | None:
+        """Save request *request_id*'s profile if it took *elapsed* >= the threshold.
+
+        *describe* is only called for slow requests, and returns the details
+        written alongside the profile.  Returns the description's path.
+        """
+        if request_id is None or self._slow_threshold is None:
+            return None
+        with self._lock:
+            profiles = self._requests.pop(request_id, [])
+            unprofiled = self._unprofiled.pop(request_id, 0)
+        if elapsed < self._slow_threshold:
+            return None
+
+        stem = f"slow-{_timestamp()}-{request_id}"
+        path = self._output_dir / f"{stem}.json"
+        try:
+            self._output_dir.mkdir(parents=True, exist_ok=True)
+            profiled = self._dump_stats(self._output_dir / f"{stem}.prof", profiles)
+            details = {
+                "request_id": request_id,
+                "elapsed": elapsed,
+                "profile": f"{stem}.prof" if profiled else None,
+                **({"unprofiled_work_units": unprofiled} if unprofiled else {}),
+                **describe(),
+            }
+            path.write_text(json.dumps(details, default=str), encoding="utf-8")
+        except OSError:
+            log.exception(f"Failed to save the profile of slow request {request_id}.")
+            return None
+        if unprofiled:
+            log.warning(
+                f"{unprofiled} work units of request {request_id} were not profiled, "
+                "another profiler was running."
+            )
+        log.warning(f"Request {request_id} took {elapsed:.3f}s, profile saved to {path}.")
+        return path
+
+    @staticmethod
+    def _dump_stats(path: Path, profiles: list[cProfile.Profile]) -> bool:
+        """Merge *profiles* into one ``pstats`` file, if any of them recorded calls."""
+        # pstats refuses to load a profile that recorded nothing
+        profiles = [profile for profile in profiles if profile.getstats()]
+        if not profiles:
+            return False
+        pstats.Stats(*profiles).dump_stats(path)
+        return True
@@ -0,0 +1,184 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Low-overhead structured logging of RPC requests.
+
+Requests can carry multi-megabyte programs, QIR bitcode or compiled
+packages, so log lines never format the request itself.  Instead a
+``RequestSummary`` records the request type, payload size, a CRC32 of its
+content and a truncated preview, and is only rendered if a handler actually
+emits the record.  ``RequestLogger`` adds sampling and completion timing.
+"""
+
+import logging
+import random
+import time
+import zlib
+from concurrent.futures import Future
+from typing import Any
+
+from qat.purr.utils.logger import get_default_logger
+
+from qat_rpc.models import (
+    CompileRequest,
+    ConfigRef,
+    ExecuteRequest,
+    ProgramRequest,
+    UploadPackageRequest,
+)
+
+log = get_default_logger()
+
+DEFAULT_SAMPLE_RATE = 1.0
+DEFAULT_MAX_PAYLOAD_CHARS = 120
+
+
+def _info_enabled() -> bool:
+    """Whether any logger behind the (possibly composite) QAT logger emits INFO."""
+    loggers = getattr(log, "loggers", None) or [log]
+    return any(logger.isEnabledFor(logging.INFO) for logger in loggers)
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}...(+{len(text) - max_chars} chars)"
+
+
+class RequestSummary:
+    """Lazily rendered one-line summary of a request (or any raw message).
+
+    Nothing is hashed or formatted until ``str()`` is called, and the result
+    is cached so a summary logged twice is only rendered once.
+    """
+
+    __slots__ = ("_max_payload_chars", "_message", "_text")
+
+    def __init__(self, message: Any, max_payload_chars: int = DEFAULT_MAX_PAYLOAD_CHARS):
+        self._message = message
+        self._max_payload_chars = max_payload_chars
+        self._text: str | None = None
+
+    @staticmethod
+    def payload(message: Any) -> Any:
+        """The bulky part of *message*: its program or package, if any."""
+        match message:
+            case ProgramRequest(program=program) | CompileRequest(program=program):
+                return program
+            case ExecuteRequest(package=package) | UploadPackageRequest(package=package):
+                return package
+            case tuple():
+                # Legacy tuples: the program is the largest text/bytes element
+                sized = [item for item in message if isinstance(item, str | bytes)]
+                return max(sized, key=len, default=None)
+        return None
+
+    def details(self) -> dict[str, Any]:
+        """The request type, payload size and CRC32 as a dict, for structured records."""
+        details: dict[str, Any] = {"type": type(self._message).__name__}
+        payload = self.payload(self._message)
+        if isinstance(payload, str | bytes):
+            raw = payload.encode() if isinstance(payload, str) else payload
+            details["size"] = len(raw)
+            details["crc32"] = f"{zlib.crc32(raw):08x}"
+        return details
+
+    def _fields(self) -> list[str]:
+        message = self._message
+        fields = [f"type={type(message).__name__}"]
+
+        payload = self.payload(message)
+        if isinstance(payload, str | bytes):
+            raw = payload.encode() if isinstance(payload, str) else payload
+            fields.append(f"size={len(raw)}B")
+            # CRC32 is enough to correlate repeated payloads across log lines and is
+            # several times cheaper than a cryptographic digest on multi-MB programs
+            fields.append(f"crc32={zlib.crc32(raw):08x}")
+            preview = payload if isinstance(payload, str) else payload[:64].hex()
+            fields.append(f"payload={_truncate(preview, self._max_payload_chars)!r}")
+        elif payload is not None:
+            fields.append(f"payload=<{type(payload).__name__}>")
+
+        if isinstance(message, tuple) and message and isinstance(message[0], str):
+            fields.append(f"tag={_truncate(message[0], self._max_payload_chars)!r}")
+
+        for name in ("pipeline", "compile_pipeline", "execute_pipeline"):
+            value = getattr(message, name, None)
+            if value is not None:
+                fields.append(f"{name}={value}")
+
+        config = getattr(message, "config", None)
+        if isinstance(config, ConfigRef):
+            fields.append(f"config={config.name}")
+        repeats = getattr(config, "repeats", None)
+        if repeats is not None:
+            fields.append(f"repeats={repeats}")
+        return fields
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = " ".join(self._fields())
+        return self._text
+
+
+class RequestRecord:
+    """Timing handle for one sampled request; logs its completion."""
+
+    __slots__ = ("_started", "_summary")
+
+    def __init__(self, summary: RequestSummary):
+        self._summary = summary
+        self._started = time.perf_counter()
+
+    def finish(self, future: Future | None = None, error: BaseException | None = None):
+        """Log completion, taking the outcome from *future* or *error*."""
+        elapsed_ms = (time.perf_counter() - self._started) * 1000
+        if future is not None and future.cancelled():
+            log.info("Request cancelled: %s after %.3fms", self._summary, elapsed_ms)
+            return
+        if future is not None:
+            error = future.exception()
+        if error is None:
+            log.info("Handled request: %s in %.3fms", self._summary, elapsed_ms)
+        else:
+            log.info(
+                "Request failed: %s after %.3fms (%s)",
+                self._summary,
+                elapsed_ms,
+                type(error).__name__,
+            )
+
+
+class RequestLogger:
+    """Samples requests for structured start/finish log lines.
+
+    :param sample_rate: Fraction of requests logged, between 0 and 1.
+    :param max_payload_chars: Length beyond which payload previews are truncated.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = DEFAULT_SAMPLE_RATE,
+        max_payload_chars: int = DEFAULT_MAX_PAYLOAD_CHARS,
+    ):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f"sample_rate must be between 0 and 1, got {sample_rate}.")
+        self._sample_rate = sample_rate
+        self._max_payload_chars = max_payload_chars
+
+    def summarize(self, message: Any) -> RequestSummary:
+        """A lazily rendered summary of *message* for use as a log argument."""
+        return RequestSummary(message, self._max_payload_chars)
+
+    def start(self, request: Any) -> RequestRecord | None:
+        """Log the start of *request* if sampled, returning a handle to finish it."""
+        if not _info_enabled():
+            return None
+        if self._sample_rate < 1.0 and not self._sampled():
+            return None
+        summary = self.summarize(request)
+        log.info("Handling request: %s", summary)
+        return RequestRecord(summary)
+
+    def _sampled(self) -> bool:
+        # Sampling only thins logs, it needs no cryptographic randomness
+        return random.random() < self._sample_rate  # noqa: S311  # nosec B311
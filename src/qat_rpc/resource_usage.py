@@ -0,0 +1,105 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Per-request CPU time, wall time and peak memory accounting.
+
+Latency metrics say how long a request took; they cannot tell a request
+that kept a core busy from one that waited on hardware, nor find the
+programs that make QAT's pipelines allocate gigabytes.  ``ResourceMeter``
+measures each compile and execute work unit as a ``ResourceUsage``:
+
+* wall and CPU time, from ``time.perf_counter`` and ``time.thread_time``.
+  Each work unit runs on one thread, so its thread's CPU time is the
+  request's, even while other threads are busy.
+* optionally, peak memory from ``tracemalloc``, which noticeably slows
+  allocation-heavy code such as compilation and so is off by default.
+  ``tracemalloc`` has one peak for the whole process: while several work
+  units overlap, each one's peak is an upper bound.
+"""
+
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from qat_rpc.models import ResourceUsage
+
+
+class ResourceMeasurement:
+    """The usage of one ``ResourceMeter.measure()`` block, set when it exits."""
+
+    __slots__ = ("usage",)
+
+    def __init__(self):
+        self.usage: ResourceUsage | None = None
+
+
+class ResourceMeter:
+    """Measures the resources compile and execute work units use.
+
+    :param report: Attach each request's usage to its response as
+        ``diagnostics``.  Usage is measured, and published as metrics,
+        either way.
+    :param track_memory: Measure peak memory too, tracing allocations with
+        ``tracemalloc`` from construction until ``close()``.
+    """
+
+    def __init__(self, report: bool = False, track_memory: bool = False):
+        self._report = report
+        self._track_memory = track_memory
+        self._lock = threading.Lock()
+        self._measuring = 0
+        self._started_tracing = False
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    @property
+    def report(self) -> bool:
+        return self._report
+
+    @property
+    def track_memory(self) -> bool:
+        return self._track_memory
+
+    @contextmanager
+    def measure(self) -> Iterator[ResourceMeasurement]:
+        """Measure the ``with`` block, which must run on one thread."""
+        measurement = ResourceMeasurement()
+        baseline = self._start_memory() if self._track_memory else None
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            yield measurement
+        finally:
+            cpu_time = time.thread_time() - cpu_started
+            wall_time = time.perf_counter() - started
+            measurement.usage = ResourceUsage(
+                wall_time=wall_time,
+                cpu_time=cpu_time,
+                peak_memory=None if baseline is None else self._stop_memory(baseline),
+            )
+
+    def _start_memory(self) -> int | None:
+        """Allocated bytes now, restarting the peak unless it is being measured."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                return None
+            if not self._measuring:
+                tracemalloc.reset_peak()
+            self._measuring += 1
+            return tracemalloc.get_traced_memory()[0]
+
+    def _stop_memory(self, baseline: int) -> int | None:
+        with self._lock:
+            self._measuring -= 1
+            if not tracemalloc.is_tracing():
+                # Stopped by someone else mid-measurement
+                return None
+            return max(0, tracemalloc.get_traced_memory()[1] - baseline)
+
+    def close(self) -> None:
+        """Stop tracing allocations, if this meter started it."""
+        if self._started_tracing:
+            self._started_tracing = False
+            tracemalloc.stop()
@@ -0,0 +1,162 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Simulated hardware latency and faults for load testing in echo mode.
+
+Without ``QAT_CONFIG_PATH`` the server runs QAT's echo pipelines, which
+return at once, so load tests against it say nothing about queueing behind
+a QPU.  A ``Simulation`` given to ``QATServiceHandler`` makes each compile
+and execute take a sampled time instead:
+
+* compile time grows with the program's size and execute time with its
+  shots (``CompilerConfig.repeats``), each scattered log-normally about
+  that median.
+* a fraction of compiles and executes fail, or hang for ``timeout_delay``
+  seconds before failing, holding their stage as a stuck QPU would.
+* a fraction of replies are held back for ``slow_send_delay`` seconds,
+  without occupying either stage.
+
+Settings are validated by ``SimulationSettings``; a ``Simulation`` without
+any does nothing.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, ConfigDict, Field
+
+T = TypeVar("T")
+
+# Shots QAT runs when a config leaves repeats unset
+DEFAULT_SHOTS = 1000
+
+
+class SimulatedFaultError(RuntimeError):
+    """A failure injected by a ``Simulation``."""
+
+
+class LatencyModel(BaseModel):
+    """Median latency ``base + per_unit * units``, scattered by *sigma*.
+
+    *sigma* is the standard deviation of the latency's logarithm; 0 makes
+    every latency the median.
+    """
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    base: float = Field(default=0.0, ge=0.0)
+    per_unit: float = Field(default=0.0, ge=0.0)
+    sigma: float = Field(default=0.0, ge=0.0)
+
+    def sample(self, units: float, rng: random.Random) -> float:
+        median = self.base + self.per_unit * units
+        if self.sigma == 0.0 or median == 0.0:
+            return median
+        return median * rng.lognormvariate(0.0, self.sigma)
+
+
+class SimulationSettings(BaseModel):
+    """What a ``Simulation`` injects; read from JSON such as ``SIMULATION_CONFIG``.
+
+    Compile latency units are kilobytes of program and execute latency
+    units are shots.  Rates are fractions between 0 and 1.
+    """
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    compile_latency: LatencyModel = LatencyModel()
+    execute_latency: LatencyModel = LatencyModel()
+    failure_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+    timeout_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+    timeout_delay: float = Field(default=60.0, ge=0.0)
+    slow_send_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+    slow_send_delay: float = Field(default=1.0, ge=0.0)
+    seed: int | None = None
+
+
+class Simulation:
+    """Injects the latency and faults described by *settings* into a handler.
+
+    :param sleep: Waits for a simulated latency; replaced in tests.
+    """
+
+    def __init__(self, settings: SimulationSettings | None = None, sleep=time.sleep):
+        self._settings = settings
+        self._sleep = sleep
+        # Simulated traffic, not secrets
+        self._rng = random.Random(settings.seed if settings else None)  # noqa: S311  # nosec B311
+        self._lock = threading.Lock()
+        self._timers: set[threading.Timer] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self._settings is not None
+
+    @property
+    def settings(self) -> SimulationSettings | None:
+        return self._settings
+
+    def compile(self, program: str | bytes) -> None:
+        """Take the simulated time to compile *program*, or fail as configured."""
+        if self._settings is not None:
+            settings = self._settings
+            self._work(settings, settings.compile_latency, len(program) / 1024, "compile")
+
+    def execute(self, config: Any) -> None:
+        """Take the simulated time to execute *config*'s shots, or fail as configured."""
+        if self._settings is not None:
+            shots = getattr(config, "repeats", None) or DEFAULT_SHOTS
+            self._work(self._settings, self._settings.execute_latency, shots, "execute")
+
+    def _work(
+        self, settings: SimulationSettings, latency: LatencyModel, units: float, phase: str
+    ) -> None:
+        with self._lock:
+            delay = latency.sample(units, self._rng)
+            draw = self._rng.random()
+        if draw < settings.timeout_rate:
+            self._sleep(settings.timeout_delay)
+            raise SimulatedFaultError(f"Simulated {phase} timeout.")
+        if draw < settings.timeout_rate + settings.failure_rate:
+            raise SimulatedFaultError(f"Simulated {phase} failure.")
+        self._sleep(delay)
+
+    def delay_reply(self, future: Future[T]) -> Future[T]:
+        """*future*, or a copy completing ``slow_send_delay`` seconds after it."""
+        settings = self._settings
+        if settings is None or settings.slow_send_rate == 0.0:
+            return future
+        with self._lock:
+            slow = self._rng.random() < settings.slow_send_rate
+        if not slow:
+            return future
+
+        delayed: Future[T] = Future()
+
+        def _release(done: Future[T], timer: threading.Timer) -> None:
+            error = done.exception()
+            if error is None:
+                delayed.set_result(done.result())
+            else:
+                delayed.set_exception(error)
+            with self._lock:
+                self._timers.discard(timer)
+
+        def _hold(done: Future[T]) -> None:
+            timer = threading.Timer(settings.slow_send_delay, lambda: _release(done, timer))
+            timer.daemon = True
+            with self._lock:
+                self._timers.add(timer)
+            timer.start()
+
+        future.add_done_callback(_hold)
+        return delayed
+
+    def close(self) -> None:
+        """Wait for held-back replies to be released."""
+        with self._lock:
+            timers = list(self._timers)
+        for timer in timers:
+            timer.join()
@@ -0,0 +1,227 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Per-request tracing spans written to local files.
+
+Metrics aggregate; a trace shows where one slow request spent its time.
+Clients attach a request id to each message, and the server records a
+``Span`` for each step of handling it (receiving, decoding, compiling,
+executing, serializing and sending the reply) tagged with that id.
+
+Spans go to a pluggable ``SpanExporter``.  ``JsonLinesSpanExporter`` writes
+one JSON object per line for ad-hoc analysis; ``ChromeTraceSpanExporter``
+writes the trace-event format read by ``chrome://tracing`` and Perfetto.
+Both work offline.  A ``Tracer`` without an exporter records nothing, and
+its spans are a shared no-op context manager.
+"""
+
+import abc
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from qat.purr.utils.logger import get_default_logger
+
+log = get_default_logger()
+
+TRACE_FORMATS = ("jsonl", "chrome")
+
+_NO_SPAN: AbstractContextManager[None] = nullcontext()
+
+
+def new_request_id() -> str:
+    """A random 16 hex character id, unique enough to correlate one request."""
+    return os.urandom(8).hex()
+
+
+class Span(NamedTuple):
+    """A named, timed step in handling one request."""
+
+    name: str
+    request_id: str | None
+    start: float
+    """Wall-clock start, in seconds since the epoch."""
+    duration: float
+    thread: str
+    attributes: dict[str, Any]
+
+
+class SpanExporter(abc.ABC):
+    """Destination for finished spans.  May be called from any thread."""
+
+    @abc.abstractmethod
+    def export(self, span: Span) -> None: ...
+
+    def flush(self) -> None:  # noqa: B027 - optional hook
+        """Write out any buffered spans."""
+
+    def close(self) -> None:
+        self.flush()
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps spans in a list, for tests and interactive use."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+
+class _FileSpanExporter(SpanExporter):
+    """Writes spans as text, one line each, serialized by a lock."""
+
+    def __init__(self, path: Path | str):
+        self._path = Path(path)
+        self._file = self._path.open("w", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def _write(self, line: str) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line)
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class JsonLinesSpanExporter(_FileSpanExporter):
+    """Writes each span as a JSON object on its own line."""
+
+    def export(self, span: Span) -> None:
+        self._write(json.dumps(span._asdict(), default=str) + "\n")
+
+
+class ChromeTraceSpanExporter(_FileSpanExporter):
+    """Writes spans as Chrome trace events, viewable in Perfetto.
+
+    The JSON array format tolerates a missing closing bracket, so the file
+    stays loadable even if the process dies before ``close()``.
+    """
+
+    def __init__(self, path: Path | str):
+        super().__init__(path)
+        self._pid = os.getpid()
+        self._threads: dict[str, int] = {}
+        self._write("[\n")
+
+    def _thread_id(self, name: str) -> int:
+        """Trace events need integer thread ids; names are sent once as metadata."""
+        tid = self._threads.get(name)
+        if tid is None:
+            tid = self._threads.setdefault(name, len(self._threads) + 1)
+            metadata = {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": self._pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            self._write(json.dumps(metadata) + ",\n")
+        return tid
+
+    def export(self, span: Span) -> None:
+        event = {
+            "name": span.name,
+            "ph": "X",
+            "ts": span.start * 1e6,
+            "dur": span.duration * 1e6,
+            "pid": self._pid,
+            "tid": self._thread_id(span.thread),
+            "args": {"request_id": span.request_id, **span.attributes},
+        }
+        self._write(json.dumps(event, default=str) + ",\n")
+
+    def close(self) -> None:
+        # An empty object keeps the array valid JSON despite the trailing comma
+        self._write("{}]\n")
+        super().close()
+
+
+def span_exporter(path: Path | str, trace_format: str = "jsonl") -> SpanExporter:
+    """Build the file exporter for *trace_format* (one of ``TRACE_FORMATS``)."""
+    match trace_format:
+        case "jsonl":
+            return JsonLinesSpanExporter(path)
+        case "chrome":
+            return ChromeTraceSpanExporter(path)
+    raise ValueError(
+        f"Unknown trace format {trace_format!r}, expected one of {TRACE_FORMATS}."
+    )
+
+
+class Tracer:
+    """Records spans to an exporter, or does nothing if it has none.
+
+    Times come from ``time.perf_counter`` and are converted to wall-clock
+    time once per span, so spans from different threads line up.
+    """
+
+    def __init__(self, exporter: SpanExporter | None = None):
+        self._exporter = exporter
+        self._epoch = time.time() - time.perf_counter()
+
+    @property
+    def enabled(self) -> bool:
+        return self._exporter is not None
+
+    def record(
+        self,
+        name: str,
+        request_id: str | None,
+        start: float,
+        end: float,
+        **attributes: Any,
+    ) -> None:
+        """Record a span timed elsewhere; *start* and *end* are ``perf_counter`` values."""
+        if self._exporter is None:
+            return
+        span = Span(
+            name,
+            request_id,
+            self._epoch + start,
+            end - start,
+            threading.current_thread().name,
+            attributes,
+        )
+        try:
+            self._exporter.export(span)
+        except Exception as ex:  # noqa: BLE001 - tracing must never fail a request
+            log.warning(f"Span export errored {ex!s}")
+
+    def span(
+        self, name: str, request_id: str | None, **attributes: Any
+    ) -> AbstractContextManager[None]:
+        """Record the ``with`` block as a span, whether or not it raises."""
+        if self._exporter is None:
+            return _NO_SPAN
+        return self._span(name, request_id, attributes)
+
+    @contextmanager
+    def _span(
+        self, name: str, request_id: str | None, attributes: dict[str, Any]
+    ) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, request_id, start, time.perf_counter(), **attributes)
+
+    def flush(self) -> None:
+        if self._exporter is not None:
+            self._exporter.flush()
+
+    def close(self) -> None:
+        if self._exporter is not None:
+            self._exporter.close()
@@ -1,8 +1,27 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
-"""ZMQ transport layer for QAT RPC."""
+"""ZMQ transport layer for QAT RPC.
 
-from qat_rpc.zmq.client import ZMQClient
-from qat_rpc.zmq.server import ZMQServer
+``ZMQClient`` and ``ZMQServer`` are imported on first use, as they load QAT,
+which would otherwise delay the start of every console script here.
+"""
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from qat_rpc.zmq.client import ZMQClient
+    from qat_rpc.zmq.server import ZMQServer
 
 __all__ = ["ZMQClient", "ZMQServer"]
+
+
+def __getattr__(name: str) -> Any:
+    if name == "ZMQClient":
+        from qat_rpc.zmq.client import ZMQClient
+
+        return ZMQClient
+    if name == "ZMQServer":
+        from qat_rpc.zmq.server import ZMQServer
+
+        return ZMQServer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
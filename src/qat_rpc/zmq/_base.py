@@ -1,13 +1,35 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
-"""Shared ZMQ socket base class."""
+"""Shared ZMQ socket base class and message decoding.
 
+QAT is only imported once something is logged, so that ``qat_comexe`` can
+use this module without waiting for it.
+"""
+
+import logging
+import pickle
+from collections.abc import Callable, Iterable
 from typing import Any
 
 import zmq
-from qat.purr.utils.logger import get_default_logger
 
-log = get_default_logger()
+
+def get_logger() -> logging.Logger:
+    """QAT's default logger, imported on first use."""
+    from qat.purr.utils.logger import get_default_logger
+
+    return get_default_logger()
+
+
+def loads(data: Any, buffers: Iterable[Any] | None = None) -> Any:
+    """Unpickle *data*, with out-of-band *buffers*, as ``recv_pyobj`` would.
+
+    Pickle runs arbitrary code, so this trusts whoever wrote *data*, exactly
+    as ``recv_pyobj`` does: servers trust their clients, clients their
+    server, and captures are read back from files our own servers wrote.
+    Never use it on data from anyone else.
+    """
+    return pickle.loads(data, buffers=buffers)  # noqa: S301  # nosec B301
 
 
 class ZMQBase:
@@ -46,12 +68,35 @@ class ZMQBase:
         seconds.  ``EAGAIN`` raises ``TimeoutError``; ``ETERM`` re-raises
         the underlying ``ZMQError``.
         """
+        return self._receive_with(self._socket.recv_pyobj, timeout)
+
+    def _receive_multipart(self, timeout: float | None = None) -> list[bytes] | None:
+        """Receive a multipart message as raw frames.
+
+        Timeout and error semantics match ``_receive``.
+        """
+        return self._receive_with(self._socket.recv_multipart, timeout)
+
+    def _receive_pickled_frames(self, timeout: float | None = None) -> Any:
+        """Receive a pickled object whose out-of-band buffers follow as frames.
+
+        Single-frame messages decode exactly as ``_receive`` would.  Array
+        buffers are wrapped without copying the received frames.
+        """
+        frames = self._receive_with(
+            lambda *flags: self._socket.recv_multipart(*flags, copy=False), timeout
+        )
+        if frames is None:
+            return None
+        return loads(frames[0].buffer, frames[1:])
+
+    def _receive_with(self, recv: Callable[..., Any], timeout: float | None) -> Any:
         try:
             if timeout is None:
-                msg = self._socket.recv_pyobj(zmq.NOBLOCK)
+                msg = recv(zmq.NOBLOCK)
             else:
                 self._socket.setsockopt(zmq.RCVTIMEO, int(timeout * 1000))
-                msg = self._socket.recv_pyobj()
+                msg = recv()
         except zmq.ZMQError as e:
             if e.errno == zmq.EAGAIN:
                 if timeout is not None:
@@ -63,7 +108,7 @@ class ZMQBase:
             if e.errno == zmq.ETERM:
                 if timeout is not None:
                     raise
-                log.info("Context terminated, shutting down socket.")
+                get_logger().info("Context terminated, shutting down socket.")
                 return None
 
             raise
@@ -72,9 +117,16 @@ class ZMQBase:
 
     def _send(self, obj: Any) -> None:
         """Send a pickled object with a send timeout."""
+        self._send_with(self._socket.send_pyobj, obj)
+
+    def _send_multipart(self, frames: list[bytes]) -> None:
+        """Send raw frames as one multipart message with a send timeout."""
+        self._send_with(self._socket.send_multipart, frames)
+
+    def _send_with(self, send: Callable[[Any], Any], obj: Any) -> None:
         try:
             self._socket.setsockopt(zmq.SNDTIMEO, int(self._timeout * 1000))
-            self._socket.send_pyobj(obj)
+            send(obj)
         except zmq.ZMQError as e:
             if e.errno == zmq.EAGAIN:
                 raise TimeoutError(
@@ -82,7 +134,7 @@ class ZMQBase:
                 ) from e
 
             if e.errno == zmq.ETERM:
-                log.info("Context terminated, cannot send message.")
+                get_logger().info("Context terminated, cannot send message.")
 
             raise
 
@@ -95,10 +147,14 @@ class ZMQBase:
             self._socket.close()
         except zmq.ZMQError as e:
             if e.errno == zmq.ETERM:
-                log.warning(f"Error closing socket: {e}, context already terminated.")
+                get_logger().warning(
+                    f"Error closing socket: {e}, context already terminated."
+                )
 
         try:
             self._context.term()
         except zmq.ZMQError as e:
             if e.errno == zmq.ETERM:
-                log.warning(f"Error terminating context: {e}, context already terminated.")
+                get_logger().warning(
+                    f"Error terminating context: {e}, context already terminated."
+                )
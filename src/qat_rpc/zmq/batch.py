@@ -0,0 +1,158 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Batch submission of program files, for ``qat_comexe`` given many programs.
+
+Programs are named by paths, glob patterns or a manifest file listing
+either, one per line.  Each program is read only when a connection is free
+to send it, and its result is written as a JSON line as soon as it arrives,
+so results stream in completion order rather than input order.  Each line
+carries the program's ``index`` in the expanded input, its path and latency,
+and either its ``results`` or an ``error``.
+
+A summary of throughput and latency percentiles, grouped by file type,
+follows once every program has completed (see ``qat_rpc.zmq.loadgen``).
+"""
+
+import glob
+import json
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from pathlib import Path
+from typing import IO, Any
+
+from qat_rpc.zmq.client import ZMQClient
+from qat_rpc.zmq.client_cli import read_program_file
+from qat_rpc.zmq.loadgen import Sample, summarize
+
+GLOB_CHARS = frozenset("*?[")
+
+
+def expand_programs(patterns: Iterable[str], manifest: Path | None = None) -> list[Path]:
+    """Expand *patterns*, then the lines of *manifest*, into program paths.
+
+    Patterns expand in sorted order, and a path named twice is submitted
+    twice.  Manifest lines are relative to the manifest's directory; blank
+    lines and lines starting with ``#`` are skipped.
+
+    Raises:
+        FileNotFoundError: If a path does not exist or a pattern matches nothing.
+    """
+    entries = [(pattern, Path()) for pattern in patterns]
+    if manifest is not None:
+        lines = manifest.read_text().splitlines()
+        entries += [
+            (line.strip(), manifest.parent)
+            for line in lines
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+    paths = []
+    for entry, base in entries:
+        path = base / entry
+        if GLOB_CHARS.isdisjoint(entry) or path.is_file():
+            if not path.is_file():
+                raise FileNotFoundError(f"Program file not found: {path}")
+            paths.append(path)
+            continue
+        matches = sorted(Path(match) for match in glob.glob(str(path), recursive=True))
+        matches = [match for match in matches if match.is_file()]
+        if not matches:
+            raise FileNotFoundError(f"No program files match {path}")
+        paths += matches
+    return paths
+
+
+def run_batch(
+    client_factory: Callable[[], ZMQClient],
+    paths: Sequence[Path],
+    config: str | None,
+    output: IO[str],
+    connections: int = 4,
+) -> dict[str, Any]:
+    """Execute each of *paths* with *config*, streaming JSON lines to *output*.
+
+    At most *connections* programs are in flight, one per ``ZMQClient``.  A
+    client that raises, such as on a timeout, is replaced.  Returns a
+    ``summarize`` report, with latencies measured from each program's send.
+    """
+    if connections < 1:
+        raise ValueError(f"connections must be at least 1, got {connections}.")
+    pending: queue.SimpleQueue[tuple[int, Path] | None] = queue.SimpleQueue()
+    samples: list[Sample] = []
+    lock = threading.Lock()
+
+    def _write(sample: Sample, line: dict[str, Any]) -> None:
+        try:
+            text = json.dumps(line, default=str)
+        except TypeError:
+            # Some result formats key counts by tuples, which JSON cannot
+            text = json.dumps(_with_str_keys(line), default=str)
+        with lock:
+            samples.append(sample)
+            output.write(text + "\n")
+            output.flush()
+
+    workers = [
+        threading.Thread(
+            target=_work,
+            args=(client_factory, pending, config, _write),
+            name=f"qat-batch-{i}",
+        )
+        for i in range(min(connections, len(paths)))
+    ]
+    for item in enumerate(paths):
+        pending.put(item)
+    for _ in workers:
+        pending.put(None)
+
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return summarize(samples, time.perf_counter() - start)
+
+
+def _with_str_keys(value: Any) -> Any:
+    """*value* with the keys of every nested dict turned into strings."""
+    if isinstance(value, dict):
+        return {str(key): _with_str_keys(item) for key, item in value.items()}
+    if isinstance(value, list | tuple):
+        return [_with_str_keys(item) for item in value]
+    return value
+
+
+def _work(
+    client_factory: Callable[[], ZMQClient],
+    pending: "queue.SimpleQueue[tuple[int, Path] | None]",
+    config: str | None,
+    write: Callable[[Sample, dict[str, Any]], None],
+) -> None:
+    client = client_factory()
+    try:
+        while (item := pending.get()) is not None:
+            index, path = item
+            kind = path.suffix.lstrip(".") or "program"
+            line: dict[str, Any] = {"index": index, "program": str(path)}
+            try:
+                program = read_program_file(path)
+            except OSError as e:
+                line["error"] = f"{type(e).__name__}: {e}"
+                write(Sample(kind, 0.0, type(e).__name__), {**line, "latency": 0.0})
+                continue
+            started = time.perf_counter()
+            try:
+                reply = client.execute_task(program, config)
+            except Exception as e:  # noqa: BLE001 - reported as a failed program
+                error = type(e).__name__
+                line["error"] = f"{error}: {e}"
+                client.close()
+                client = client_factory()
+            else:
+                error = "server_error" if "Exception" in reply else None
+                line.update({"error": reply["Exception"]} if error else {"results": reply})
+            latency = time.perf_counter() - started
+            write(Sample(kind, latency, error), {**line, "latency": latency})
+    finally:
+        client.close()
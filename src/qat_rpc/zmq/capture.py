@@ -0,0 +1,137 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Capture of the requests a server handles, for replay against another server.
+
+Synthetic load rarely matches the mix of programs, sizes and bursts real
+clients send.  A ``TrafficRecorder`` given to ``ZMQServer`` appends a
+sample of the requests it replies to, with when each arrived and how long
+the server took, to a capture file that ``qat_replay`` sends again.
+
+The file is a header followed by length-prefixed pickled records, so it
+can be appended to across server restarts and read back up to a record
+cut short by a crash.  Requests are stored as compact envelopes (see
+``qat_rpc.zmq.wire``).  Handshakes and admin requests are not captured.
+"""
+
+import pickle
+import random
+import struct
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO, Any, NamedTuple
+
+from qat_rpc.models import HelloRequest, ProfileRequest, ReloadHardwareRequest, Request
+from qat_rpc.zmq._base import loads
+from qat_rpc.zmq.wire import decode_request, encode_request
+
+CAPTURE_HEADER = b"qat-rpc/capture/1\n"
+
+_LENGTH = struct.Struct(">I")
+
+# Transport and admin requests, which would change the replay server itself
+_NOT_CAPTURED = (HelloRequest, ProfileRequest, ReloadHardwareRequest)
+
+
+class CaptureRecord(NamedTuple):
+    """One captured request.
+
+    :param timestamp: When the server received it, in seconds since the epoch.
+    :param elapsed: Seconds from receipt until the server sent its reply.
+    :param response: The reply frames, if responses were captured.
+    """
+
+    timestamp: float
+    request_type: str
+    payload: bytes
+    elapsed: float
+    failed: bool
+    response: list[bytes] | None = None
+
+    def request(self) -> Request:
+        """The captured request, rebuilt from its compact envelope."""
+        return decode_request(self.payload)
+
+
+class TrafficRecorder:
+    """Appends a sample of handled requests to a capture file.
+
+    Does nothing without a *path*.  Called from the server loop only.
+
+    :param sample_rate: Fraction of requests captured, between 0 and 1.
+    :param record_responses: Capture each reply's frames as well.
+    """
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        sample_rate: float = 1.0,
+        record_responses: bool = False,
+    ):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f"sample_rate must be between 0 and 1, got {sample_rate}.")
+        self._sample_rate = sample_rate
+        self._record_responses = record_responses
+        self._epoch = time.time() - time.perf_counter()
+        self._file: IO[bytes] | None = None
+        if path is not None:
+            self._file = open(path, "ab")  # noqa: SIM115 - held open until close()
+            if self._file.tell() == 0:
+                self._file.write(CAPTURE_HEADER)
+
+    @property
+    def enabled(self) -> bool:
+        return self._file is not None
+
+    def record(
+        self,
+        request: Request | None,
+        received: float,
+        sent: float,
+        failed: bool,
+        reply: list[Any],
+    ) -> None:
+        """Capture *request* if sampled; times are ``perf_counter`` values."""
+        if (
+            self._file is None
+            or request is None
+            or isinstance(request, _NOT_CAPTURED)
+            or (self._sample_rate < 1.0 and not self._sampled())
+        ):
+            return
+        record = CaptureRecord(
+            self._epoch + received,
+            type(request).__name__,
+            encode_request(request),
+            sent - received,
+            failed,
+            [bytes(frame) for frame in reply] if self._record_responses else None,
+        )
+        data = pickle.dumps(tuple(record), protocol=pickle.DEFAULT_PROTOCOL)
+        self._file.write(_LENGTH.pack(len(data)) + data)
+
+    def _sampled(self) -> bool:
+        # Sampling only thins the capture, it needs no cryptographic randomness
+        return random.random() < self._sample_rate  # noqa: S311  # nosec B311
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_capture(path: Path | str) -> Iterator[CaptureRecord]:
+    """Read the records in a capture file, stopping at a truncated last record."""
+    with open(path, "rb") as capture:
+        if capture.read(len(CAPTURE_HEADER)) != CAPTURE_HEADER:
+            raise ValueError(f"{path} is not a request capture file.")
+        while len(prefix := capture.read(_LENGTH.size)) == _LENGTH.size:
+            (length,) = _LENGTH.unpack(prefix)
+            data = capture.read(length)
+            if len(data) < length:
+                return
+            yield CaptureRecord(*loads(data))
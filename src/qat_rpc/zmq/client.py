@@ -2,26 +2,47 @@
 # Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
 """ZMQ REQ client for QAT RPC."""
 
-from typing import Any
+import pickle
+from typing import Any, Literal
 
 import zmq
 from compiler_config.config import CompilerConfig
 from qat.executables import Executable
 from qat.purr.compiler.builders import InstructionBuilder
 
+from qat_rpc.config_presets import config_from_json
 from qat_rpc.models import (
     CompilePipelinesRequest,
     CompileRequest,
+    ConfigRef,
     CouplingsRequest,
     ExecutePipelinesRequest,
     ExecuteRequest,
+    HelloRequest,
+    PackageRef,
+    ProfileRequest,
     ProgramRequest,
     QpuInfoRequest,
     QubitInfoRequest,
+    RegisterConfigRequest,
+    ReloadHardwareRequest,
     Request,
+    UploadPackageRequest,
     VersionRequest,
 )
+from qat_rpc.tracing import Tracer, new_request_id
 from qat_rpc.zmq._base import ZMQBase
+from qat_rpc.zmq.wire import (
+    CODECS,
+    COMPACT_HEADER,
+    COMPRESSIONS,
+    FEATURES,
+    PROTOCOL_VERSION,
+    REQUEST_ID_HEADER,
+    choose_codec,
+    encode_request,
+    hello_message,
+)
 
 
 class ZMQClient(ZMQBase):
@@ -30,6 +51,23 @@ class ZMQClient(ZMQBase):
     Each public method constructs the appropriate ``Request``, sends it,
     and blocks until the server replies.  Responses are always plain dicts
     (see ``ZMQServer._serialize_response``).
+
+    :param compact: Send requests as compact tagged envelopes (``True``) or
+        pickled models (``False``).  By default the client sends a ``hello``
+        handshake before its first request and uses the fastest codec the
+        server supports, falling back to pickled models for servers that
+        predate the handshake.  The result is cached for the connection.
+    :param tracer: Records a ``client.request`` span for each request, from
+        sending it to receiving the reply, tagged with its request id.
+
+    Each request gets a fresh id, available afterwards as
+    ``last_request_id``; servers that support it tag their tracing spans
+    with the same id.
+
+    Packages sent with ``upload_package`` and configs sent with
+    ``register_config`` are remembered by the client, so using a
+    ``PackageRef`` or ``ConfigRef`` the server has since evicted sends it
+    again and retries transparently.
     """
 
     def __init__(
@@ -37,34 +75,109 @@ class ZMQClient(ZMQBase):
         client_ip: str = "127.0.0.1",
         client_port: int = 5556,
         timeout: float = 30.0,
+        compact: bool | None = None,
+        tracer: Tracer | None = None,
     ):
         super().__init__(
             socket_type=zmq.REQ, ip_address=client_ip, port=client_port, timeout=timeout
         )
+        self._codec = None if compact is None else ("compact" if compact else "pickle")
+        self._capabilities: dict[str, Any] | None = None
+        self._uploads: dict[str, InstructionBuilder | Executable | str] = {}
+        self._configs: dict[str, tuple[CompilerConfig, str | None]] = {}
+        self._tracer = tracer or Tracer()
+        self.last_request_id: str | None = None
         self._socket.connect(self.address)
 
     def _await_results(self) -> dict[str, Any]:
         """Block until the server replies, raising on timeout."""
-        return self._receive(timeout=self._timeout)
+        return self._receive_pickled_frames(timeout=self._timeout)
+
+    @property
+    def capabilities(self) -> dict[str, Any]:
+        """The server's reply to the ``hello`` handshake, performed on first use.
+
+        Empty for servers that predate the handshake.
+        """
+        if self._capabilities is None:
+            self._negotiate()
+        return self._capabilities or {}
+
+    def _negotiate(self) -> None:
+        """Exchange capabilities with the server and pick a codec if not fixed."""
+        hello = HelloRequest(
+            protocol_version=PROTOCOL_VERSION,
+            codecs=CODECS,
+            compressions=COMPRESSIONS,
+            features=FEATURES,
+        )
+        self._send(hello_message(hello))
+        reply = self._await_results()
+        # Older servers reply with an "unrecognized message" error
+        self._capabilities = reply if "protocol_version" in reply else {}
+        if self._codec is None:
+            self._codec = choose_codec(self._capabilities)
 
     def _send_and_receive(self, request: Request) -> dict[str, Any]:
-        """Send a request and return the server's reply."""
-        self._send(request)
-        return self._await_results()
+        """Send a request with the negotiated codec and return the server's reply."""
+        if self._codec is None:
+            self._negotiate()
+        if self._codec == "compact":
+            frames = [COMPACT_HEADER, encode_request(request)]
+        else:
+            frames = [pickle.dumps(request, protocol=pickle.DEFAULT_PROTOCOL)]
+
+        capabilities = self._capabilities or {}
+        limit = capabilities.get("max_message_size")
+        if limit is not None and any(len(frame) > limit for frame in frames):
+            # The server would drop the connection and leave us waiting for a reply
+            raise ValueError(
+                f"{type(request).__name__} exceeds the server's {limit} byte message limit."
+            )
+
+        request_id = self.last_request_id = new_request_id()
+        if "request_id" in capabilities.get("features", ()):
+            frames = [REQUEST_ID_HEADER, request_id.encode("ascii"), *frames]
+        with self._tracer.span(
+            "client.request", request_id, request_type=type(request).__name__
+        ):
+            self._send_multipart(frames)
+            return self._await_results()
+
+    def _send_and_retry(self, request: Request) -> dict[str, Any]:
+        """Send *request*, re-sending an evicted package or config and retrying once."""
+        response = self._send_and_receive(request)
+
+        update: dict[str, Any] = {}
+        package = self._uploads.get(response.get("package_not_found", ""))
+        if package is not None:
+            update["package"] = self.upload_package(package)
+        registered = self._configs.get(response.get("config_not_found", ""))
+        if registered is not None:
+            update["config"] = self.register_config(*registered)
+        if update:
+            response = self._send_and_receive(request.model_copy(update=update))
+        return response
 
     @staticmethod
-    def _build_config(config: CompilerConfig | str | None) -> CompilerConfig:
-        """Normalise *config* to a ``CompilerConfig``, applying defaults when ``None``."""
+    def _build_config(
+        config: CompilerConfig | ConfigRef | str | None,
+    ) -> CompilerConfig | ConfigRef:
+        """Normalise *config* for a request, applying defaults when ``None``.
+
+        JSON strings are parsed once and reused: the client only pickles them.
+        """
         if isinstance(config, str):
-            return CompilerConfig.create_from_json(config)
+            return config_from_json(config, shared=True)
         return config or CompilerConfig()
 
     def execute_task(
         self,
         program: str | bytes,
-        config: CompilerConfig | str | None = None,
+        config: CompilerConfig | ConfigRef | str | None = None,
         compile_pipeline: str | None = None,
         execute_pipeline: str | None = None,
+        packed_results: bool = False,
     ) -> dict[str, Any]:
         """Compile and execute a program.
 
@@ -72,20 +185,24 @@ class ZMQClient(ZMQBase):
 
         :param program: An OpenQASM 2.0, OpenQASM 3.0, or QIR program.
             Accepts a source string (QASM / QIR text) or raw QIR bitcode bytes.
+        :param packed_results: Return counts and readouts as ``CountsArray`` /
+            ``ReadoutArray`` values; ``qat_rpc.models.unpack_results`` converts
+            them back to the usual dicts and lists.
         """
-        return self._send_and_receive(
+        return self._send_and_retry(
             ProgramRequest(
                 program=program,
                 config=self._build_config(config),
                 compile_pipeline=compile_pipeline,
                 execute_pipeline=execute_pipeline,
+                packed_results=packed_results,
             )
         )
 
     def compile_program(
         self,
         program: str | bytes,
-        config: CompilerConfig | str | None = None,
+        config: CompilerConfig | ConfigRef | str | None = None,
         pipeline: str | None = None,
     ) -> dict[str, Any]:
         """Compile a program, optionally targeting a specific pipeline.
@@ -93,7 +210,7 @@ class ZMQClient(ZMQBase):
         :param program: An OpenQASM 2.0, OpenQASM 3.0, or QIR program.
             Accepts a source string (QASM / QIR text) or raw QIR bitcode bytes.
         """
-        return self._send_and_receive(
+        return self._send_and_retry(
             CompileRequest(
                 program=program,
                 config=self._build_config(config),
@@ -103,19 +220,60 @@ class ZMQClient(ZMQBase):
 
     def execute_compiled(
         self,
-        compiled_program: InstructionBuilder | Executable | str,
-        config: CompilerConfig | str | None = None,
+        compiled_program: InstructionBuilder | Executable | str | PackageRef,
+        config: CompilerConfig | ConfigRef | str | None = None,
         pipeline: str | None = None,
+        packed_results: bool = False,
     ) -> dict[str, Any]:
-        """Execute a pre-compiled program, optionally targeting a specific pipeline."""
-        return self._send_and_receive(
+        """Execute a pre-compiled program, optionally targeting a specific pipeline.
+
+        *compiled_program* may be a ``PackageRef`` from ``upload_package``.
+        *packed_results* behaves as for ``execute_task``.
+        """
+        return self._send_and_retry(
             ExecuteRequest(
                 package=compiled_program,
                 config=self._build_config(config),
                 pipeline=pipeline,
+                packed_results=packed_results,
             )
         )
 
+    def upload_package(self, package: InstructionBuilder | Executable | str) -> PackageRef:
+        """Store a compiled package on the server for execution by reference.
+
+        Pass the returned ``PackageRef`` to ``execute_compiled`` to run the
+        package without sending it again.
+        """
+        response = self._send_and_receive(UploadPackageRequest(package=package))
+        if "package_digest" not in response:
+            raise RuntimeError(f"Package upload failed: {response.get('Exception')}")
+        ref = PackageRef(digest=response["package_digest"])
+        self._uploads[ref.digest] = package
+        return ref
+
+    def register_config(
+        self, config: CompilerConfig | str, name: str | None = None
+    ) -> ConfigRef:
+        """Store a config on the server as a preset for reference by ``ConfigRef``.
+
+        The preset is named by its content hash unless *name* is given.  Pass
+        the returned ``ConfigRef`` as the *config* of later requests to
+        avoid sending the full config each time.
+        """
+        if isinstance(config, str):
+            config = config_from_json(config, shared=True)
+        response = self._send_and_receive(RegisterConfigRequest(config=config, name=name))
+        if "config_name" not in response:
+            raise RuntimeError(f"Config registration failed: {response.get('Exception')}")
+        ref = ConfigRef(name=response["config_name"])
+        self._configs[ref.name] = (config, name)
+        return ref
+
+    def send_request(self, request: Request) -> dict[str, Any]:
+        """Send a prebuilt request, such as one read from a capture, as it is."""
+        return self._send_and_receive(request)
+
     def api_version(self) -> dict[str, Any]:
         """Request the server's API version."""
         return self._send_and_receive(VersionRequest())
@@ -139,3 +297,27 @@ class ZMQClient(ZMQBase):
     def execute_pipelines(self) -> dict[str, Any]:
         """Request the list of available execute pipelines."""
         return self._send_and_receive(ExecutePipelinesRequest())
+
+    def reload_hardware(self) -> dict[str, Any]:
+        """Ask the server to reload its hardware models from calibration.
+
+        The server keeps serving requests while the reload runs; this call
+        blocks until the new hardware has been swapped in.
+        """
+        return self._send_and_receive(ReloadHardwareRequest())
+
+    def start_profiling(
+        self, kind: Literal["cpu", "memory"] = "cpu", duration: float | None = None
+    ) -> dict[str, Any]:
+        """Start a ``cpu`` or ``memory`` profiling window on the server.
+
+        The window runs until ``stop_profiling`` or, given *duration*, for
+        that many seconds, and is written to the server's profile directory.
+        """
+        return self._send_and_receive(
+            ProfileRequest(action="start", kind=kind, duration=duration)
+        )
+
+    def stop_profiling(self) -> dict[str, Any]:
+        """Stop the server's profiling window; the reply names the file written."""
+        return self._send_and_receive(ProfileRequest(action="stop"))
@@ -2,28 +2,53 @@
 # Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
 """Command-line interface for submitting programs to a QAT RPC server.
 
-Exposed as the ``qat_comexe`` console script.
+Exposed as the ``qat_comexe`` console script.  Given a single program it
+prints the result.  Given several program files, glob patterns or a
+``--manifest``, it submits them over ``--connections`` concurrent
+connections and streams each result as a JSON line (see
+``qat_rpc.zmq.batch``), followed by a summary on stderr.
+
+Importing QAT takes seconds, so a single program is sent as a legacy
+``("program", program, config)`` tuple, which every server accepts and
+which needs neither QAT nor the request models.  ``--config`` may be a
+serialized ``CompilerConfig`` or a JSON object of its fields, such as
+``{"repeats": 100}``; either is turned into ``CompilerConfig`` JSON with
+``compiler_config`` alone.  QAT is only imported for batches, and to log
+errors.
 """
 
 import argparse
+import glob
+import json
 import sys
 from pathlib import Path
+from typing import Any
 
-from qat.purr.utils.logger import get_default_logger
-
-from qat_rpc.zmq.client import ZMQClient
+import zmq
+from compiler_config.config import CompilerConfig
 
-log = get_default_logger()
+from qat_rpc.zmq._base import get_logger, loads
 
 parser = argparse.ArgumentParser(
     prog="QAT submission service",
     description="Submit your QASM or QIR program to QAT RPC Server.",
 )
 parser.add_argument(
-    "program", type=str, help="Program string or path to program file (.qasm, .ll, .bc)."
+    "program",
+    type=str,
+    nargs="*",
+    help=(
+        "Program string or path to program file (.qasm, .ll, .bc). Several files "
+        "or glob patterns are submitted as a batch."
+    ),
 )
 parser.add_argument(
-    "--config", type=str, help="Serialized CompilerConfig JSON or path to JSON file."
+    "--config",
+    type=str,
+    help=(
+        "Serialized CompilerConfig JSON, a JSON object of its fields, or a path to "
+        "either in a file."
+    ),
 )
 parser.add_argument(
     "--host",
@@ -32,6 +57,28 @@ parser.add_argument(
     help="Server IP address (default: 127.0.0.1)",
 )
 parser.add_argument("--port", type=int, default=5556, help="Server port (default: 5556)")
+parser.add_argument(
+    "--timeout",
+    type=float,
+    default=30.0,
+    help="Per-request timeout in seconds (default: 30)",
+)
+parser.add_argument(
+    "--manifest",
+    type=Path,
+    help="File listing program paths or glob patterns to submit, one per line.",
+)
+parser.add_argument(
+    "--connections",
+    type=int,
+    default=4,
+    help="Programs in flight at once in a batch (default: 4)",
+)
+parser.add_argument(
+    "--output",
+    type=str,
+    help="Write batch results to this JSON lines file instead of stdout.",
+)
 
 
 def _read_file_or_string(value: str, label: str) -> str | bytes:
@@ -47,34 +94,134 @@ def _read_file_or_string(value: str, label: str) -> str | bytes:
     path = Path(value)
     if path.is_file():
         try:
-            if path.suffix == ".bc":
-                return path.read_bytes()
-            return path.read_text()
+            return read_program_file(path)
         except Exception:
+            log = get_logger()
             log.exception(f"Failed to read {label} file '{value}'")
             sys.exit(1)
     return value
 
 
+def read_program_file(path: Path) -> str | bytes:
+    """Read *path*, as `bytes` for QIR bitcode (`.bc`) and as text otherwise."""
+    if path.suffix == ".bc":
+        return path.read_bytes()
+    return path.read_text()
+
+
+def _config_json(config: str | None) -> str:
+    """``CompilerConfig`` JSON for *config*, serialized or given as a dict of fields.
+
+    Raises:
+        ValueError: If *config* is not JSON or names unknown fields.
+        TypeError: If *config* is JSON but not an object.
+    """
+    if config is None:
+        return CompilerConfig().to_json()
+    fields = json.loads(config)
+    if not isinstance(fields, dict):
+        raise TypeError(f"Config must be a JSON object, got {config!r}.")
+    if "$type" in fields:
+        return config
+    try:
+        return CompilerConfig(**fields).to_json()
+    except TypeError as e:
+        raise ValueError(f"Invalid CompilerConfig fields in {config!r}: {e}") from None
+
+
+def _execute_program(
+    host: str, port: int, program: str | bytes, config: str, timeout: float = 30.0
+) -> dict[str, Any]:
+    """Execute *program* with *config* JSON over a plain REQ socket and return the reply.
+
+    Raises:
+        TimeoutError: If the request is not sent or answered within *timeout* seconds.
+    """
+    context = zmq.Context()
+    socket = context.socket(zmq.REQ)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.setsockopt(zmq.SNDTIMEO, int(timeout * 1000))
+    socket.setsockopt(zmq.RCVTIMEO, int(timeout * 1000))
+    address = f"tcp://{host}:{port}"
+    try:
+        socket.connect(address)
+        socket.send_pyobj(("program", program, config))
+        frames = socket.recv_multipart(copy=False)
+    except zmq.Again as e:
+        raise TimeoutError(f"No reply from {address} after {timeout} seconds.") from e
+    finally:
+        socket.close()
+        context.term()
+    return loads(frames[0].buffer, frames[1:])
+
+
+def _is_batch(args: argparse.Namespace) -> bool:
+    """Whether *args* name several programs, a manifest, or a pattern matching files."""
+    if args.manifest is not None or len(args.program) > 1:
+        return True
+    [program] = args.program
+    return not Path(program).is_file() and any(
+        Path(match).is_file() for match in glob.iglob(program, recursive=True)
+    )
+
+
 def qat_run(args=None):
     """CLI entrypoint - parse arguments, connect, and execute."""
     args = parser.parse_args(args)
+    if not args.program and args.manifest is None:
+        parser.error("a program or --manifest is required.")
+    if args.connections < 1:
+        parser.error(f"--connections must be at least 1, got {args.connections}.")
 
-    program = _read_file_or_string(args.program, "program")
-    config: str | None = (
-        str(_read_file_or_string(args.config, "config"))
-        if args.config is not None
-        else None
-    )
+    try:
+        config = _config_json(
+            str(_read_file_or_string(args.config, "config"))
+            if args.config is not None
+            else None
+        )
+    except (TypeError, ValueError) as e:
+        parser.error(f"--config: {e}")
+    if _is_batch(args):
+        _run_batch(args, config)
+        return
+
+    program = _read_file_or_string(args.program[0], "program")
 
     # Connect to server and execute
     try:
-        zmq_client = ZMQClient(client_ip=args.host, client_port=args.port)
-        results = zmq_client.execute_task(program, config)
+        results = _execute_program(args.host, args.port, program, config, args.timeout)
         print(results)
     except TimeoutError:
+        log = get_logger()
         log.exception("Server connection timeout")
         sys.exit(1)
     except Exception:
+        log = get_logger()
         log.exception("Execution failed")
         sys.exit(1)
+
+
+def _run_batch(args: argparse.Namespace, config: str) -> None:
+    """Submit every program *args* name, exiting with 1 if any failed."""
+    # Imported here, as they load QAT and the batch runner builds on this module
+    from qat_rpc.zmq.batch import ZMQClient, expand_programs, run_batch
+    from qat_rpc.zmq.loadgen import format_report
+
+    try:
+        paths = expand_programs(args.program, args.manifest)
+    except OSError as e:
+        parser.error(str(e))
+
+    def connect() -> ZMQClient:
+        return ZMQClient(client_ip=args.host, client_port=args.port, timeout=args.timeout)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            report = run_batch(connect, paths, config, output, args.connections)
+    else:
+        report = run_batch(connect, paths, config, sys.stdout, args.connections)
+
+    print(format_report(report), file=sys.stderr)
+    if report["errors"]:
+        get_logger().error(f"{report['errors']} of {report['requests']} programs failed.")
+        sys.exit(1)
@@ -0,0 +1,379 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Open-loop load generator for a QAT RPC server.
+
+Exposed as the ``qat_loadgen`` console script.  Sends a weighted mix of
+program, compile and metadata requests at a target arrival rate over many
+connections, then reports throughput, latency percentiles and error rates.
+
+Requests are sent on a schedule fixed in advance, however quickly the server
+replies, and each latency is measured from the request's scheduled send
+time.  A closed-loop generator, which waits for one reply before sending
+the next request, slows down with the server and so leaves out the time
+requests would have spent queueing (coordinated omission); here a server
+that cannot keep up shows as growing latency.
+
+Against a server started without ``QAT_CONFIG_PATH`` it exercises QAT's
+echo pipelines, so no hardware is needed.
+"""
+
+import argparse
+import json
+import math
+import queue
+import random
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from itertools import count, cycle, takewhile
+from operator import methodcaller
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from qat.purr.utils.logger import get_default_logger
+
+from qat_rpc.zmq.client import ZMQClient
+from qat_rpc.zmq.client_cli import _read_file_or_string
+
+log = get_default_logger()
+
+REQUEST_KINDS = ("program", "compile", "metadata")
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+DEFAULT_MIX = "program=1,compile=1,metadata=2"
+
+# Metadata requests cycle through the queries every server answers
+_METADATA = ("api_version", "qpu_couplings", "qpu_info", "compile_pipelines")
+
+DEFAULT_PROGRAM = """
+OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[2];
+h q;
+creg c[2];
+measure q->c;
+"""
+
+
+class Sample(NamedTuple):
+    """One completed request: its kind, latency in seconds and any error."""
+
+    kind: str
+    latency: float
+    error: str | None = None
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """Parse request weights such as ``program=1,metadata=4``.
+
+    Kinds left out get no traffic.
+    """
+    mix: dict[str, float] = {}
+    for item in text.split(","):
+        kind, _, weight = item.strip().partition("=")
+        if kind not in REQUEST_KINDS:
+            raise ValueError(
+                f"Unknown request kind {kind!r}, expected one of {REQUEST_KINDS}."
+            )
+        try:
+            mix[kind] = float(weight or 1)
+        except ValueError:
+            raise ValueError(f"Invalid weight for {kind}: {weight!r}.") from None
+        if mix[kind] < 0:
+            raise ValueError(f"Weight for {kind} must not be negative, got {weight}.")
+    if not any(mix.values()):
+        raise ValueError(f"Request mix {text!r} has no positive weights.")
+    return mix
+
+
+def arrival_times(
+    rate: float, duration: float, poisson: bool = True, rng: random.Random | None = None
+) -> list[float]:
+    """Send times, in seconds from the start, for *rate* requests per second.
+
+    Poisson arrivals have exponentially distributed gaps, as independent
+    clients do; otherwise requests are evenly spaced.
+    """
+    if rate <= 0:
+        raise ValueError(f"rate must be positive, got {rate}.")
+    # Random numbers only shape the traffic
+    rng = rng or random.Random()  # noqa: S311  # nosec B311
+    if not poisson:
+        return list(takewhile(lambda t: t < duration, (i / rate for i in count())))
+    times = []
+    now = rng.expovariate(rate)
+    while now < duration:
+        times.append(now)
+        now += rng.expovariate(rate)
+    return times
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """The *q*-th percentile of the sorted *ordered*, by nearest rank."""
+    if not ordered:
+        return float("nan")
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _latency_summary(latencies: Iterable[float]) -> dict[str, float]:
+    ordered = sorted(latencies)
+    summary = {f"p{q:g}": percentile(ordered, q) for q in PERCENTILES}
+    summary["max"] = ordered[-1] if ordered else float("nan")
+    summary["mean"] = sum(ordered) / len(ordered) if ordered else float("nan")
+    return summary
+
+
+def summarize(samples: list[Sample], elapsed: float) -> dict[str, Any]:
+    """Throughput, latency percentiles and error rates of a run, as plain data.
+
+    Latencies include failed requests, as timeouts are part of the tail.
+    """
+    errors = Counter(sample.error for sample in samples if sample.error is not None)
+    by_kind: dict[str, dict[str, Any]] = {}
+    for kind in sorted({sample.kind for sample in samples}):
+        of_kind = [sample for sample in samples if sample.kind == kind]
+        by_kind[kind] = {
+            "requests": len(of_kind),
+            "errors": sum(sample.error is not None for sample in of_kind),
+            "latency": _latency_summary(sample.latency for sample in of_kind),
+        }
+    return {
+        "requests": len(samples),
+        "elapsed": elapsed,
+        "throughput": len(samples) / elapsed if elapsed > 0 else 0.0,
+        "errors": sum(errors.values()),
+        "error_rate": sum(errors.values()) / len(samples) if samples else 0.0,
+        "errors_by_type": dict(errors),
+        "latency": _latency_summary(sample.latency for sample in samples),
+        "by_kind": by_kind,
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    """Render a ``summarize`` report as a text table."""
+    columns = [f"p{q:g}" for q in PERCENTILES] + ["max"]
+    lines = [
+        (
+            f"requests: {report['requests']} in {report['elapsed']:.1f}s "
+            f"({report['throughput']:.1f}/s)"
+        ),
+        f"errors: {report['errors']} ({report['error_rate']:.2%})"
+        + "".join(
+            f", {error}={count}" for error, count in report["errors_by_type"].items()
+        ),
+        f"{'latency (ms)':<12}{'requests':>10}" + "".join(f"{c:>10}" for c in columns),
+    ]
+    rows = [("all", report["requests"], report["latency"])] + [
+        (kind, stats["requests"], stats["latency"])
+        for kind, stats in report["by_kind"].items()
+    ]
+    for name, requests, latency in rows:
+        lines.append(
+            f"{name:<12}{requests:>10}"
+            + "".join(f"{latency[c] * 1e3:>10.2f}" for c in columns)
+        )
+    return "\n".join(lines)
+
+
+class ScheduledRequest(NamedTuple):
+    """A request to send *offset* seconds into a run, by calling *send* on a client."""
+
+    offset: float
+    kind: str
+    send: Callable[[ZMQClient], Any]
+
+
+def drive(
+    client_factory: Callable[[], ZMQClient],
+    schedule: Iterable[ScheduledRequest],
+    connections: int = 8,
+) -> tuple[list[Sample], float]:
+    """Send each request at its offset, open loop, over *connections* clients.
+
+    Each connection is a ``ZMQClient`` on its own thread, as REQ sockets
+    carry one request at a time.  Requests due while every connection is
+    busy wait in a local queue, and that wait counts towards their latency.
+    A client that raises, such as on a timeout, is replaced.
+
+    Waits for outstanding replies, then returns the samples and the seconds
+    the run took.
+    """
+    if connections < 1:
+        raise ValueError(f"connections must be at least 1, got {connections}.")
+    pending: queue.SimpleQueue[tuple[float, ScheduledRequest] | None] = queue.SimpleQueue()
+    samples: list[Sample] = []
+    workers = [
+        threading.Thread(
+            target=_work, args=(client_factory, pending, samples), name=f"qat-loadgen-{i}"
+        )
+        for i in range(connections)
+    ]
+    for worker in workers:
+        worker.start()
+
+    start = time.perf_counter()
+    try:
+        for scheduled in schedule:
+            due = start + scheduled.offset
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pending.put((due, scheduled))
+    finally:
+        for _ in workers:
+            pending.put(None)
+        for worker in workers:
+            worker.join()
+    return samples, time.perf_counter() - start
+
+
+def _work(
+    client_factory: Callable[[], ZMQClient],
+    pending: "queue.SimpleQueue[tuple[float, ScheduledRequest] | None]",
+    samples: list[Sample],
+) -> None:
+    client = client_factory()
+    try:
+        while (item := pending.get()) is not None:
+            due, scheduled = item
+            error = None
+            try:
+                reply = scheduled.send(client)
+            except Exception as e:  # noqa: BLE001 - counted as a failed request
+                error = type(e).__name__
+                client.close()
+                client = client_factory()
+            else:
+                if isinstance(reply, dict) and "Exception" in reply:
+                    error = "server_error"
+            samples.append(Sample(scheduled.kind, time.perf_counter() - due, error))
+    finally:
+        client.close()
+
+
+class LoadGenerator:
+    """Drives a server with a random mix of requests at a target rate.
+
+    :param client_factory: Creates a connected ``ZMQClient``.
+    :param mix: Relative weight of each request kind, from ``parse_mix``.
+    :param connections: Concurrent connections, as for ``drive``.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], ZMQClient],
+        mix: dict[str, float],
+        program: str | bytes = DEFAULT_PROGRAM,
+        config: str | None = None,
+        connections: int = 8,
+    ):
+        if connections < 1:
+            raise ValueError(f"connections must be at least 1, got {connections}.")
+        self._client_factory = client_factory
+        self._kinds = list(mix)
+        self._weights = list(mix.values())
+        self._program = program
+        self._config = config
+        self._connections = connections
+
+    def run(
+        self, rate: float, duration: float, poisson: bool = True, seed: int | None = None
+    ) -> dict[str, Any]:
+        """Send requests at *rate* per second for *duration* seconds and summarize.
+
+        Waits for outstanding replies before returning.
+        """
+        rng = random.Random(seed)  # noqa: S311  # nosec B311
+        offsets = arrival_times(rate, duration, poisson, rng)
+        kinds = rng.choices(self._kinds, self._weights, k=len(offsets))
+        metadata = cycle(_METADATA)
+        schedule = [
+            ScheduledRequest(offset, kind, self._sender(kind, metadata))
+            for offset, kind in zip(offsets, kinds, strict=True)
+        ]
+        samples, elapsed = drive(self._client_factory, schedule, self._connections)
+        report = summarize(samples, elapsed)
+        report.update(target_rate=rate, duration=duration, connections=self._connections)
+        return report
+
+    def _sender(self, kind: str, metadata: Iterator[str]) -> Callable[[ZMQClient], Any]:
+        match kind:
+            case "program":
+                return methodcaller("execute_task", self._program, self._config)
+            case "compile":
+                return methodcaller("compile_program", self._program, self._config)
+            case _:
+                return methodcaller(next(metadata))
+
+
+parser = argparse.ArgumentParser(
+    prog="qat_loadgen",
+    description="Measure a QAT RPC server's latency under an open-loop request rate.",
+)
+parser.add_argument("--host", type=str, default="127.0.0.1", help="Server IP address")
+parser.add_argument("--port", type=int, default=5556, help="Server port (default: 5556)")
+parser.add_argument(
+    "--rate", type=float, default=10.0, help="Requests per second (default: 10)"
+)
+parser.add_argument(
+    "--duration", type=float, default=10.0, help="Seconds to send for (default: 10)"
+)
+parser.add_argument(
+    "--connections", type=int, default=8, help="Concurrent connections (default: 8)"
+)
+parser.add_argument(
+    "--mix",
+    type=str,
+    default=DEFAULT_MIX,
+    help=f"Weights of {', '.join(REQUEST_KINDS)} requests (default: {DEFAULT_MIX})",
+)
+parser.add_argument(
+    "--program", type=str, help="Program string or path to program file (.qasm, .ll, .bc)."
+)
+parser.add_argument(
+    "--config", type=str, help="Serialized CompilerConfig JSON or path to JSON file."
+)
+parser.add_argument(
+    "--arrivals",
+    choices=("poisson", "uniform"),
+    default="poisson",
+    help="Gaps between requests (default: poisson)",
+)
+parser.add_argument("--seed", type=int, help="Seed for arrivals and the request mix.")
+parser.add_argument(
+    "--timeout", type=float, default=30.0, help="Per-request timeout in seconds"
+)
+parser.add_argument(
+    "--json", type=str, help="Also write the report as JSON to this path ('-': stdout)."
+)
+
+
+def main(args=None):
+    """CLI entrypoint - generate load and print the report."""
+    args = parser.parse_args(args)
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    program = (
+        _read_file_or_string(args.program, "program") if args.program else DEFAULT_PROGRAM
+    )
+    config = str(_read_file_or_string(args.config, "config")) if args.config else None
+
+    def connect() -> ZMQClient:
+        return ZMQClient(client_ip=args.host, client_port=args.port, timeout=args.timeout)
+
+    generator = LoadGenerator(connect, mix, program, config, args.connections)
+    report = generator.run(
+        args.rate, args.duration, poisson=args.arrivals == "poisson", seed=args.seed
+    )
+
+    print(format_report(report))
+    if args.json == "-":
+        print(json.dumps(report, indent=2))
+    elif args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if report["errors"]:
+        log.warning(f"{report['errors']} of {report['requests']} requests failed.")
@@ -0,0 +1,166 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Replay of captured traffic against a QAT RPC server.
+
+Exposed as the ``qat_replay`` console script.  Sends the requests in a
+capture file (see ``qat_rpc.zmq.capture``) again, open loop as
+``qat_loadgen`` does, at their original pace, sped up or slowed down by a
+factor, or as fast as the connections allow.  The replayed latencies are
+reported next to those the capturing server recorded.
+
+Captured latencies run from the server receiving a request to sending its
+reply, whereas replayed ones are measured by the client, so they also
+include the network and any wait for a free connection.
+"""
+
+import argparse
+import json
+from collections.abc import Callable, Iterable, Sequence
+from operator import methodcaller
+from pathlib import Path
+from typing import Any
+
+from qat.purr.utils.logger import get_default_logger
+
+from qat_rpc.zmq.capture import CaptureRecord, read_capture
+from qat_rpc.zmq.client import ZMQClient
+from qat_rpc.zmq.loadgen import Sample, ScheduledRequest, drive, format_report, summarize
+
+log = get_default_logger()
+
+MAX_SPEED = 0.0
+
+
+def replay_schedule(
+    records: Sequence[CaptureRecord], speed: float = 1.0
+) -> list[ScheduledRequest]:
+    """Schedule *records* at their captured pace divided by *speed*.
+
+    ``MAX_SPEED`` sends every request at once, leaving the pace to the
+    connections.
+    """
+    if speed < 0:
+        raise ValueError(f"speed must not be negative, got {speed}.")
+    if not records:
+        return []
+    first = records[0].timestamp
+    return [
+        ScheduledRequest(
+            (record.timestamp - first) / speed if speed != MAX_SPEED else 0.0,
+            record.request_type,
+            methodcaller("send_request", record.request()),
+        )
+        for record in records
+    ]
+
+
+def captured_report(records: Sequence[CaptureRecord]) -> dict[str, Any]:
+    """A ``summarize`` report of the latencies the capturing server recorded."""
+    samples = [
+        Sample(
+            record.request_type, record.elapsed, "server_error" if record.failed else None
+        )
+        for record in records
+    ]
+    elapsed = (
+        max(record.timestamp + record.elapsed for record in records) - records[0].timestamp
+        if records
+        else 0.0
+    )
+    return summarize(samples, elapsed)
+
+
+def replay(
+    client_factory: Callable[[], ZMQClient],
+    records: Iterable[CaptureRecord],
+    speed: float = 1.0,
+    connections: int = 8,
+) -> dict[str, Any]:
+    """Replay *records* and report the replayed and captured latencies."""
+    records = sorted(records, key=lambda record: record.timestamp)
+    samples, elapsed = drive(client_factory, replay_schedule(records, speed), connections)
+    return {
+        "speed": speed,
+        "connections": connections,
+        "replayed": summarize(samples, elapsed),
+        "captured": captured_report(records),
+    }
+
+
+def format_comparison(report: dict[str, Any]) -> str:
+    """Render the captured and replayed latencies of each request type side by side."""
+    captured, replayed = report["captured"], report["replayed"]
+    columns = ("captured p50", "replayed p50", "captured p99", "replayed p99")
+    lines = [f"{'latency (ms)':<24}" + "".join(f"{c:>14}" for c in columns) + "  p99 ratio"]
+    rows = [("all", captured["latency"], replayed["latency"])] + [
+        (kind, captured["by_kind"][kind]["latency"], stats["latency"])
+        for kind, stats in replayed["by_kind"].items()
+        if kind in captured["by_kind"]
+    ]
+    for name, before, after in rows:
+        ratio = after["p99"] / before["p99"] if before["p99"] > 0 else float("nan")
+        lines.append(
+            f"{name:<24}{before['p50'] * 1e3:>14.2f}{after['p50'] * 1e3:>14.2f}"
+            f"{before['p99'] * 1e3:>14.2f}{after['p99'] * 1e3:>14.2f}{ratio:>10.2f}x"
+        )
+    return "\n".join(lines)
+
+
+parser = argparse.ArgumentParser(
+    prog="qat_replay",
+    description="Replay a request capture against a QAT RPC server.",
+)
+parser.add_argument("capture", type=Path, help="Capture file written by a server.")
+parser.add_argument("--host", type=str, default="127.0.0.1", help="Server IP address")
+parser.add_argument("--port", type=int, default=5556, help="Server port (default: 5556)")
+pace = parser.add_mutually_exclusive_group()
+pace.add_argument(
+    "--speed",
+    type=float,
+    default=1.0,
+    help="Replay this many times faster than captured (default: 1)",
+)
+pace.add_argument(
+    "--max-speed",
+    action="store_const",
+    const=MAX_SPEED,
+    dest="speed",
+    help="Send every request at once, limited only by the connections.",
+)
+parser.add_argument(
+    "--connections", type=int, default=8, help="Concurrent connections (default: 8)"
+)
+parser.add_argument(
+    "--timeout", type=float, default=30.0, help="Per-request timeout in seconds"
+)
+parser.add_argument(
+    "--json", type=str, help="Also write the report as JSON to this path ('-': stdout)."
+)
+
+
+def main(args=None):
+    """CLI entrypoint - replay a capture and print the latency comparison."""
+    args = parser.parse_args(args)
+    if args.speed < 0:
+        parser.error(f"--speed must not be negative, got {args.speed}.")
+    try:
+        records = list(read_capture(args.capture))
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    def connect() -> ZMQClient:
+        return ZMQClient(client_ip=args.host, client_port=args.port, timeout=args.timeout)
+
+    report = replay(connect, records, args.speed, args.connections)
+
+    print(format_report(report["replayed"]))
+    print(format_comparison(report))
+    if args.json == "-":
+        print(json.dumps(report, indent=2))
+    elif args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if report["replayed"]["errors"]:
+        log.warning(
+            f"{report['replayed']['errors']} of {report['replayed']['requests']} "
+            "replayed requests failed."
+        )
@@ -2,52 +2,135 @@
 # Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
 """ZMQ REP server and entrypoint for QAT RPC.
 
-``ZMQServer`` binds a REP socket that accepts both typed ``Request``
-objects and legacy tuple formats (pre-1.0 clients), delegating all
-business logic to ``QATServiceHandler``.
+``ZMQServer`` binds a ROUTER socket that accepts typed ``Request`` objects,
+compact tagged envelopes (see ``qat_rpc.zmq.wire``) and legacy tuple
+formats (pre-1.0 clients), delegating all
+business logic to ``QATServiceHandler``.  ROUTER is wire-compatible with
+the REQ sockets clients use, and lets the server keep several requests in
+flight so compilation of one overlaps execution of another.
+``HelloRequest`` handshakes are answered by the server itself with its
+codecs, limits and features.  With tracing enabled, each request's receipt,
+decoding, compilation, execution, serialization and reply are recorded as
+spans tagged with the client's request id.  ``ProfileRequest`` and
+``SIGUSR1`` open and close CPU or memory profiling windows, and requests
+slower than a threshold can have their profiles saved automatically.
+Results and compiled programs can report the CPU time, wall time and peak
+memory spent on them as ``diagnostics``.  A memory watchdog recycles the
+process once it grows past a limit, after finishing the requests in flight.
 
 Can be started via the ``qat_server`` console script.
 """
 
+import gc
 import os
+import pickle
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import suppress
 from pathlib import Path
-from signal import SIGINT, SIGTERM, signal
+from signal import SIGHUP, SIGINT, SIGTERM, SIGUSR1, signal
 from types import FrameType, TracebackType
-from typing import Any
+from typing import Any, TypeVar, final
 
 import zmq
-from compiler_config.config import CompilerConfig
+from pydantic import BaseModel
 from qat.purr.utils.logger import get_default_logger
 
+from qat_rpc.config_presets import ConfigNotFoundError, ConfigPresets, config_from_json
+from qat_rpc.executor import DEFAULT_COMPILE_WORKERS, DEFAULT_EXECUTE_QUEUE_SIZE
 from qat_rpc.handler import QATServiceHandler
+from qat_rpc.memory import MemorySample, sample_memory
 from qat_rpc.metrics import (
     DEFAULT_PROMETHEUS_PORT,
     MetricExporter,
     PrometheusReceiver,
 )
 from qat_rpc.models import (
+    CompiledProgram,
+    CountsArray,
     CouplingsRequest,
+    HelloRequest,
     ProgramRequest,
     QpuInfoRequest,
     QubitInfoRequest,
+    ReadoutArray,
     Request,
     Response,
+    Results,
     VersionRequest,
 )
+from qat_rpc.package_store import DEFAULT_PACKAGE_STORE_BYTES, PackageNotFoundError
+from qat_rpc.profiling import DEFAULT_PROFILE_DIR, Profiler
+from qat_rpc.request_log import (
+    DEFAULT_MAX_PAYLOAD_CHARS,
+    DEFAULT_SAMPLE_RATE,
+    RequestLogger,
+)
+from qat_rpc.resource_usage import ResourceMeter
+from qat_rpc.simulation import Simulation, SimulationSettings
+from qat_rpc.tracing import TRACE_FORMATS, Tracer, new_request_id, span_exporter
 from qat_rpc.zmq._base import ZMQBase
+from qat_rpc.zmq.capture import TrafficRecorder
+from qat_rpc.zmq.wire import (
+    CODECS,
+    COMPRESSIONS,
+    FEATURES,
+    HELLO,
+    PROTOCOL_VERSION,
+    decode_message,
+    split_envelope,
+    split_request_id,
+)
 
 RECEIVER_PORT = 5556
 
+# ZMQ's MAXMSGSIZE value for no limit
+UNLIMITED_MESSAGE_SIZE = -1
+
+# How often the server loop wakes to notice ``stop()`` when idle
+_POLL_INTERVAL_MS = 100
+
+# How often batched metrics are pushed to the backend; well inside a scrape interval
+_METRICS_FLUSH_INTERVAL = 1.0
+
+# Memory limit value for no limit: memory is still sampled, but never acted on
+NO_MEMORY_LIMIT = 0
+
+DEFAULT_MEMORY_CHECK_INTERVAL = 30.0
+
+# EX_TEMPFAIL: the server stopped to be replaced, so the supervisor should restart it
+RESTART_EXIT_CODE = 75
+
+_Default = TypeVar("_Default", float, None)
+
 log = get_default_logger()
 
 
 class ZMQServer(ZMQBase):
-    """ZMQ REP server — receive, dispatch, reply.
+    """ZMQ ROUTER server — receive, dispatch, reply.
 
-    Wraps a REP socket that blocks for incoming requests, converts legacy
-    tuple formats if necessary, and forwards typed ``Request`` objects to
-    ``QATServiceHandler.handle``.  Responses are serialised back to plain
-    dicts for backwards compatibility.
+    Polls a ROUTER socket for incoming requests, converts legacy tuple
+    formats if necessary, and submits typed ``Request`` objects to
+    ``QATServiceHandler.submit``.  Completed requests are handed back to the
+    server loop, which owns the socket, and replied to in completion order.
+    Responses are serialised back to plain dicts for backwards compatibility.
+
+    :param max_message_size: Largest request frame, in bytes, the socket
+        accepts (``UNLIMITED_MESSAGE_SIZE`` for no limit).  Advertised in the
+        ``hello`` handshake so clients can refuse oversized requests up
+        front; ZMQ disconnects peers that exceed it.
+    :param profiler: Captures profiling windows and, given a slow request
+        threshold, the profiles of requests whose reply took at least that
+        long from receipt.
+    :param resource_meter: Measures each request's CPU time, wall time and
+        peak memory, and whether they are returned to clients.
+    :param recorder: Captures a sample of the requests replied to, for
+        replay with ``qat_replay``.
+    :param simulation: Injects latency and faults into the handler, for load
+        tests in echo mode.
     """
 
     def __init__(
@@ -57,11 +140,54 @@ class ZMQServer(ZMQBase):
         qat_config_path: Path | None = None,
         timeout: float = 30.0,
         compile_enabled: bool = True,
+        compile_workers: int = DEFAULT_COMPILE_WORKERS,
+        execute_queue_size: int = DEFAULT_EXECUTE_QUEUE_SIZE,
+        request_logger: RequestLogger | None = None,
+        package_store_bytes: int = DEFAULT_PACKAGE_STORE_BYTES,
+        config_presets: ConfigPresets | None = None,
+        max_message_size: int = UNLIMITED_MESSAGE_SIZE,
+        tracer: Tracer | None = None,
+        profiler: Profiler | None = None,
+        resource_meter: ResourceMeter | None = None,
+        recorder: TrafficRecorder | None = None,
+        simulation: Simulation | None = None,
     ):
-        super().__init__(socket_type=zmq.REP, port=server_port, timeout=timeout)
+        super().__init__(socket_type=zmq.ROUTER, port=server_port, timeout=timeout)
+        self._max_message_size = max_message_size
+        self._socket.setsockopt(zmq.MAXMSGSIZE, max_message_size)
         self._socket.bind(self.address)
-        self._handler = QATServiceHandler(metric_exporter, qat_config_path, compile_enabled)
+        self._handler = QATServiceHandler(
+            metric_exporter,
+            qat_config_path,
+            compile_enabled,
+            compile_workers=compile_workers,
+            execute_queue_size=execute_queue_size,
+            request_logger=request_logger,
+            package_store_bytes=package_store_bytes,
+            config_presets=config_presets,
+            tracer=tracer,
+            profiler=profiler,
+            resource_meter=resource_meter,
+            simulation=simulation,
+        )
+        self._tracer = self._handler.tracer
+        self._profiler = self._handler.profiler
+        self._recorder = recorder or TrafficRecorder()
         self._running = False
+        # Plain flags rather than Events so signal handlers can set them safely
+        self._reload_requested = False
+        self._profile_toggle_requested = False
+        self._restart_requested = False
+        # Requests received and not yet replied to; only the loop thread touches it
+        self._in_flight = 0
+        # Worker threads must not touch the socket; completions are queued and
+        # the loop is woken through a pipe it polls alongside the socket.
+        self._completed: queue.SimpleQueue[
+            tuple[list[bytes], Any, Request | None, str | None, float, Future]
+        ] = queue.SimpleQueue()
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        os.set_blocking(self._wakeup_write, False)
 
     @property
     def address(self) -> str:
@@ -79,22 +205,24 @@ class ZMQServer(ZMQBase):
 
         Only operations that existed in legacy versions are handled here;
         ``compile`` and ``execute`` were introduced with typed requests
-        and have no legacy tuple form.
+        and have no legacy tuple form.  The ``("hello", version, capabilities)``
+        handshake uses the tuple form so that older servers can reject it.
+        Config JSON is parsed through the
+        ``config_from_json`` memo, as legacy clients resend the same text.
         """
         if not raw:
             raise ValueError(f"Invalid legacy message: {raw}")
 
         # Pre-0.3.0 compat: 2-tuple without a type discriminator treated as program
         if len(raw) == 2 and raw[0] not in {
+            HELLO,
             "program",
             "version",
             "couplings",
             "qubit_info",
             "qpu_info",
         }:
-            return ProgramRequest(
-                program=raw[0], config=CompilerConfig.create_from_json(raw[1])
-            )
+            return ProgramRequest(program=raw[0], config=config_from_json(raw[1]))
 
         if not isinstance(raw[0], str):
             raise TypeError(f"Invalid legacy message: {raw}")
@@ -105,18 +233,19 @@ class ZMQServer(ZMQBase):
         match msg_type:
             case "program":
                 if len(args) == 2:
-                    return ProgramRequest(
-                        program=args[0],
-                        config=CompilerConfig.create_from_json(args[1]),
-                    )
+                    return ProgramRequest(program=args[0], config=config_from_json(args[1]))
                 if len(args) == 4:
                     return ProgramRequest(
                         program=args[0],
-                        config=CompilerConfig.create_from_json(args[1]),
+                        config=config_from_json(args[1]),
                         compile_pipeline=args[2] or None,
                         execute_pipeline=args[3] or None,
                     )
                 raise ValueError(f"PROGRAM message expects 2 or 4 args, got {len(args)}.")
+            case "hello":
+                if len(args) != 2:
+                    raise ValueError(f"HELLO message expects 2 args, got {len(args)}.")
+                return HelloRequest(protocol_version=args[0], **args[1])
             case "version":
                 return VersionRequest()
             case "couplings":
@@ -128,44 +257,135 @@ class ZMQServer(ZMQBase):
             case _:
                 raise ValueError(f"Unrecognized legacy message type: {msg_type}")
 
+    def capabilities(self) -> dict[str, Any]:
+        """What this server supports, as sent in reply to a ``HelloRequest``."""
+        return {
+            "protocol_version": PROTOCOL_VERSION,
+            "codecs": list(CODECS),
+            "compressions": list(COMPRESSIONS),
+            "max_message_size": (
+                self._max_message_size if self._max_message_size > 0 else None
+            ),
+            "features": list(FEATURES),
+        }
+
+    @staticmethod
+    def _request_labels(msg: Request | None) -> dict[str, str]:
+        """Latency metric labels: the request type and its requested pipeline.
+
+        Programs are labelled with their execute pipeline.  Requests that name
+        no pipeline use ``default``; request types without one use ``""``.
+        """
+        if not isinstance(msg, BaseModel):
+            return {"request_type": "invalid", "pipeline": ""}
+        fields = type(msg).model_fields
+        for name in ("pipeline", "execute_pipeline"):
+            if name in fields:
+                pipeline = getattr(msg, name) or "default"
+                break
+        else:
+            pipeline = ""
+        return {"request_type": type(msg).__name__, "pipeline": pipeline}
+
     @staticmethod
     def _serialize_response(response: Response) -> dict[str, Any]:
         """Flatten a ``Response`` to a plain dict for the wire.
 
         Pydantic models are dumped via ``model_dump()``; plain dicts pass
         through.  This keeps the wire format stable for older (<1.0) clients.
+
+        ``Results.results`` is already plain data, so it is placed in the dict
+        by reference and pickled straight from the handler's object rather
+        than deep-copied by ``model_dump()`` first.  The pickled output is
+        unchanged.
+
+        ``diagnostics`` is left out unless the handler reported resource
+        usage, so replies are unchanged for servers that do not.
         """
-        if isinstance(response, dict):
-            return response
+        match response:
+            case dict():
+                return response
+            case Results(results=results, diagnostics=None):
+                return {
+                    "results": results,
+                    **response.model_dump(exclude={"results", "diagnostics"}),
+                }
+            case Results(results=results):
+                return {"results": results, **response.model_dump(exclude={"results"})}
+            case CompiledProgram(diagnostics=None):
+                return response.model_dump(exclude={"diagnostics"})
         return response.model_dump()
 
+    @staticmethod
+    def _encode_reply(response: dict[str, Any]) -> list[Any]:
+        """Pickle a serialised response into reply frames.
+
+        Replies carrying packed results use pickle protocol 5, so array data
+        travels as raw binary frames after the pickle instead of being copied
+        into it.  All other replies are a single frame, as before.
+        """
+        results = response.get("results")
+        if isinstance(results, dict) and any(
+            isinstance(value, CountsArray | ReadoutArray) for value in results.values()
+        ):
+            buffers: list[pickle.PickleBuffer] = []
+            payload = pickle.dumps(response, protocol=5, buffer_callback=buffers.append)
+            return [payload, *buffers]
+        return [pickle.dumps(response, protocol=pickle.DEFAULT_PROTOCOL)]
+
     def run(self) -> None:
-        """Enter the receive -> handle -> reply loop until ``stop()`` is called."""
+        """Enter the receive -> submit -> reply loop until ``stop()`` is called.
+
+        Requests still in flight when the loop exits are completed and
+        replied to before returning.
+
+        Each request received records the event loop lag: how long the
+        socket may have held it unread, measured from when the loop last
+        found the socket empty.  Requests that arrive while the loop is
+        waiting on the socket have no lag.
+        """
         self._running = True
         with self._handler.metric.receiver_status() as metric:
             metric.succeed()
 
+        poller = zmq.Poller()
+        poller.register(self._socket, zmq.POLLIN)
+        poller.register(self._wakeup_read, zmq.POLLIN)
+        empty_at = reported = time.perf_counter()
+
         while self._running:
             try:
-                raw = self._receive(timeout=None)
-                if raw is None:
-                    continue
-
-                # Everything after receiving MUST send a reply (REP socket).
-                try:
-                    if isinstance(raw, tuple):
-                        msg = self._convert_legacy_message(raw)
-                    else:
-                        msg = raw
-                    response = self._serialize_response(self._handler.handle(msg))
-                    with self._handler.metric.executed_messages() as executed:
-                        executed.increment()
-                except Exception as e:
-                    log.exception(f"Error processing message {raw}")
-                    response = {"Exception": repr(e)}
-                    with self._handler.metric.failed_messages() as failed:
-                        failed.increment()
-                self._send(response)
+                waiting = self._socket.poll(0)
+                polling = time.perf_counter()
+                if not waiting:
+                    empty_at = polling
+                events = dict(poller.poll(_POLL_INTERVAL_MS))
+                if self._wakeup_read in events:
+                    self._drain_wakeups()
+                self._reply_completed()
+
+                if self._reload_requested:
+                    self._reload_requested = False
+                    self._handler.reload_hardware()
+
+                if self._profile_toggle_requested:
+                    self._profile_toggle_requested = False
+                    self._profiler.toggle()
+                self._profiler.poll()
+
+                if self._socket in events:
+                    received = time.perf_counter()
+                    with self._handler.metric.event_loop_lag() as lag:
+                        lag.observe(polling - empty_at if waiting else 0.0)
+                    frames = self._receive_multipart(timeout=None)
+                    if frames is not None:
+                        self._dispatch(frames, received)
+
+                if polling - reported >= _METRICS_FLUSH_INTERVAL:
+                    reported = polling
+                    self._report_saturation()
+                    self._recorder.flush()
+                self._handler.metric.flush(_METRICS_FLUSH_INTERVAL)
 
             except zmq.ZMQError as e:
                 if e.errno == zmq.ETERM:
@@ -174,12 +394,202 @@ class ZMQServer(ZMQBase):
             except Exception:
                 log.exception("Unexpected error in server loop")
 
+        self._handler.shutdown()
+        self._reply_completed()
+        self._report_saturation()
+        self._handler.metric.flush()
+        self._tracer.flush()
+        self._profiler.close()
+        self._recorder.close()
+
+    def _report_saturation(self) -> None:
+        """Publish the number of requests in flight and of those queued for a stage."""
+        metric = self._handler.metric
+        with metric.requests_in_flight() as in_flight:
+            in_flight.observe(self._in_flight)
+        with metric.requests_queued() as queued:
+            queued.observe(self._handler.queued)
+
+    def _dispatch(self, frames: list[bytes], received: float | None = None) -> None:
+        """Decode one request and submit it, arranging for a reply on completion.
+
+        *received* is when receiving the frames started (``perf_counter``).
+        Everything after receiving MUST lead to a reply, or the client's REQ
+        socket is left waiting forever.
+        """
+        decoding = time.perf_counter()
+        if received is None:
+            received = decoding
+        # ROUTER prefixes the message with the peer identity and an empty delimiter
+        envelope, body = split_envelope(frames)
+        request_id, body = split_request_id(body)
+        if request_id is None and (
+            self._tracer.enabled or self._profiler.slow_threshold is not None
+        ):
+            request_id = new_request_id()
+        self._tracer.record("receive", request_id, received, decoding)
+        raw: Any = None
+        msg: Request | None = None
+        try:
+            with self._tracer.span("decode", request_id):
+                raw = decode_message(body)
+                request: Request
+                if isinstance(raw, tuple):
+                    with self._tracer.span("convert_legacy", request_id):
+                        request = self._convert_legacy_message(raw)
+                else:
+                    request = raw
+            msg = request
+            with self._handler.metric.request_dispatch_wait() as wait:
+                wait.label(request_type=type(request).__name__)
+                wait.observe(time.perf_counter() - received)
+            if isinstance(request, HelloRequest):
+                future = Future()
+                future.set_result(self.capabilities())
+            else:
+                future = self._handler.submit(request, request_id)
+        except Exception as e:  # noqa: BLE001 - surfaced through the future
+            future = Future()
+            future.set_exception(e)
+        with self._handler.metric.request_bytes() as size:
+            size.label(request_type=self._request_labels(msg)["request_type"])
+            size.observe(sum(len(frame) for frame in body))
+        self._in_flight += 1
+        future.add_done_callback(
+            lambda done: self._complete(envelope, raw, msg, request_id, received, done)
+        )
+
+    def _complete(
+        self,
+        envelope: list[bytes],
+        raw: Any,
+        msg: Request | None,
+        request_id: str | None,
+        received: float,
+        future: Future,
+    ) -> None:
+        """Hand a finished request back to the server loop (any thread)."""
+        self._completed.put((envelope, raw, msg, request_id, received, future))
+        # A full pipe means the loop already has a wakeup pending
+        with suppress(BlockingIOError):
+            os.write(self._wakeup_write, b"\0")
+
+    def _drain_wakeups(self) -> None:
+        with suppress(BlockingIOError):
+            while os.read(self._wakeup_read, 4096):
+                pass
+
+    def _reply_completed(self) -> None:
+        """Send replies for every request that has finished since the last call.
+
+        Records how long each reply took to serialize and how long the
+        request took end to end, from receipt to its reply being sent.
+        """
+        metric = self._handler.metric
+        tracer = self._tracer
+        while True:
+            try:
+                envelope, raw, msg, request_id, received, future = (
+                    self._completed.get_nowait()
+                )
+            except queue.Empty:
+                return
+
+            labels = self._request_labels(msg)
+            failed = False
+            try:
+                response = future.result()
+                with (
+                    tracer.span("serialize", request_id),
+                    metric.request_phase_duration() as duration,
+                ):
+                    duration.label(phase="serialize", pipeline=labels["pipeline"])
+                    reply = self._encode_reply(self._serialize_response(response))
+                with self._handler.metric.executed_messages() as executed:
+                    executed.increment()
+            except Exception as e:
+                log.exception(
+                    "Error processing message: %s", self._handler.request_log.summarize(raw)
+                )
+                error = {"Exception": repr(e)}
+                if isinstance(e, PackageNotFoundError):
+                    # Lets clients re-upload and retry without parsing the message
+                    error["package_not_found"] = e.digest
+                elif isinstance(e, ConfigNotFoundError):
+                    error["config_not_found"] = e.name
+                reply = [pickle.dumps(error)]
+                failed = True
+                with self._handler.metric.failed_messages() as failures:
+                    failures.increment()
+
+            try:
+                with tracer.span("send", request_id):
+                    self._send_multipart([*envelope, *reply])
+            except (zmq.ZMQError, TimeoutError):
+                log.exception("Failed to send reply")
+            self._in_flight -= 1
+            with metric.response_bytes() as size:
+                size.label(request_type=labels["request_type"])
+                size.observe(sum(memoryview(frame).nbytes for frame in reply))
+
+            sent = time.perf_counter()
+            with metric.request_duration() as duration:
+                duration.label(**labels)
+                duration.observe(sent - received)
+            tracer.record("request", request_id, received, sent, **labels)
+            self._recorder.record(msg, received, sent, failed, reply)
+            if self._profiler.slow_threshold is not None:
+                self._profiler.finish(
+                    request_id,
+                    sent - received,
+                    self._handler.request_log.summarize(
+                        raw if msg is None else msg
+                    ).details,
+                )
+
+    def request_hardware_reload(self) -> None:
+        """Ask the server loop to reload hardware in the background.
+
+        Safe to call from signal handlers and other threads.  Requests keep
+        being served while the new hardware models and pipelines are built.
+        """
+        self._reload_requested = True
+
+    def request_profile_toggle(self) -> None:
+        """Ask the server loop to start a CPU profiling window, or stop the open one.
+
+        Safe to call from signal handlers and other threads.
+        """
+        self._profile_toggle_requested = True
+
+    @property
+    def restart_requested(self) -> bool:
+        """Whether the server stopped so that a fresh process can replace it."""
+        return self._restart_requested
+
+    def request_restart(self) -> None:
+        """Stop the server so that a fresh process can replace it.
+
+        As with ``stop()``, requests in flight are completed and replied to
+        before ``run()`` returns.  Safe to call from signal handlers and
+        other threads.
+        """
+        self._restart_requested = True
+        self.stop()
+
     def stop(self) -> None:
         """Signal the server loop to exit."""
         self._running = False
         with self._handler.metric.receiver_status() as metric:
             metric.fail()
 
+    def close(self) -> None:
+        """Close the socket, the ZMQ context and the wakeup pipe."""
+        super().close()
+        for fd in (self._wakeup_read, self._wakeup_write):
+            with suppress(OSError):
+                os.close(fd)
+
 
 # ---------------------------------------------------------------------------
 # Server entrypoint helpers
@@ -227,6 +637,77 @@ def validate_port(
     return port
 
 
+def validate_positive_int(value: str | None, name: str, default: int) -> int:
+    """Parse a positive integer from an environment variable string.
+
+    Returns *default* when *value* is ``None``, non-numeric or less than 1.
+    """
+    if value is None:
+        return default
+
+    try:
+        parsed = int(value)
+    except ValueError:
+        log.warning(f"Configured {name} is not a valid integer.")
+        log.info(f"Defaulting {name} to {default}.")
+        return default
+
+    if parsed < 1:
+        log.warning(f"{name.capitalize()} must be at least 1.")
+        log.info(f"Defaulting {name} to {default}.")
+        return default
+
+    return parsed
+
+
+def validate_fraction(value: str | None, name: str, default: float) -> float:
+    """Parse a fraction between 0 and 1 from an environment variable string.
+
+    Returns *default* when *value* is ``None``, non-numeric or out of range.
+    """
+    if value is None:
+        return default
+
+    try:
+        parsed = float(value)
+    except ValueError:
+        log.warning(f"Configured {name} is not a valid number.")
+        log.info(f"Defaulting {name} to {default}.")
+        return default
+
+    if not 0.0 <= parsed <= 1.0:
+        log.warning(f"{name.capitalize()} must be between 0 and 1.")
+        log.info(f"Defaulting {name} to {default}.")
+        return default
+
+    return parsed
+
+
+def validate_positive_float(
+    value: str | None, name: str, default: _Default
+) -> float | _Default:
+    """Parse a positive number from an environment variable string.
+
+    Returns *default* when *value* is ``None``, non-numeric or not above 0.
+    """
+    if value is None:
+        return default
+
+    try:
+        parsed = float(value)
+    except ValueError:
+        log.warning(f"Configured {name} is not a valid number.")
+        log.info(f"Defaulting {name} to {default}.")
+        return default
+
+    if not parsed > 0.0:
+        log.warning(f"{name.capitalize()} must be greater than 0.")
+        log.info(f"Defaulting {name} to {default}.")
+        return default
+
+    return parsed
+
+
 def resolve_qat_config_path(env_var_value: str | None) -> Path | None:
     """Resolve a QAT config file path from an environment variable.
 
@@ -286,6 +767,204 @@ class GracefulKill:
         self.server.stop()
 
 
+@final
+class HardwareReloadTrigger:
+    """Context manager that requests a hardware reload on SIGHUP or file change.
+
+    When *watch_path* is given (typically the calibration file behind the
+    hardware model), its modification time is polled every *poll_interval*
+    seconds on a daemon thread and any change requests a reload.
+    """
+
+    def __init__(
+        self,
+        server: ZMQServer,
+        watch_path: Path | None = None,
+        poll_interval: float = 5.0,
+    ):
+        self.server = server
+        self._watch_path = watch_path
+        self._poll_interval = poll_interval
+        self._original_sighup = None
+        self._stop_watching = threading.Event()
+        self._watcher: threading.Thread | None = None
+
+    def __enter__(self) -> "HardwareReloadTrigger":
+        """Install the SIGHUP handler and start watching *watch_path*."""
+        self._original_sighup = signal(SIGHUP, self._handle_signal)
+        if self._watch_path is not None:
+            log.info(f"Watching {self._watch_path} for calibration changes.")
+            self._watcher = threading.Thread(
+                target=self._watch,
+                args=(self._watch_path, self._modified_time(self._watch_path)),
+                name="qat-calibration-watch",
+                daemon=True,
+            )
+            self._watcher.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> bool:
+        """Restore the original SIGHUP handler and stop watching."""
+        if self._original_sighup is not None:
+            signal(SIGHUP, self._original_sighup)
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        return False  # Don't suppress exceptions
+
+    def _handle_signal(self, signum: int, frame: FrameType | None) -> None:
+        """Signal handler that requests a hardware reload."""
+        log.info("Received SIGHUP, reloading hardware...")
+        self.server.request_hardware_reload()
+
+    @staticmethod
+    def _modified_time(path: Path) -> int | None:
+        try:
+            return path.stat().st_mtime_ns
+        except OSError:
+            # The file may briefly disappear while being replaced
+            return None
+
+    def _watch(self, path: Path, last_modified: int | None) -> None:
+        while not self._stop_watching.wait(self._poll_interval):
+            modified = self._modified_time(path)
+            if modified is not None and modified != last_modified:
+                log.info(f"{path} changed, reloading hardware...")
+                last_modified = modified
+                self.server.request_hardware_reload()
+
+
+@final
+class ProfilingTrigger:
+    """Context manager that toggles CPU profiling on SIGUSR1.
+
+    The first signal starts a window and the next writes it out.
+    """
+
+    def __init__(self, server: ZMQServer):
+        self.server = server
+        self._original_sigusr1 = None
+
+    def __enter__(self) -> "ProfilingTrigger":
+        """Install the SIGUSR1 handler."""
+        self._original_sigusr1 = signal(SIGUSR1, self._handle_signal)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> bool:
+        """Restore the original SIGUSR1 handler."""
+        if self._original_sigusr1 is not None:
+            signal(SIGUSR1, self._original_sigusr1)
+        return False  # Don't suppress exceptions
+
+    def _handle_signal(self, signum: int, frame: FrameType | None) -> None:
+        """Signal handler that toggles profiling."""
+        log.info("Received SIGUSR1, toggling CPU profiling...")
+        self.server.request_profile_toggle()
+
+
+@final
+class MemoryWatchdog:
+    """Context manager that samples memory use and recycles a bloated server.
+
+    Every *poll_interval* seconds a daemon thread publishes the process's
+    resident set size and Python's allocated blocks.  Once the resident set
+    exceeds *limit_bytes*, garbage is collected and, if it is still over, the
+    server is asked to restart.  As on ``GracefulKill``'s signals, the server
+    stops receiving and completes its in-flight requests; ``main()`` then
+    exits with ``RESTART_EXIT_CODE`` for the process supervisor to start a
+    fresh process.
+    """
+
+    def __init__(
+        self,
+        server: ZMQServer,
+        metric_exporter: MetricExporter,
+        limit_bytes: int = NO_MEMORY_LIMIT,
+        poll_interval: float = DEFAULT_MEMORY_CHECK_INTERVAL,
+    ):
+        self.server = server
+        self._metric = metric_exporter
+        self._limit_bytes = limit_bytes
+        self._poll_interval = poll_interval
+        self._stop_watching = threading.Event()
+        self._watcher: threading.Thread | None = None
+
+    def __enter__(self) -> "MemoryWatchdog":
+        """Start sampling memory."""
+        if self._limit_bytes > 0:
+            if sample_memory().resident_bytes is None:
+                log.warning("Resident memory cannot be read here, memory limit ignored.")
+            else:
+                log.info(f"Restarting the server above {self._limit_bytes} bytes resident.")
+        self._watcher = threading.Thread(
+            target=self._watch, name="qat-memory-watchdog", daemon=True
+        )
+        self._watcher.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> bool:
+        """Stop sampling memory."""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        return False  # Don't suppress exceptions
+
+    def _watch(self) -> None:
+        while not self._stop_watching.wait(self._poll_interval):
+            if self.check():
+                return
+
+    def check(self) -> bool:
+        """Publish a memory sample, and request a restart if it is over the limit.
+
+        Returns whether a restart was requested.
+        """
+        if not self._over_limit(self._publish(sample_memory())):
+            return False
+        # Collecting reference cycles may bring it back under without a restart
+        gc.collect()
+        sample = self._publish(sample_memory())
+        if not self._over_limit(sample):
+            return False
+        log.warning(
+            f"Resident memory of {sample.resident_bytes} bytes exceeds the "
+            f"{self._limit_bytes} byte limit, restarting once in-flight requests "
+            f"complete."
+        )
+        self.server.request_restart()
+        return True
+
+    def _over_limit(self, sample: MemorySample) -> bool:
+        return (
+            self._limit_bytes > 0
+            and sample.resident_bytes is not None
+            and sample.resident_bytes > self._limit_bytes
+        )
+
+    def _publish(self, sample: MemorySample) -> MemorySample:
+        if sample.resident_bytes is not None:
+            with self._metric.resident_memory() as resident:
+                resident.observe(sample.resident_bytes)
+        with self._metric.python_allocated_blocks() as blocks:
+            blocks.observe(sample.allocated_blocks)
+        return sample
+
+
 def main() -> None:
     """Server entrypoint — configure from environment variables and run."""
     # Validate receiver port first
@@ -299,7 +978,10 @@ def main() -> None:
         excluded_ports={receiver_port},
     )
 
-    metric_exporter = MetricExporter(backend=PrometheusReceiver(port=metrics_port))
+    # Counters and histograms are recorded per thread and flushed by the server loop
+    metric_exporter = MetricExporter(
+        backend=PrometheusReceiver(port=metrics_port), batched=True
+    )
 
     # Resolve QAT config path from environment or use default
     qat_config_path = resolve_qat_config_path(os.getenv("QAT_CONFIG_PATH"))
@@ -309,17 +991,152 @@ def main() -> None:
     if not compile_enabled:
         log.info("Compile and execute endpoints are disabled.")
 
+    # Pipelining: compile workers feed a bounded queue drained by one execute stage
+    compile_workers = validate_positive_int(
+        os.getenv("COMPILE_WORKERS"), "compile workers", DEFAULT_COMPILE_WORKERS
+    )
+    execute_queue_size = validate_positive_int(
+        os.getenv("EXECUTE_QUEUE_SIZE"), "execute queue size", DEFAULT_EXECUTE_QUEUE_SIZE
+    )
+
+    # Structured request logging: sample a fraction and truncate payload previews
+    request_logger = RequestLogger(
+        sample_rate=validate_fraction(
+            os.getenv("REQUEST_LOG_SAMPLE_RATE"),
+            "request log sample rate",
+            DEFAULT_SAMPLE_RATE,
+        ),
+        max_payload_chars=validate_positive_int(
+            os.getenv("REQUEST_LOG_MAX_PAYLOAD"),
+            "request log max payload",
+            DEFAULT_MAX_PAYLOAD_CHARS,
+        ),
+    )
+
+    package_store_bytes = validate_positive_int(
+        os.getenv("PACKAGE_STORE_BYTES"), "package store bytes", DEFAULT_PACKAGE_STORE_BYTES
+    )
+
+    # Operator-defined CompilerConfig presets that requests can reference by name
+    config_presets = ConfigPresets()
+    presets_path = os.getenv("CONFIG_PRESETS_PATH")
+    if presets_path:
+        config_presets.load(Path(presets_path))
+        log.info(f"Loaded {len(config_presets)} config presets from {presets_path}.")
+
+    # Optional cap on request frame size, advertised to clients in the handshake
+    max_message_size = validate_positive_int(
+        os.getenv("MAX_MESSAGE_SIZE"), "max message size", UNLIMITED_MESSAGE_SIZE
+    )
+
+    # Optional per-request tracing spans, written to a local file
+    tracer = Tracer()
+    trace_path = os.getenv("TRACE_PATH")
+    if trace_path:
+        trace_format = os.getenv("TRACE_FORMAT", "jsonl").lower()
+        if trace_format not in TRACE_FORMATS:
+            log.warning(f"Trace format must be one of {', '.join(TRACE_FORMATS)}.")
+            log.info("Defaulting trace format to jsonl.")
+            trace_format = "jsonl"
+        tracer = Tracer(span_exporter(Path(trace_path), trace_format))
+        log.info(f"Writing {trace_format} request traces to {trace_path}.")
+
+    # Profiling windows on demand; per-request profiles only above a latency threshold
+    profiler = Profiler(
+        output_dir=Path(os.getenv("PROFILE_DIR") or DEFAULT_PROFILE_DIR),
+        slow_threshold=validate_positive_float(
+            os.getenv("SLOW_REQUEST_THRESHOLD"), "slow request threshold", None
+        ),
+    )
+    if profiler.slow_threshold is not None:
+        log.info(
+            f"Saving profiles of requests slower than {profiler.slow_threshold}s "
+            f"to {profiler.output_dir}."
+        )
+
+    # Per-request resource usage is always measured; reporting and memory are opt-in
+    resource_meter = ResourceMeter(
+        report=os.getenv("RESOURCE_DIAGNOSTICS", "false").lower() == "true",
+        track_memory=os.getenv("TRACK_PEAK_MEMORY", "false").lower() == "true",
+    )
+    if resource_meter.track_memory:
+        log.info("Tracking peak memory per request, allocations will be slower.")
+
+    # Optional capture of a sample of requests, for replay against another server
+    recorder = TrafficRecorder()
+    capture_path = os.getenv("CAPTURE_PATH")
+    if capture_path:
+        recorder = TrafficRecorder(
+            Path(capture_path),
+            sample_rate=validate_fraction(
+                os.getenv("CAPTURE_SAMPLE_RATE"), "capture sample rate", 1.0
+            ),
+            record_responses=os.getenv("CAPTURE_RESPONSES", "false").lower() == "true",
+        )
+        log.info(f"Capturing requests to {capture_path}.")
+
+    # Optional simulated QPU latency and faults, for load tests in echo mode only
+    simulation = Simulation()
+    simulation_path = os.getenv("SIMULATION_CONFIG")
+    if simulation_path and qat_config_path is not None:
+        log.warning("Ignoring SIMULATION_CONFIG, it only applies in echo mode.")
+    elif simulation_path:
+        simulation = Simulation(
+            SimulationSettings.model_validate_json(Path(simulation_path).read_text())
+        )
+        log.info(f"Simulating QPU latency and faults from {simulation_path}.")
+
     server = ZMQServer(
         metric_exporter=metric_exporter,
         server_port=receiver_port,
         qat_config_path=qat_config_path,
         compile_enabled=compile_enabled,
+        compile_workers=compile_workers,
+        execute_queue_size=execute_queue_size,
+        request_logger=request_logger,
+        package_store_bytes=package_store_bytes,
+        config_presets=config_presets,
+        max_message_size=max_message_size,
+        tracer=tracer,
+        profiler=profiler,
+        resource_meter=resource_meter,
+        recorder=recorder,
+        simulation=simulation,
+    )
+
+    # Optional calibration file to watch for hot reloads (SIGHUP always reloads)
+    watch_path = os.getenv("CALIBRATION_WATCH_PATH")
+
+    # Memory is always sampled; the process is only recycled above a set limit
+    memory_watchdog = MemoryWatchdog(
+        server,
+        metric_exporter,
+        limit_bytes=validate_positive_int(
+            os.getenv("MEMORY_LIMIT_BYTES"), "memory limit bytes", NO_MEMORY_LIMIT
+        ),
+        poll_interval=validate_positive_float(
+            os.getenv("MEMORY_CHECK_INTERVAL"),
+            "memory check interval",
+            DEFAULT_MEMORY_CHECK_INTERVAL,
+        ),
     )
 
     log.info(f"QAT RPC Server Starting, address: {server.address}")
 
-    with GracefulKill(server):
-        server.run()
+    with (
+        GracefulKill(server),
+        HardwareReloadTrigger(server, Path(watch_path) if watch_path else None),
+        ProfilingTrigger(server),
+        memory_watchdog,
+    ):
+        try:
+            server.run()
+        finally:
+            tracer.close()
+
+    if server.restart_requested:
+        log.info("Server stopped for a restart.")
+        sys.exit(RESTART_EXIT_CODE)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Compact tagged envelope for requests on the ZMQ wire.
+
+Pickling a pydantic model writes its class path and internal state
+(``__dict__``, ``__pydantic_fields_set__``, extras and private attributes),
+and rebuilds all of it on the other side.  Compact clients instead send a
+header frame followed by a pickled ``(tag, values)`` tuple.  *tag* is a
+small integer naming the request type and *values* are its fields in
+declaration order.  Tags are part of the wire contract: never renumber or
+reuse one, and only ever append new fields (with defaults) to a request.
+
+Servers accept both forms.  A message without the header frame is unpickled
+as before, so older clients keep working.
+
+Clients find out what a server supports with a ``HelloRequest`` handshake,
+sent as a plain ``("hello", version, capabilities)`` tuple so that servers
+which predate it reply with an error instead of failing to unpickle it.
+
+Servers advertising the ``request_id`` feature also accept a request id
+ahead of either form, as a header frame and an ASCII id frame, which they
+use to tag tracing spans.
+"""
+
+import pickle
+from typing import Any
+
+from qat_rpc.models import (
+    CompilePipelinesRequest,
+    CompileRequest,
+    CouplingsRequest,
+    ExecutePipelinesRequest,
+    ExecuteRequest,
+    HelloRequest,
+    ProfileRequest,
+    ProgramRequest,
+    QpuInfoRequest,
+    QubitInfoRequest,
+    RegisterConfigRequest,
+    ReloadHardwareRequest,
+    Request,
+    UploadPackageRequest,
+    VersionRequest,
+)
+from qat_rpc.zmq._base import loads
+
+COMPACT_HEADER = b"qat-rpc/compact/1"
+
+REQUEST_ID_HEADER = b"qat-rpc/request-id/1"
+
+PROTOCOL_VERSION = 1
+
+# Request codecs this release speaks, fastest first
+CODECS = ("compact", "pickle")
+
+# No compression is implemented yet; advertised so one can be added later
+COMPRESSIONS: tuple[str, ...] = ()
+
+FEATURES = ("packed_results", "package_store", "config_presets", "request_id")
+
+HELLO = "hello"
+
+REQUEST_TAGS: dict[type[Request], int] = {
+    ProgramRequest: 1,
+    CompileRequest: 2,
+    ExecuteRequest: 3,
+    VersionRequest: 4,
+    CouplingsRequest: 5,
+    QubitInfoRequest: 6,
+    QpuInfoRequest: 7,
+    CompilePipelinesRequest: 8,
+    ExecutePipelinesRequest: 9,
+    ReloadHardwareRequest: 10,
+    UploadPackageRequest: 11,
+    RegisterConfigRequest: 12,
+    HelloRequest: 13,
+    ProfileRequest: 14,
+}
+
+_REQUEST_TYPES = {tag: request_type for request_type, tag in REQUEST_TAGS.items()}
+_FIELDS = {request_type: tuple(request_type.model_fields) for request_type in REQUEST_TAGS}
+
+
+def encode_request(request: Request) -> bytes:
+    """Pickle *request* as a compact ``(tag, values)`` envelope."""
+    request_type = type(request)
+    values = tuple(getattr(request, name) for name in _FIELDS[request_type])
+    return pickle.dumps(
+        (REQUEST_TAGS[request_type], values), protocol=pickle.DEFAULT_PROTOCOL
+    )
+
+
+def decode_request(payload: bytes) -> Request:
+    """Rebuild a ``Request`` from a compact envelope, validating its fields."""
+    tag, values = loads(payload)
+    request_type = _REQUEST_TYPES.get(tag)
+    if request_type is None:
+        raise ValueError(f"Unknown request tag: {tag!r}")
+    fields = _FIELDS[request_type]
+    if len(values) > len(fields):
+        raise ValueError(f"Too many values for {request_type.__name__}: {len(values)}.")
+    # Fields added later are appended with defaults, so older clients may send fewer
+    return request_type(**dict(zip(fields, values, strict=False)))
+
+
+def hello_message(request: HelloRequest) -> tuple[str, int, dict[str, Any]]:
+    """The legacy-tuple form of *request*, safe to send to any server version.
+
+    Servers that predate the handshake reply with an unrecognized message
+    error, which clients take to mean "pickled requests only".
+    """
+    capabilities = request.model_dump(exclude={"protocol_version"})
+    return (HELLO, request.protocol_version, capabilities)
+
+
+def choose_codec(capabilities: dict[str, Any]) -> str:
+    """The fastest codec both sides support, given the server's capabilities."""
+    offered = capabilities.get("codecs") or ()
+    return next((codec for codec in CODECS if codec in offered), "pickle")
+
+
+def split_envelope(frames: list[bytes]) -> tuple[list[bytes], list[bytes]]:
+    """Split ROUTER frames into the routing envelope and the message body.
+
+    The envelope runs up to and including the empty delimiter frame that
+    REQ sockets insert; everything after it is the message.
+    """
+    try:
+        delimiter = frames.index(b"")
+    except ValueError:
+        return frames[:-1], frames[-1:]
+    return frames[: delimiter + 1], frames[delimiter + 1 :]
+
+
+def split_request_id(body: list[bytes]) -> tuple[str | None, list[bytes]]:
+    """Separate the optional request id frames from a message body."""
+    if len(body) > 2 and body[0] == REQUEST_ID_HEADER:
+        return body[1].decode("ascii"), body[2:]
+    return None, body
+
+
+def decode_message(body: list[bytes]) -> Any:
+    """Decode a message body: a compact envelope or a single pickled object."""
+    match body:
+        case [header, payload] if header == COMPACT_HEADER:
+            return decode_request(payload)
+        case [payload]:
+            return loads(payload)
+    raise ValueError(f"Unexpected {len(body)}-frame message.")
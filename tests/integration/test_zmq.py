@@ -2,19 +2,37 @@
 # Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
 """Integration tests for the ZMQ client/server round-trip."""
 
+import io
+import json
+import socket
 import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import partial
 from importlib.metadata import version
 from pathlib import Path
+from typing import Any
 
 import pytest
+import zmq
 from compiler_config.config import CompilerConfig
 
 from qat_rpc.metrics import (
-    DEFAULT_PROMETHEUS_PORT,
     MetricExporter,
+    NullReceiverBackend,
     PrometheusReceiver,
+    TimingMutableOutcome,
+    ValueMutableOutcome,
 )
+from qat_rpc.models import ConfigRef, CountsArray, PackageRef, unpack_results
+from qat_rpc.profiling import Profiler
+from qat_rpc.resource_usage import ResourceMeter
+from qat_rpc.tracing import InMemorySpanExporter, Tracer
+from qat_rpc.zmq.batch import expand_programs, run_batch
+from qat_rpc.zmq.capture import TrafficRecorder, read_capture
 from qat_rpc.zmq.client import ZMQClient
+from qat_rpc.zmq.loadgen import LoadGenerator, parse_mix
+from qat_rpc.zmq.replay import MAX_SPEED, replay
 from qat_rpc.zmq.server import ZMQServer
 
 PROGRAM_DATA = Path(__file__).parent / "program_data"
@@ -66,21 +84,49 @@ attributes #0 = { "EntryPoint" "requiredQubits"="2" "requiredResults"="2" }
 """
 
 
-@pytest.fixture(scope="module", autouse=True)
-def _server():
-    """Start a real ZMQServer in a daemon thread for the module."""
-    server = ZMQServer(
-        metric_exporter=MetricExporter(backend=PrometheusReceiver(DEFAULT_PROMETHEUS_PORT)),
-    )
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@contextmanager
+def _running_server(**kwargs: Any) -> Iterator[int]:
+    """Run a ``ZMQServer`` built with *kwargs* in a daemon thread on a free port.
+
+    Yields the port.  Servers report metrics to the null backend unless
+    *kwargs* give a ``metric_exporter``.
+    """
+    kwargs.setdefault("metric_exporter", MetricExporter(NullReceiverBackend()))
+    port = _free_port()
+    server = ZMQServer(server_port=port, **kwargs)
     server_thread = threading.Thread(target=server.run, daemon=True)
     server_thread.start()
-    yield
-    server.stop()
+    try:
+        yield port
+    finally:
+        server.stop()
+        server_thread.join(timeout=5)
+        # Left to the garbage collector, the context can hang terminating its socket
+        server.close()
+
+
+@pytest.fixture(scope="module")
+def _server_port() -> Iterator[int]:
+    """Start a real ZMQServer, shared by the module, exporting to Prometheus."""
+    # Port 0: the scrape endpoint binds an ephemeral port nobody scrapes
+    with _running_server(metric_exporter=MetricExporter(PrometheusReceiver(0))) as port:
+        yield port
 
 
 @pytest.fixture
-def _client() -> ZMQClient:
-    return ZMQClient()
+def _client_factory(_server_port) -> Callable[..., ZMQClient]:
+    return partial(ZMQClient, client_port=_server_port)
+
+
+@pytest.fixture
+def _client(_client_factory) -> ZMQClient:
+    return _client_factory()
 
 
 def _make_config(repeats: int = 100) -> CompilerConfig:
@@ -124,13 +170,13 @@ class TestExecuteRoundTrip:
         assert "Exception" in response
         assert "validation error" in response["Exception"]
 
-    def test_concurrent_clients(self):
+    def test_concurrent_clients(self, _client_factory):
         """Results are routed to the correct client across threads."""
         errors = []
 
         def _run(repeats, expected):
             try:
-                client = ZMQClient()
+                client = _client_factory()
                 response = client.execute_task(QASM2_PROGRAM, _make_config(repeats))
                 assert response["results"] == expected
             except Exception as e:
@@ -186,3 +232,252 @@ class TestMetadataQueries:
         assert isinstance(result["execute_pipelines"], list)
         assert "default" in result
         assert isinstance(result["default"], str)
+
+
+class TestAdminRequests:
+    def test_reload_hardware(self, _client):
+        result = _client.reload_hardware()
+        assert result["hardware_reloaded"] is True
+
+        # The server keeps serving from the reloaded hardware
+        response = _client.execute_task(QASM2_PROGRAM, _make_config(100))
+        assert response["results"]["c"]["00"] == 100
+
+
+class TestHandshake:
+    def test_client_negotiates_compact_codec(self, _client):
+        assert "compact" in _client.capabilities["codecs"]
+        assert _client.api_version()["qat_rpc_version"] == version("qat_rpc")
+        assert _client._codec == "compact"
+
+    def test_pickle_codec(self, _client_factory):
+        client = _client_factory(compact=False)
+        response = client.execute_task(QASM2_PROGRAM, _make_config(100))
+        assert response["results"]["c"]["00"] == 100
+
+    def test_server_without_handshake(self):
+        """A REP server from before the handshake rejects it but keeps serving."""
+        context = zmq.Context.instance()
+        rep_socket = context.socket(zmq.REP)
+        port = rep_socket.bind_to_random_port("tcp://127.0.0.1")
+
+        def _serve_old_protocol():
+            for _ in range(2):
+                raw = rep_socket.recv_pyobj()
+                if isinstance(raw, tuple):
+                    rep_socket.send_pyobj(
+                        {"Exception": f"ValueError('Unrecognized {raw[0]}')"}
+                    )
+                else:
+                    rep_socket.send_pyobj({"qat_rpc_version": "0.9", "request": raw})
+
+        old_server = threading.Thread(target=_serve_old_protocol, daemon=True)
+        old_server.start()
+        try:
+            client = ZMQClient(client_port=port, timeout=5)
+            response = client.api_version()
+            old_server.join(timeout=5)
+        finally:
+            rep_socket.close(linger=0)
+
+        assert response["qat_rpc_version"] == "0.9"
+        assert client.capabilities == {}
+
+
+class TestCompactWire:
+    @pytest.fixture
+    def compact_client(self, _client_factory) -> ZMQClient:
+        return _client_factory(compact=True)
+
+    def test_execute_task(self, compact_client):
+        response = compact_client.execute_task(QASM2_PROGRAM, _make_config(100))
+        assert response["results"]["c"]["00"] == 100
+
+    def test_compile_then_execute(self, compact_client):
+        config = _make_config(100)
+        compiled = compact_client.compile_program(QASM2_PROGRAM, config)
+        response = compact_client.execute_compiled(compiled["package"], config)
+        assert response["results"]["c"]["00"] == 100
+
+    def test_metadata_query(self, compact_client):
+        assert compact_client.api_version()["qat_rpc_version"] == version("qat_rpc")
+
+
+class TestPackedResults:
+    def test_counts_round_trip(self, _client):
+        response = _client.execute_task(
+            QASM2_PROGRAM, _make_config(100), packed_results=True
+        )
+        assert isinstance(response["results"]["c"], CountsArray)
+        assert unpack_results(response["results"])["c"]["00"] == 100
+
+    def test_readouts_round_trip(self, _client):
+        config = _make_config(1000)
+        config.results_format.raw()
+        legacy = _client.execute_task(QASM2_PROGRAM, config)
+        packed = _client.execute_task(QASM2_PROGRAM, config, packed_results=True)
+        assert unpack_results(packed["results"]) == legacy["results"]
+
+
+class TestUploadedPackages:
+    def test_execute_uploaded_package(self, _client):
+        config = _make_config(100)
+        compiled = _client.compile_program(QASM2_PROGRAM, config)
+        ref = _client.upload_package(compiled["package"])
+
+        for _ in range(2):
+            response = _client.execute_compiled(ref, config)
+            assert response["results"]["c"]["00"] == 100
+
+    def test_unknown_package_reports_not_found(self, _client):
+        response = _client.execute_compiled(PackageRef(digest="0" * 64), _make_config())
+        assert response["package_not_found"] == "0" * 64
+
+
+class TestConfigPresets:
+    def test_execute_with_registered_config(self, _client):
+        ref = _client.register_config(_make_config(100))
+
+        for _ in range(2):
+            response = _client.execute_task(QASM2_PROGRAM, ref)
+            assert response["results"]["c"]["00"] == 100
+
+    def test_unknown_config_reports_not_found(self, _client):
+        response = _client.execute_task(QASM2_PROGRAM, ConfigRef(name="missing"))
+        assert response["config_not_found"] == "missing"
+
+
+class TestTracing:
+    def test_server_spans_share_client_request_id(self):
+        server_spans = InMemorySpanExporter()
+        client_spans = InMemorySpanExporter()
+        with _running_server(tracer=Tracer(server_spans)) as port:
+            client = ZMQClient(client_port=port, tracer=Tracer(client_spans))
+            response = client.execute_task(QASM2_PROGRAM, _make_config(100))
+
+        assert response["results"]["c"]["00"] == 100
+        request_id = client.last_request_id
+        names = [span.name for span in server_spans.spans if span.request_id == request_id]
+        assert names == [
+            "receive",
+            "decode",
+            "compile",
+            "execute",
+            "serialize",
+            "send",
+            "request",
+        ]
+        assert client_spans.spans[-1].request_id == request_id
+
+
+class TestProfiling:
+    def test_profile_window_and_slow_request(self, tmp_path):
+        with _running_server(profiler=Profiler(tmp_path, slow_threshold=1e-9)) as port:
+            client = ZMQClient(client_port=port)
+            client.start_profiling("cpu")
+            client.execute_task(QASM2_PROGRAM, _make_config(100))
+            stopped = client.stop_profiling()
+
+        assert Path(stopped["profile_path"]).is_file()
+        [details] = tmp_path.glob(f"slow-*-{client.last_request_id}.json")
+        assert json.loads(details.read_text())["type"] == "ProfileRequest"
+        assert list(tmp_path.glob("slow-*.prof"))
+
+
+class _SaturationBackend(NullReceiverBackend):
+    def __init__(self):
+        super().__init__()
+        self.lags: list[float] = []
+        self.in_flight: list[float] = []
+
+    def event_loop_lag(self, outcome: TimingMutableOutcome) -> None:
+        self.lags.append(float(outcome))
+
+    def requests_in_flight(self, outcome: ValueMutableOutcome) -> None:
+        self.in_flight.append(float(outcome))
+
+
+class TestSaturationMetrics:
+    def test_loop_lag_recorded_per_request(self):
+        backend = _SaturationBackend()
+        with _running_server(metric_exporter=MetricExporter(backend)) as port:
+            client = ZMQClient(client_port=port)
+            client.api_version()
+            client.execute_task(QASM2_PROGRAM, _make_config(100))
+
+        # The handshake, the version query and the program
+        assert len(backend.lags) == 3
+        assert all(lag >= 0.0 for lag in backend.lags)
+        assert backend.in_flight[-1] == 0.0
+
+
+class TestResourceDiagnostics:
+    def test_results_report_resource_usage(self):
+        meter = ResourceMeter(report=True, track_memory=True)
+        with _running_server(resource_meter=meter) as port:
+            client = ZMQClient(client_port=port)
+            response = client.execute_task(QASM2_PROGRAM, _make_config(100))
+
+        diagnostics = response["diagnostics"]
+        assert diagnostics["wall_time"] > 0.0
+        assert diagnostics["cpu_time"] > 0.0
+        assert diagnostics["peak_memory"] > 0
+
+    def test_diagnostics_not_reported_by_default(self, _client):
+        response = _client.execute_task(QASM2_PROGRAM, _make_config(100))
+        assert "diagnostics" not in response
+
+
+class TestLoadGenerator:
+    def test_open_loop_run_against_echo_server(self, _client_factory):
+        generator = LoadGenerator(
+            _client_factory, parse_mix("program=1,compile=1,metadata=2"), connections=4
+        )
+
+        report = generator.run(rate=20, duration=1.0, poisson=False, seed=0)
+
+        assert report["requests"] == 20
+        assert report["errors"] == 0
+        assert sum(kind["requests"] for kind in report["by_kind"].values()) == 20
+        assert 0 < report["latency"]["p50"] <= report["latency"]["p99.9"]
+
+
+class TestBatch:
+    def test_program_files_run_concurrently(self, tmp_path, _client_factory):
+        for i in range(6):
+            (tmp_path / f"program_{i}.qasm").write_text(QASM2_PROGRAM)
+        output = io.StringIO()
+
+        report = run_batch(
+            _client_factory,
+            expand_programs([str(tmp_path / "*.qasm")]),
+            _make_config(10).to_json(),
+            output,
+            connections=3,
+        )
+
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert sorted(line["index"] for line in lines) == list(range(6))
+        assert all("results" in line for line in lines)
+        assert report["errors"] == 0
+
+
+class TestCaptureReplay:
+    def test_captured_traffic_replays(self, tmp_path, _client_factory):
+        capture = tmp_path / "capture.bin"
+        with _running_server(recorder=TrafficRecorder(capture)) as port:
+            client = ZMQClient(client_port=port)
+            client.api_version()
+            client.execute_task(QASM2_PROGRAM, _make_config(100))
+
+        records = list(read_capture(capture))
+        assert [record.request_type for record in records] == [
+            "VersionRequest",
+            "ProgramRequest",
+        ]
+
+        report = replay(_client_factory, records, speed=MAX_SPEED, connections=2)
+
+        assert report["replayed"]["requests"] == 2
+        assert report["replayed"]["errors"] == 0
+        assert set(report["captured"]["by_kind"]) == {"VersionRequest", "ProgramRequest"}
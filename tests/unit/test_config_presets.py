@@ -0,0 +1,121 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Unit tests for config presets and memoized config parsing."""
+
+import hashlib
+import json
+
+import pytest
+from compiler_config.config import CompilerConfig
+
+from qat_rpc.config_presets import ConfigNotFoundError, ConfigPresets, config_from_json
+from qat_rpc.models import ConfigRef
+
+
+def _config(repeats: int = 100) -> CompilerConfig:
+    config = CompilerConfig()
+    config.repeats = repeats
+    return config
+
+
+class TestConfigFromJson:
+    def test_returns_private_copies(self):
+        text = _config(repeats=11).to_json()
+
+        first = config_from_json(text)
+        second = config_from_json(text)
+
+        assert first is not second
+        assert first.to_json() == second.to_json() == text
+
+    def test_shared_instance_is_reused(self):
+        text = _config(repeats=12).to_json()
+        assert config_from_json(text, shared=True) is config_from_json(text, shared=True)
+
+
+class TestConfigPresets:
+    def test_register_names_by_content_hash(self):
+        config = _config()
+        ref = ConfigPresets().register(config)
+        assert ref == ConfigRef(name=hashlib.sha256(config.to_json().encode()).hexdigest())
+
+    def test_get_returns_private_copy(self):
+        presets = ConfigPresets()
+        ref = presets.register(_config(repeats=5), name="five")
+
+        first = presets.get(ref.name)
+        first.repeats = 6
+
+        assert presets.get("five").repeats == 5
+
+    def test_resolve(self):
+        presets = ConfigPresets()
+        presets.register(_config(repeats=5), name="five")
+        inline = _config()
+
+        assert presets.resolve(ConfigRef(name="five")).repeats == 5
+        assert presets.resolve(inline) is inline
+
+    def test_fingerprint_matches_inline_config(self):
+        presets = ConfigPresets()
+        config = _config()
+        ref = presets.register(config)
+        assert presets.fingerprint(ref) == presets.fingerprint(config)
+
+    def test_missing_preset_raises(self):
+        with pytest.raises(ConfigNotFoundError, match="register it again"):
+            ConfigPresets().get("missing")
+
+    def test_evicts_least_recently_used_registrations(self):
+        presets = ConfigPresets(max_presets=2)
+        presets.register(_config(1), name="one")
+        presets.register(_config(2), name="two")
+        presets.get("one")  # one is now the most recently used
+
+        presets.register(_config(3), name="three")
+
+        assert presets.get("one").repeats == 1
+        with pytest.raises(ConfigNotFoundError):
+            presets.get("two")
+
+    def test_operator_presets_are_never_evicted(self):
+        presets = ConfigPresets(max_presets=1)
+        presets.add("default", _config(1))
+        presets.register(_config(2))
+        presets.register(_config(3))
+
+        assert presets.get("default").repeats == 1
+        assert len(presets) == 2
+
+    def test_clients_cannot_replace_operator_presets(self):
+        presets = ConfigPresets()
+        presets.add("default", _config())
+        with pytest.raises(ValueError, match="defined by the server"):
+            presets.register(_config(2), name="default")
+
+    def test_load_from_file(self, tmp_path):
+        path = tmp_path / "presets.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "object": json.loads(_config(1).to_json()),
+                    "string": _config(2).to_json(),
+                }
+            )
+        )
+        presets = ConfigPresets()
+
+        presets.load(path)
+
+        assert presets.get("object").repeats == 1
+        assert presets.get("string").repeats == 2
+
+    def test_load_rejects_non_object(self, tmp_path):
+        path = tmp_path / "presets.json"
+        path.write_text("[]")
+        with pytest.raises(TypeError, match="JSON object"):
+            ConfigPresets().load(path)
+
+    def test_rejects_non_positive_size(self):
+        with pytest.raises(ValueError):
+            ConfigPresets(max_presets=0)
@@ -0,0 +1,323 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Unit tests for the pipelined compile/execute executor."""
+
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from qat_rpc.executor import PipelinedExecutor, SingleFlight
+from qat_rpc.metrics import (
+    IncrementMutableOutcome,
+    MetricExporter,
+    NullReceiverBackend,
+    TimingMutableOutcome,
+)
+
+
+class _RecordingBackend(NullReceiverBackend):
+    """Records the timing outcomes reported by the executor."""
+
+    def __init__(self):
+        super().__init__()
+        self.queue_waits: list[float] = []
+        self.execute_durations: list[float] = []
+
+    def execute_queue_wait(self, outcome: TimingMutableOutcome) -> None:
+        self.queue_waits.append(float(outcome))
+
+    def execute_stage_duration(self, outcome: TimingMutableOutcome) -> None:
+        self.execute_durations.append(float(outcome))
+
+
+@pytest.fixture
+def backend():
+    return _RecordingBackend()
+
+
+@pytest.fixture
+def executor(backend):
+    executor = PipelinedExecutor(MetricExporter(backend), compile_workers=2)
+    yield executor
+    executor.shutdown()
+
+
+class TestValidation:
+    @pytest.mark.parametrize("kwargs", [{"compile_workers": 0}, {"execute_queue_size": 0}])
+    def test_rejects_non_positive_sizes(self, kwargs):
+        with pytest.raises(ValueError):
+            PipelinedExecutor(MetricExporter(NullReceiverBackend()), **kwargs)
+
+
+class TestStages:
+    def test_compile_returns_result(self, executor):
+        assert executor.compile(lambda: "compiled").result(timeout=5) == "compiled"
+
+    def test_execute_returns_result(self, executor):
+        assert executor.execute(lambda: "executed").result(timeout=5) == "executed"
+
+    def test_pipeline_hands_compile_result_to_execute(self, executor):
+        future = executor.pipeline(lambda: 21, lambda compiled: compiled * 2)
+        assert future.result(timeout=5) == 42
+
+    def test_compile_failure_skips_execute(self, executor):
+        executed = threading.Event()
+
+        def _fail():
+            raise RuntimeError("compile failed")
+
+        future = executor.pipeline(_fail, lambda _: executed.set())
+
+        with pytest.raises(RuntimeError, match="compile failed"):
+            future.result(timeout=5)
+        assert not executed.is_set()
+
+    def test_execute_failure_propagates(self, executor):
+        def _fail(_):
+            raise RuntimeError("execute failed")
+
+        with pytest.raises(RuntimeError, match="execute failed"):
+            executor.pipeline(lambda: None, _fail).result(timeout=5)
+
+    def test_execute_stage_survives_failures(self, executor):
+        def _fail():
+            raise RuntimeError("boom")
+
+        executor.execute(_fail).exception(timeout=5)
+        assert executor.execute(lambda: "ok").result(timeout=5) == "ok"
+
+
+class TestOverlap:
+    def test_next_program_compiles_while_current_executes(self, executor):
+        """The first execute blocks until the second compile has run."""
+        second_compiled = threading.Event()
+
+        def _execute_first(_):
+            return second_compiled.wait(timeout=5)
+
+        def _compile_second():
+            second_compiled.set()
+
+        first = executor.pipeline(lambda: None, _execute_first)
+        second = executor.pipeline(_compile_second, lambda _: None)
+
+        assert first.result(timeout=10) is True
+        second.result(timeout=10)
+
+    def test_executions_are_serialised(self, executor):
+        lock = threading.Lock()
+        overlapping = []
+
+        def _execute(_):
+            if not lock.acquire(blocking=False):
+                overlapping.append(True)
+                return
+            try:
+                threading.Event().wait(0.01)
+            finally:
+                lock.release()
+
+        futures = [executor.pipeline(lambda: None, _execute) for _ in range(5)]
+        for future in futures:
+            future.result(timeout=10)
+
+        assert not overlapping
+
+    def test_shutdown_finishes_submitted_work(self, backend):
+        executor = PipelinedExecutor(MetricExporter(backend))
+        futures = [executor.pipeline(lambda: None, lambda _: None) for _ in range(3)]
+
+        executor.shutdown()
+
+        assert all(future.done() for future in futures)
+
+
+class TestBackpressure:
+    def test_execute_does_not_block_when_queue_is_full(self, backend):
+        executor = PipelinedExecutor(MetricExporter(backend), execute_queue_size=1)
+        running = threading.Event()
+        release = threading.Event()
+        order = []
+
+        def _block():
+            running.set()
+            return release.wait(timeout=5)
+
+        try:
+            executing = executor.execute(_block)
+            assert running.wait(timeout=5)
+            # Would block the caller from the second job on, were it not for overflow
+            waiting = [executor.execute(lambda i=i: order.append(i)) for i in range(5)]
+            assert executor.queued == 5
+        finally:
+            release.set()
+        for future in (executing, *waiting):
+            future.result(timeout=5)
+        assert order == list(range(5))
+        executor.shutdown()
+
+    def test_compiled_work_queues_behind_earlier_overflow(self, backend):
+        executor = PipelinedExecutor(MetricExporter(backend), execute_queue_size=1)
+        running = threading.Event()
+        release = threading.Event()
+        order = []
+
+        def _block():
+            running.set()
+            return release.wait(timeout=5)
+
+        try:
+            futures = [executor.execute(_block)]
+            assert running.wait(timeout=5)
+            futures += [executor.execute(lambda: order.append("queued"))]
+            futures += [executor.execute(lambda: order.append("parked"))]
+            compiling = threading.Event()
+            futures += [
+                executor.pipeline(
+                    lambda: compiling.wait(timeout=5), lambda _: order.append("compiled")
+                )
+            ]
+            compiling.set()
+            # Wait for the compile worker to park its package behind the overflow
+            deadline = time.monotonic() + 5
+            while len(executor._overflow) < 2 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            assert len(executor._overflow) == 2
+            futures += [executor.execute(lambda: order.append("last"))]
+        finally:
+            release.set()
+        for future in futures:
+            future.result(timeout=5)
+        assert order == ["queued", "parked", "compiled", "last"]
+        executor.shutdown()
+
+    def test_shutdown_runs_overflow_first(self, backend):
+        executor = PipelinedExecutor(MetricExporter(backend), execute_queue_size=1)
+        release = threading.Event()
+        executor.execute(lambda: release.wait(timeout=5))
+        waiting = [executor.execute(lambda: None) for _ in range(3)]
+        release.set()
+
+        executor.shutdown()
+
+        assert all(future.done() for future in waiting)
+
+
+class TestMetrics:
+    def test_reports_queue_wait_and_stage_duration(self, executor, backend):
+        executor.pipeline(lambda: None, lambda _: None).result(timeout=5)
+
+        assert len(backend.queue_waits) == 1
+        assert backend.queue_waits[0] >= 0.0
+        assert len(backend.execute_durations) == 1
+
+    def test_queued_counts_work_waiting_for_either_stage(self, backend):
+        executor = PipelinedExecutor(MetricExporter(backend), execute_queue_size=2)
+        release = threading.Event()
+        try:
+            executing = executor.execute(lambda: release.wait(timeout=5))
+            compiling = executor.compile(lambda: release.wait(timeout=5))
+            waiting = [executor.compile(lambda: None), executor.execute(lambda: None)]
+            # One of each stage is busy; a compile and an execute are waiting
+            for _ in range(500):
+                if executor.queued == 2:
+                    break
+                threading.Event().wait(0.01)
+            assert executor.queued == 2
+        finally:
+            release.set()
+        for future in (executing, compiling, *waiting):
+            future.result(timeout=5)
+        assert executor.queued == 0
+
+
+class TestSingleFlight:
+    @pytest.fixture
+    def backend(self):
+        class _CoalescedBackend(NullReceiverBackend):
+            def __init__(self):
+                super().__init__()
+                self.coalesced = 0.0
+
+            def coalesced_requests(self, outcome: IncrementMutableOutcome) -> None:
+                self.coalesced += float(outcome)
+
+        return _CoalescedBackend()
+
+    @pytest.fixture
+    def single_flight(self, backend):
+        return SingleFlight(MetricExporter(backend))
+
+    def test_identical_in_flight_keys_share_a_future(self, single_flight, backend):
+        pending = Future()
+        starts = []
+
+        def _start():
+            starts.append(True)
+            return pending
+
+        first = single_flight.submit("key", _start)
+        second = single_flight.submit("key", _start)
+
+        assert first is second
+        assert len(starts) == 1
+        assert backend.coalesced == 1.0
+
+    def test_distinct_keys_start_separately(self, single_flight, backend):
+        first = single_flight.submit("a", Future)
+        second = single_flight.submit("b", Future)
+
+        assert first is not second
+        assert backend.coalesced == 0.0
+
+    def test_completed_keys_start_fresh_work(self, single_flight):
+        first = single_flight.submit("key", Future)
+        first.set_result("done")
+
+        second = single_flight.submit("key", Future)
+
+        assert second is not first
+        assert not second.done()
+
+    def test_start_runs_outside_the_lock(self, single_flight):
+        pending = Future()
+        started = threading.Event()
+        release = threading.Event()
+
+        def _slow_start():
+            started.set()
+            release.wait(timeout=5)
+            return pending
+
+        leader = threading.Thread(target=single_flight.submit, args=("slow", _slow_start))
+        leader.start()
+        try:
+            assert started.wait(timeout=5)
+            # Another key is not held up by the slow start
+            other = threading.Thread(target=single_flight.submit, args=("other", Future))
+            other.start()
+            other.join(timeout=1)
+            assert not other.is_alive()
+        finally:
+            release.set()
+            leader.join()
+
+    def test_start_errors_surface_through_the_future(self, single_flight):
+        def _fail():
+            raise RuntimeError("cannot start")
+
+        future = single_flight.submit("key", _fail)
+
+        with pytest.raises(RuntimeError, match="cannot start"):
+            future.result(timeout=5)
+
+    def test_result_of_started_work_is_shared(self, single_flight):
+        pending = Future()
+        first = single_flight.submit("key", lambda: pending)
+        second = single_flight.submit("key", lambda: pending)
+
+        pending.set_result("done")
+
+        assert first.result(timeout=5) == second.result(timeout=5) == "done"
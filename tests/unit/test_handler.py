@@ -0,0 +1,511 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Unit tests for the transport-agnostic service handler."""
+
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from compiler_config.config import CompilerConfig
+from qat.core.metrics_base import MetricsManager
+
+import qat_rpc.handler as handler_module
+from qat_rpc.config_presets import ConfigNotFoundError
+from qat_rpc.handler import QATServiceHandler
+from qat_rpc.metrics import (
+    BinaryMutableOutcome,
+    IncrementMutableOutcome,
+    LabelledTimingMutableOutcome,
+    LabelledValueMutableOutcome,
+    MetricExporter,
+    NullReceiverBackend,
+)
+from qat_rpc.models import (
+    CompileRequest,
+    ConfigRef,
+    CountsArray,
+    ExecuteRequest,
+    PackageRef,
+    ProfileRequest,
+    ProgramRequest,
+    RegisterConfigRequest,
+    ReloadHardwareRequest,
+    UploadPackageRequest,
+    VersionRequest,
+    unpack_results,
+)
+from qat_rpc.package_store import PackageNotFoundError
+from qat_rpc.profiling import Profiler
+from qat_rpc.resource_usage import ResourceMeter
+from qat_rpc.simulation import (
+    LatencyModel,
+    SimulatedFaultError,
+    Simulation,
+    SimulationSettings,
+)
+from qat_rpc.tracing import InMemorySpanExporter, Tracer
+
+
+class _RecordingBackend(NullReceiverBackend):
+    def __init__(self):
+        super().__init__()
+        self.coalesced = 0.0
+        self.reloads: list[float] = []
+        self.phases: list[dict[str, str]] = []
+        self.qat_metrics: list[tuple[str, dict[str, str], float]] = []
+        self.usage: list[tuple[str, dict[str, str], float]] = []
+
+    def coalesced_requests(self, outcome: IncrementMutableOutcome) -> None:
+        self.coalesced += float(outcome)
+
+    def hardware_reloaded(self, outcome: BinaryMutableOutcome) -> None:
+        # int() rejects an outcome never marked succeeded or failed
+        self.reloads.append(float(int(outcome)))
+
+    def request_phase_duration(self, outcome: LabelledTimingMutableOutcome) -> None:
+        self.phases.append(outcome.labels)
+
+    def optimized_instruction_count(self, outcome: LabelledValueMutableOutcome) -> None:
+        self.qat_metrics.append(("instructions", outcome.labels, float(outcome)))
+
+    def optimized_circuit_bytes(self, outcome: LabelledValueMutableOutcome) -> None:
+        self.qat_metrics.append(("circuit", outcome.labels, float(outcome)))
+
+    def physical_qubit_count(self, outcome: LabelledValueMutableOutcome) -> None:
+        self.qat_metrics.append(("qubits", outcome.labels, float(outcome)))
+
+    def request_cpu_time(self, outcome: LabelledTimingMutableOutcome) -> None:
+        self.usage.append(("cpu", outcome.labels, float(outcome)))
+
+    def request_peak_memory(self, outcome: LabelledValueMutableOutcome) -> None:
+        self.usage.append(("memory", outcome.labels, float(outcome)))
+
+
+def _fake_qat(*_):
+    """A mocked ``QAT`` instance whose compile and execute return canned values."""
+    qat = MagicMock()
+    qat.compile.return_value = ("pkg", MetricsManager())
+    qat.execute.return_value = ({"00": 10}, MetricsManager())
+    return qat
+
+
+@pytest.fixture
+def backend():
+    return _RecordingBackend()
+
+
+@pytest.fixture
+def handler(monkeypatch, backend):
+    """Handler with QAT mocked out and a real pipelined executor."""
+    monkeypatch.setattr(handler_module, "QAT", MagicMock(side_effect=_fake_qat))
+    handler = QATServiceHandler(MetricExporter(backend), compile_workers=2)
+    yield handler
+    handler.shutdown()
+
+
+@pytest.fixture
+def gated_compile(handler):
+    """Make QAT compilation block until the returned event is set."""
+    release = threading.Event()
+    calls = []
+
+    def _compile(program, config, pipeline):
+        calls.append(program)
+        release.wait(timeout=5)
+        return "pkg", MetricsManager()
+
+    handler._qat.compile.side_effect = _compile
+    return release, calls
+
+
+class TestSubmit:
+    def test_program_request_compiles_then_executes(self, handler):
+        request = ProgramRequest(program="OPENQASM 2.0;", config=CompilerConfig())
+        response = handler.submit(request).result(timeout=5)
+
+        assert response.results == {"00": 10}
+        handler._qat.execute.assert_called_once()
+        assert handler._qat.execute.call_args.args[0] == "pkg"
+
+    def test_packed_results(self, handler):
+        handler._qat.execute.return_value = ({"c": {"01": 7, "10": 3}}, MetricsManager())
+        request = ProgramRequest(
+            program="OPENQASM 2.0;", config=CompilerConfig(), packed_results=True
+        )
+
+        response = handler.submit(request).result(timeout=5)
+
+        assert isinstance(response.results["c"], CountsArray)
+        assert unpack_results(response.results) == {"c": {"01": 7, "10": 3}}
+
+
+class TestPhaseDurations:
+    def test_program_records_compile_and_execute_phases(self, handler, backend):
+        request = ProgramRequest(
+            program="prog", config=CompilerConfig(), execute_pipeline="echo8"
+        )
+
+        handler.submit(request).result(timeout=5)
+
+        assert backend.phases == [
+            {"phase": "compile", "pipeline": "default"},
+            {"phase": "execute", "pipeline": "echo8"},
+        ]
+
+
+class TestTracing:
+    def test_compile_and_execute_spans_tagged_with_request_id(self, handler):
+        exporter = InMemorySpanExporter()
+        handler._tracer = Tracer(exporter)
+        request = ProgramRequest(
+            program="prog", config=CompilerConfig(), execute_pipeline="echo8"
+        )
+
+        handler.submit(request, request_id="abc123").result(timeout=5)
+
+        assert [(s.name, s.request_id, s.attributes) for s in exporter.spans] == [
+            ("compile", "abc123", {"pipeline": "default"}),
+            ("execute", "abc123", {"pipeline": "echo8"}),
+        ]
+
+
+class TestProfiling:
+    def test_profile_requests_open_and_close_a_window(self, handler, tmp_path):
+        handler._profiler = Profiler(tmp_path)
+
+        started = handler.submit(ProfileRequest(action="start")).result(timeout=5)
+        handler.submit(ProgramRequest(program="prog", config=CompilerConfig())).result(
+            timeout=5
+        )
+        stopped = handler.submit(ProfileRequest(action="stop")).result(timeout=5)
+
+        assert started == {"profiling": "cpu", "duration": None}
+        assert stopped["profile_path"].startswith(str(tmp_path / "cpu-"))
+
+    def test_slow_handled_request_profile_saved(self, handler, tmp_path):
+        handler._profiler = Profiler(tmp_path, slow_threshold=1e-9)
+
+        handler.handle(ProgramRequest(program="prog", config=CompilerConfig()))
+
+        [details] = tmp_path.glob("slow-*.json")
+        saved = json.loads(details.read_text())
+        assert saved["type"] == "ProgramRequest"
+        assert saved["size"] == 4
+        assert (tmp_path / saved["profile"]).is_file()
+
+    def test_fast_handled_request_profile_discarded(self, handler, tmp_path):
+        handler._profiler = Profiler(tmp_path, slow_threshold=60.0)
+
+        handler.handle(ProgramRequest(program="prog", config=CompilerConfig()))
+
+        assert list(tmp_path.iterdir()) == []
+        assert handler._profiler._requests == {}
+
+
+class TestQatMetrics:
+    def test_compile_and_execute_metrics_published(self, handler, backend):
+        compiled = MetricsManager()
+        compiled.optimized_instruction_count = 35
+        compiled.optimized_circuit = "h q[0];"
+        executed = MetricsManager()
+        executed.physical_qubit_indices = [17, 18]
+        handler._qat.compile.return_value = ("pkg", compiled)
+        handler._qat.execute.return_value = ({"00": 10}, executed)
+        request = ProgramRequest(program="prog", config=CompilerConfig())
+
+        handler.submit(request).result(timeout=5)
+
+        compile_labels = {"phase": "compile", "pipeline": "default"}
+        assert backend.qat_metrics == [
+            ("instructions", compile_labels, 35.0),
+            ("circuit", compile_labels, 7.0),
+            ("qubits", {"phase": "execute", "pipeline": "default"}, 2.0),
+        ]
+
+    def test_unset_fields_are_not_published(self, handler, backend):
+        handler.compile("prog", CompilerConfig(), pipeline="fast")
+        assert backend.qat_metrics == []
+
+
+class TestResourceUsage:
+    def test_usage_published_but_not_reported_by_default(self, handler, backend):
+        request = ProgramRequest(
+            program="prog", config=CompilerConfig(), execute_pipeline="echo8"
+        )
+
+        response = handler.submit(request).result(timeout=5)
+
+        assert response.diagnostics is None
+        assert [(name, labels) for name, labels, _ in backend.usage] == [
+            ("cpu", {"phase": "compile", "pipeline": "default"}),
+            ("cpu", {"phase": "execute", "pipeline": "echo8"}),
+        ]
+
+    def test_reported_usage_covers_compile_and_execute(self, handler):
+        handler._resources = ResourceMeter(report=True)
+
+        def _compile(program, config, pipeline):
+            time.sleep(0.05)
+            return "pkg", MetricsManager()
+
+        handler._qat.compile.side_effect = _compile
+        request = ProgramRequest(program="prog", config=CompilerConfig())
+
+        compiled = handler.compile("prog", CompilerConfig())
+        response = handler.submit(request).result(timeout=5)
+
+        assert compiled.diagnostics is not None
+        assert compiled.diagnostics.wall_time >= 0.05
+        assert response.diagnostics is not None
+        assert response.diagnostics.wall_time >= 0.05
+        assert response.diagnostics.peak_memory is None
+
+    def test_peak_memory_tracked(self, handler, backend):
+        handler._resources = ResourceMeter(report=True, track_memory=True)
+
+        def _execute(package, config, pipeline):
+            bytes(2_000_000)
+            return {"00": 10}, MetricsManager()
+
+        handler._qat.execute.side_effect = _execute
+        try:
+            results = handler.execute("pkg", CompilerConfig())
+        finally:
+            handler._resources.close()
+
+        assert results.diagnostics is not None
+        assert results.diagnostics.peak_memory is not None
+        assert results.diagnostics.peak_memory >= 1_500_000
+        [(_, labels, peak)] = [usage for usage in backend.usage if usage[0] == "memory"]
+        assert labels == {"phase": "execute", "pipeline": "default"}
+        assert peak == results.diagnostics.peak_memory
+
+
+class TestSimulation:
+    def test_latency_added_to_compile_and_execute(self, handler, backend):
+        sleeps = []
+        handler._simulation = Simulation(
+            SimulationSettings(
+                compile_latency=LatencyModel(base=0.5),
+                execute_latency=LatencyModel(per_unit=0.01),
+            ),
+            sleep=sleeps.append,
+        )
+        request = ProgramRequest(program="prog", config=CompilerConfig(repeats=100))
+
+        handler.submit(request).result(timeout=5)
+
+        assert sleeps == [0.5, 1.0]
+
+    def test_failed_compile_skips_qat(self, handler):
+        handler._simulation = Simulation(SimulationSettings(failure_rate=1.0))
+        request = ProgramRequest(program="prog", config=CompilerConfig())
+
+        with pytest.raises(SimulatedFaultError):
+            handler.submit(request).result(timeout=5)
+        handler._qat.compile.assert_not_called()
+
+    def test_slow_send_holds_reply(self, handler):
+        handler._simulation = Simulation(
+            SimulationSettings(slow_send_rate=1.0, slow_send_delay=0.05)
+        )
+        request = ProgramRequest(program="prog", config=CompilerConfig())
+
+        started = time.perf_counter()
+        response = handler.submit(request).result(timeout=5)
+
+        assert response.results == {"00": 10}
+        assert time.perf_counter() - started >= 0.05
+
+
+class TestExecuteBackpressure:
+    def test_full_execute_queue_does_not_block_submit(self, monkeypatch, backend):
+        monkeypatch.setattr(handler_module, "QAT", MagicMock(side_effect=_fake_qat))
+        handler = QATServiceHandler(MetricExporter(backend), execute_queue_size=1)
+        release = threading.Event()
+
+        def _execute(package, config, pipeline):
+            release.wait(timeout=5)
+            return {"00": 10}, MetricsManager()
+
+        handler._qat.execute.side_effect = _execute
+        try:
+            executes = [
+                handler.submit(ExecuteRequest(package="pkg", config=CompilerConfig()))
+                for _ in range(4)
+            ]
+
+            version = handler.submit(VersionRequest()).result(timeout=1)
+
+            assert "qat_rpc_version" in version
+            assert not any(future.done() for future in executes)
+        finally:
+            release.set()
+            handler.shutdown()
+        for future in executes:
+            assert future.result(timeout=5).results == {"00": 10}
+
+
+class TestUploadedPackages:
+    def test_execute_by_reference(self, handler):
+        digest = handler.upload_package("pkg")["package_digest"]
+        request = ExecuteRequest(package=PackageRef(digest=digest), config=CompilerConfig())
+
+        response = handler.submit(request).result(timeout=5)
+
+        assert response.results == {"00": 10}
+        assert handler._qat.execute.call_args.args[0] == "pkg"
+
+    def test_unknown_reference_fails(self, handler):
+        request = ExecuteRequest(
+            package=PackageRef(digest="missing"), config=CompilerConfig()
+        )
+
+        with pytest.raises(PackageNotFoundError):
+            handler.submit(request).result(timeout=5)
+        handler._qat.execute.assert_not_called()
+
+    def test_upload_request(self, handler):
+        response = handler.handle(UploadPackageRequest(package="pkg"))
+        assert len(response["package_digest"]) == 64
+
+
+class TestConfigPresets:
+    def test_program_with_config_reference(self, handler):
+        config = CompilerConfig()
+        config.repeats = 42
+        name = handler.handle(RegisterConfigRequest(config=config))["config_name"]
+
+        request = ProgramRequest(program="prog", config=ConfigRef(name=name))
+        handler.submit(request).result(timeout=5)
+
+        compiled_with = handler._qat.compile.call_args.args[1]
+        assert compiled_with.repeats == 42
+        assert compiled_with is not config
+        assert handler._qat.execute.call_args.args[1] is compiled_with
+
+    def test_execute_with_named_preset(self, handler):
+        handler.register_config(CompilerConfig(), name="default")
+        request = ExecuteRequest(package="pkg", config=ConfigRef(name="default"))
+
+        assert handler.submit(request).result(timeout=5).results == {"00": 10}
+
+    def test_unknown_reference_fails(self, handler):
+        request = CompileRequest(program="prog", config=ConfigRef(name="missing"))
+
+        with pytest.raises(ConfigNotFoundError):
+            handler.submit(request).result(timeout=5)
+        handler._qat.compile.assert_not_called()
+
+    def test_reference_and_inline_config_share_a_compilation(self, handler, gated_compile):
+        release, calls = gated_compile
+        ref = handler.config_presets.register(CompilerConfig())
+
+        first = handler.submit(CompileRequest(program="prog", config=ref))
+        second = handler.submit(CompileRequest(program="prog", config=CompilerConfig()))
+        release.set()
+
+        assert first.result(timeout=5) is second.result(timeout=5)
+        assert len(calls) == 1
+
+
+class TestCompileCoalescing:
+    def test_identical_compile_requests_share_one_compilation(
+        self, handler, backend, gated_compile
+    ):
+        release, calls = gated_compile
+        request = CompileRequest(program="OPENQASM 2.0;", config=CompilerConfig())
+
+        futures = [handler.submit(request) for _ in range(3)]
+        release.set()
+
+        results = [future.result(timeout=5) for future in futures]
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert backend.coalesced == 2.0
+
+    def test_different_programs_compile_separately(self, handler, backend, gated_compile):
+        release, calls = gated_compile
+        config = CompilerConfig()
+
+        first = handler.submit(CompileRequest(program="program-a", config=config))
+        second = handler.submit(CompileRequest(program="program-b", config=config))
+        release.set()
+
+        first.result(timeout=5)
+        second.result(timeout=5)
+        assert sorted(calls) == ["program-a", "program-b"]
+        assert backend.coalesced == 0.0
+
+    def test_coalesced_program_requests_each_execute(self, handler, gated_compile):
+        release, calls = gated_compile
+        request = ProgramRequest(program="OPENQASM 2.0;", config=CompilerConfig())
+
+        futures = [handler.submit(request) for _ in range(2)]
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+
+        assert len(calls) == 1
+        assert handler._qat.execute.call_count == 2
+
+
+class TestCompileKey:
+    def test_key_depends_on_config(self):
+        config = CompilerConfig()
+        other = CompilerConfig()
+        other.repeats = 42
+
+        assert QATServiceHandler._compile_key(
+            "prog", config.to_json(), None
+        ) != QATServiceHandler._compile_key("prog", other.to_json(), None)
+
+    def test_key_distinguishes_text_and_bytes(self):
+        config = CompilerConfig().to_json()
+        assert QATServiceHandler._compile_key(
+            "prog", config, None
+        ) != QATServiceHandler._compile_key(b"prog", config, None)
+
+
+class TestReloadHardware:
+    def test_reload_swaps_in_new_qat(self, handler, backend):
+        original = handler._qat
+
+        response = handler.reload_hardware().result(timeout=5)
+
+        assert response["hardware_reloaded"] is True
+        assert handler._qat is not original
+        assert backend.reloads == [1.0]
+
+    def test_failed_reload_keeps_current_qat(self, handler, backend, monkeypatch):
+        original = handler._qat
+        monkeypatch.setattr(
+            handler_module, "QAT", MagicMock(side_effect=RuntimeError("bad calibration"))
+        )
+
+        with pytest.raises(RuntimeError, match="bad calibration"):
+            handler.reload_hardware().result(timeout=5)
+
+        assert handler._qat is original
+        assert backend.reloads == [0.0]
+
+    def test_reload_request_via_submit(self, handler):
+        response = handler.submit(ReloadHardwareRequest()).result(timeout=5)
+        assert response["hardware_reloaded"] is True
+
+    def test_in_flight_program_stays_on_its_hardware(self, handler, gated_compile):
+        """A program compiled before a reload also executes on the old instance."""
+        release, _ = gated_compile
+        original = handler._qat
+
+        future = handler.submit(
+            ProgramRequest(program="OPENQASM 2.0;", config=CompilerConfig())
+        )
+        handler.reload_hardware().result(timeout=5)
+        release.set()
+        future.result(timeout=5)
+
+        original.execute.assert_called_once()
+        handler._qat.execute.assert_not_called()
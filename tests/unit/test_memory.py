@@ -0,0 +1,37 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Unit tests for process memory sampling."""
+
+import mmap
+import sys
+
+import pytest
+
+import qat_rpc.memory as memory_module
+from qat_rpc.memory import resident_bytes, sample_memory
+
+
+class TestSampleMemory:
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+    def test_resident_bytes_grow_with_touched_memory(self):
+        # A fresh mapping, so no pages the allocator already holds are reused
+        with mmap.mmap(-1, 64 * 1024 * 1024) as data:
+            before = resident_bytes()
+            data[::4096] = b"\1" * len(data[::4096])
+            after = resident_bytes()
+
+        assert before is not None
+        assert after is not None
+        assert after - before >= 32 * 1024 * 1024
+
+    def test_resident_bytes_unavailable(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(memory_module, "_STATM", str(tmp_path / "missing"))
+        assert resident_bytes() is None
+
+    def test_allocated_blocks_count_live_objects(self):
+        before = sample_memory().allocated_blocks
+        objects = [object() for _ in range(10000)]
+        after = sample_memory().allocated_blocks
+
+        assert objects
+        assert after - before >= 10000
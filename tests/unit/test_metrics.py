@@ -2,14 +2,39 @@
 # Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
 """Unit tests for the metrics framework."""
 
+import os
+import socket
+import subprocess
+import sys
+import threading
+import urllib.request
+
 import pytest
 
 from qat_rpc.metrics import (
     BinaryMutableOutcome,
     IncrementMutableOutcome,
+    LabelledTimingMutableOutcome,
+    LabelledValueMutableOutcome,
     MetricExporter,
+    TimingMutableOutcome,
+    ValueMutableOutcome,
 )
 
+# Each worker is a separate process: multiprocess mode is fixed at import time
+_WORKER = """
+import sys
+from qat_rpc.metrics import BinaryMutableOutcome, MetricExporter, PrometheusReceiver
+
+exporter = MetricExporter(PrometheusReceiver(int(sys.argv[1])))
+with exporter.executed_messages() as executed:
+    executed.increment(3)
+with exporter.receiver_status() as status:
+    status.succeed()
+print("ready", flush=True)
+sys.stdin.read()
+"""
+
 
 class _FakeBinaryBackend:
     """Recording backend for binary outcome metrics."""
@@ -31,6 +56,22 @@ class _FakeIncrementBackend:
         self.outcomes.append(outcome)
 
 
+class _FakeMixedBackend:
+    """Recording backend with one metric of each outcome type."""
+
+    def __init__(self):
+        self.outcomes: dict[str, list] = {"status": [], "count": [], "latency": []}
+
+    def status(self, outcome: BinaryMutableOutcome):
+        self.outcomes["status"].append(outcome)
+
+    def count(self, outcome: IncrementMutableOutcome):
+        self.outcomes["count"].append(outcome)
+
+    def latency(self, outcome: LabelledTimingMutableOutcome):
+        self.outcomes["latency"].append(outcome)
+
+
 class TestMetricExporterValidation:
     def test_rejects_type_instead_of_instance(self):
         with pytest.raises(TypeError):
@@ -129,3 +170,199 @@ class TestIncrementMutableOutcome:
         for _ in range(5):
             outcome.increment()
         assert float(outcome) == 5.0
+
+
+class TestTimingMutableOutcome:
+    def test_times_elapsed_duration(self):
+        outcome = TimingMutableOutcome()
+        assert float(outcome) >= 0.0
+
+    def test_observe_overrides_elapsed_duration(self):
+        outcome = TimingMutableOutcome()
+        outcome.observe(2.5)
+        assert float(outcome) == 2.5
+
+
+class TestLabelledTimingMutableOutcome:
+    def test_labels_accumulate(self):
+        outcome = LabelledTimingMutableOutcome()
+        outcome.label(request_type="ProgramRequest")
+        outcome.label(pipeline="default")
+        assert outcome.labels == {"request_type": "ProgramRequest", "pipeline": "default"}
+
+    def test_exporter_yields_labelled_outcome(self):
+        class _LabelledBackend:
+            def __init__(self):
+                self.outcomes: list[LabelledTimingMutableOutcome] = []
+
+            def latency(self, outcome: LabelledTimingMutableOutcome):
+                self.outcomes.append(outcome)
+
+        backend = _LabelledBackend()
+        with MetricExporter(backend).latency() as latency:
+            latency.label(phase="compile")
+            latency.observe(0.5)
+
+        assert backend.outcomes[0].labels == {"phase": "compile"}
+        assert float(backend.outcomes[0]) == 0.5
+
+
+class TestValueMutableOutcome:
+    def test_observe(self):
+        outcome = ValueMutableOutcome()
+        assert float(outcome) == 0.0
+        outcome.observe(3)
+        assert float(outcome) == 3.0
+
+
+class TestLabelledValueMutableOutcome:
+    def test_defaults_to_zero(self):
+        assert float(LabelledValueMutableOutcome()) == 0.0
+
+    def test_observe_and_label(self):
+        outcome = LabelledValueMutableOutcome()
+        outcome.observe(35)
+        outcome.label(phase="compile", pipeline="default")
+        assert float(outcome) == 35.0
+        assert outcome.labels == {"phase": "compile", "pipeline": "default"}
+
+
+class TestBatchedMetricExporter:
+    @pytest.fixture
+    def backend(self):
+        return _FakeMixedBackend()
+
+    @pytest.fixture
+    def exporter(self, backend):
+        return MetricExporter(backend, batched=True)
+
+    def test_increments_wait_for_flush(self, backend, exporter):
+        for _ in range(3):
+            with exporter.count() as count:
+                count.increment()
+        assert backend.outcomes["count"] == []
+
+        exporter.flush()
+        assert [float(o) for o in backend.outcomes["count"]] == [3.0]
+
+    def test_flush_reports_only_new_increments(self, backend, exporter):
+        with exporter.count() as count:
+            count.increment(2)
+        exporter.flush()
+        exporter.flush()
+        with exporter.count() as count:
+            count.increment()
+        exporter.flush()
+
+        assert [float(o) for o in backend.outcomes["count"]] == [2.0, 1.0]
+
+    def test_increments_from_many_threads_are_summed(self, backend, exporter):
+        def _record():
+            for _ in range(1000):
+                with exporter.count() as count:
+                    count.increment()
+
+        threads = [threading.Thread(target=_record) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        exporter.flush()
+
+        assert sum(float(o) for o in backend.outcomes["count"]) == 4000.0
+
+    def test_flush_drops_cells_of_finished_threads(self, backend, exporter):
+        def _record():
+            with exporter.count() as count:
+                count.increment()
+
+        threads = [threading.Thread(target=_record) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        _record()
+        exporter.flush()
+        exporter.flush()
+
+        # Only the live main thread's cell survives, and no increment is lost
+        assert len(exporter.count._cells) == 1
+        assert sum(float(o) for o in backend.outcomes["count"]) == 21.0
+
+    def test_timings_are_immediate(self, backend, exporter):
+        with exporter.latency() as latency:
+            latency.label(phase="compile")
+            latency.observe(0.5)
+
+        [outcome] = backend.outcomes["latency"]
+        assert outcome.labels == {"phase": "compile"}
+        assert float(outcome) == 0.5
+
+    def test_binary_outcomes_are_immediate(self, backend, exporter):
+        with exporter.status() as status:
+            status.succeed()
+        assert int(backend.outcomes["status"][0]) == 1
+
+    def test_flush_interval_skips_recent_flushes(self, backend, exporter):
+        exporter.flush()
+        with exporter.count() as count:
+            count.increment()
+        exporter.flush(min_interval=60.0)
+        assert backend.outcomes["count"] == []
+
+    def test_backend_error_does_not_block_other_metrics(self):
+        class _FailingBackend(_FakeMixedBackend):
+            def aborted(self, outcome: IncrementMutableOutcome):
+                raise RuntimeError("backend down")
+
+        backend = _FailingBackend()
+        exporter = MetricExporter(backend, batched=True)
+        with exporter.aborted() as aborted:
+            aborted.increment()
+        with exporter.count() as count:
+            count.increment()
+        exporter.flush()
+
+        assert len(backend.outcomes["count"]) == 1
+
+
+class TestPrometheusMultiprocess:
+    @pytest.fixture
+    def port(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    @pytest.fixture
+    def workers(self, tmp_path, port):
+        """Two worker processes sharing one metrics directory and port."""
+        env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+        workers = [
+            subprocess.Popen(  # noqa: S603 - runs this interpreter
+                [sys.executable, "-c", _WORKER, str(port)],
+                env=env,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+            for _ in range(2)
+        ]
+        for worker in workers:
+            # Skip the worker's log lines
+            assert "ready\n" in iter(worker.stdout.readline, "")
+        yield workers
+        for worker in workers:
+            worker.communicate(timeout=10)
+
+    @staticmethod
+    def _scrape(port: int) -> str:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as r:
+            return r.read().decode()
+
+    def test_one_endpoint_aggregates_all_workers(self, port, workers):
+        # Whichever worker bound the port first serves both
+        scraped = self._scrape(port)
+
+        assert "executed_messages_total 6.0" in scraped
+        for worker in workers:
+            assert f'receiver_status{{pid="{worker.pid}"}} 1.0' in scraped
@@ -2,6 +2,9 @@
 # Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
 """Unit tests for Pydantic request models."""
 
+import pickle
+
+import numpy as np
 import pytest
 from compiler_config.config import CompilerConfig
 from pydantic import ValidationError
@@ -9,13 +12,23 @@ from pydantic import ValidationError
 from qat_rpc.models import (
     CompilePipelinesRequest,
     CompileRequest,
+    ConfigRef,
+    CountsArray,
     CouplingsRequest,
     ExecutePipelinesRequest,
     ExecuteRequest,
+    PackageRef,
     ProgramRequest,
     QpuInfoRequest,
     QubitInfoRequest,
+    ReadoutArray,
+    RegisterConfigRequest,
+    ReloadHardwareRequest,
+    ResourceUsage,
+    UploadPackageRequest,
     VersionRequest,
+    pack_results,
+    unpack_results,
 )
 
 
@@ -42,6 +55,10 @@ class TestProgramRequest:
         with pytest.raises(ValidationError):
             msg.program = "modified"
 
+    def test_construction_with_config_reference(self):
+        msg = ProgramRequest(program="OPENQASM 2.0;", config=ConfigRef(name="preset"))
+        assert msg.config == ConfigRef(name="preset")
+
     def test_missing_required_fields(self):
         with pytest.raises(ValidationError):
             ProgramRequest.model_validate({})
@@ -76,6 +93,67 @@ class TestExecuteRequest:
         )
         assert msg.pipeline == "exec_pipe"
 
+    def test_with_package_reference(self):
+        msg = ExecuteRequest(package=PackageRef(digest="abc"), config=CompilerConfig())
+        assert msg.package == PackageRef(digest="abc")
+
+
+class TestOlderPickles:
+    """Requests pickled by clients whose models predate fields added since."""
+
+    @pytest.mark.parametrize(
+        "request_",
+        [
+            ProgramRequest(program="OPENQASM 2.0;", config=CompilerConfig()),
+            ExecuteRequest(package="pkg", config=CompilerConfig()),
+        ],
+    )
+    def test_missing_fields_get_defaults(self, monkeypatch, request_):
+        request_type = type(request_)
+        getstate = request_type.__getstate__
+
+        def _without_packed_results(self):
+            state = getstate(self)
+            values = dict(state["__dict__"])
+            del values["packed_results"]
+            return {**state, "__dict__": values}
+
+        monkeypatch.setattr(request_type, "__getstate__", _without_packed_results)
+        data = pickle.dumps(request_)
+        monkeypatch.undo()
+
+        restored = pickle.loads(data)  # noqa: S301  # nosec B301
+
+        assert restored.packed_results is False
+        match restored:
+            case (
+                ProgramRequest(packed_results=False) | ExecuteRequest(packed_results=False)
+            ):
+                pass
+            case _:
+                pytest.fail("Older request does not match its class pattern.")
+
+
+class TestUploadPackageRequest:
+    def test_construction(self):
+        assert UploadPackageRequest(package="serialized_package").package == (
+            "serialized_package"
+        )
+
+    def test_requires_package(self):
+        with pytest.raises(ValidationError):
+            UploadPackageRequest.model_validate({})
+
+
+class TestRegisterConfigRequest:
+    def test_construction_with_defaults(self):
+        msg = RegisterConfigRequest(config=CompilerConfig())
+        assert msg.name is None
+
+    def test_requires_config(self):
+        with pytest.raises(ValidationError):
+            RegisterConfigRequest.model_validate({"name": "preset"})
+
 
 class TestVersionRequest:
     def test_construction(self):
@@ -101,8 +179,101 @@ class TestHardwareInfoRequests:
 
 class TestPipelineQueryRequests:
     @pytest.mark.parametrize(
-        "request_cls", [CompilePipelinesRequest, ExecutePipelinesRequest]
+        "request_cls",
+        [CompilePipelinesRequest, ExecutePipelinesRequest, ReloadHardwareRequest],
     )
     def test_construction(self, request_cls):
         msg = request_cls()
         assert msg.model_dump() == {}
+
+
+class TestCountsArray:
+    def test_round_trip_preserves_order(self):
+        counts = {"101": 7, "000": 2, "111": 1}
+        packed = CountsArray.from_counts(counts)
+
+        assert packed is not None
+        assert packed.width == 3
+        assert packed.outcomes.tolist() == [5, 0, 7]
+        assert list(packed.to_dict().items()) == list(counts.items())
+
+    def test_64_bit_outcomes(self):
+        counts = {"1" * 64: 3, "0" * 63 + "1": 4}
+        packed = CountsArray.from_counts(counts)
+
+        assert packed is not None
+        assert packed.to_dict() == counts
+
+    @pytest.mark.parametrize(
+        "counts",
+        [
+            {},
+            {"0" * 65: 1},
+            {"01": 1, "011": 2},
+            {"0x": 1},
+            {"01": 0.5},
+            {1: 2},
+            {"é1": 1},
+        ],
+    )
+    def test_non_bitstring_counts_not_packed(self, counts):
+        assert CountsArray.from_counts(counts) is None
+
+
+class TestReadoutArray:
+    @pytest.mark.parametrize(
+        "readouts", [[0, 1, 1], [[1, 0], [0, 1]], [0.5, -1.25], [1 + 2j], [True]]
+    )
+    def test_round_trip(self, readouts):
+        packed = ReadoutArray.from_readouts(readouts)
+
+        assert packed is not None
+        assert packed.to_list() == readouts
+
+    @pytest.mark.parametrize("readouts", [[[1], [0, 1]], ["a", "b"], [None]])
+    def test_irregular_or_non_numeric_not_packed(self, readouts):
+        assert ReadoutArray.from_readouts(readouts) is None
+
+
+class TestPackResults:
+    def test_pack_and_unpack(self):
+        results = {"c": {"01": 60, "10": 40}, "r": [[0, 1], [1, 1]], "other": "value"}
+        packed = pack_results(results)
+
+        assert isinstance(packed["c"], CountsArray)
+        assert isinstance(packed["r"], ReadoutArray)
+        assert packed["other"] == "value"
+        assert unpack_results(packed) == results
+
+    def test_unpack_leaves_legacy_results(self):
+        results = {"c": {"01": 60}}
+        assert unpack_results(results) == results
+
+    def test_integer_readouts_are_narrowed(self):
+        packed = pack_results({"r": [3, -2, 100]})
+        assert packed["r"].values.dtype == np.int8
+
+    def test_binary_readouts_are_bit_packed(self):
+        readouts = [[1, 0, 1]] * 8
+        packed = ReadoutArray.from_readouts(readouts)
+
+        assert packed is not None
+        assert packed.shape == (8, 3)
+        assert packed.values.nbytes == 3
+        assert packed.to_list() == readouts
+
+
+class TestResourceUsage:
+    def test_merge_sums_times_and_keeps_highest_peak(self):
+        compiled = ResourceUsage(wall_time=1.0, cpu_time=0.75, peak_memory=4096)
+        executed = ResourceUsage(wall_time=2.0, cpu_time=0.25, peak_memory=1024)
+
+        assert compiled.merge(executed) == ResourceUsage(
+            wall_time=3.0, cpu_time=1.0, peak_memory=4096
+        )
+
+    def test_merge_without_memory(self):
+        merged = ResourceUsage(wall_time=1.0, cpu_time=1.0).merge(
+            ResourceUsage(wall_time=1.0, cpu_time=1.0)
+        )
+        assert merged.peak_memory is None
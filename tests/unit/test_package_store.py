@@ -0,0 +1,59 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Unit tests for the content-addressed package store."""
+
+import hashlib
+
+import pytest
+
+from qat_rpc.models import PackageRef
+from qat_rpc.package_store import PackageNotFoundError, PackageStore
+
+
+class TestPackageStore:
+    def test_put_returns_content_hash(self):
+        ref = PackageStore().put("package")
+        assert ref == PackageRef(digest=hashlib.sha256(b"package").hexdigest())
+
+    def test_get_returns_stored_package(self):
+        store = PackageStore()
+        package = {"instructions": [1, 2, 3]}
+        ref = store.put(package)
+        assert store.get(ref.digest) is package
+
+    def test_identical_packages_stored_once(self):
+        store = PackageStore()
+        assert store.put("package") == store.put("package")
+        assert len(store) == 1
+        assert store.nbytes == len(b"package")
+
+    def test_missing_digest_raises(self):
+        with pytest.raises(PackageNotFoundError, match="upload it again"):
+            PackageStore().get("0" * 64)
+
+    def test_resolve(self):
+        store = PackageStore()
+        ref = store.put("package")
+        assert store.resolve(ref) == "package"
+        assert store.resolve("inline") == "inline"
+
+    def test_evicts_least_recently_used_over_budget(self):
+        store = PackageStore(max_bytes=10)
+        first = store.put("aaaa")
+        second = store.put("bbbb")
+        store.get(first.digest)  # first is now the most recently used
+
+        store.put("cccc")
+
+        assert store.get(first.digest) == "aaaa"
+        with pytest.raises(PackageNotFoundError):
+            store.get(second.digest)
+        assert store.nbytes == 8
+
+    def test_rejects_package_over_budget(self):
+        with pytest.raises(ValueError, match="exceeds the store budget"):
+            PackageStore(max_bytes=4).put("too large")
+
+    def test_rejects_non_positive_budget(self):
+        with pytest.raises(ValueError):
+            PackageStore(max_bytes=0)
@@ -0,0 +1,188 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Unit tests for profiling windows and slow-request profiles."""
+
+import json
+import pstats
+import threading
+import tracemalloc
+from unittest.mock import patch
+
+import pytest
+
+from qat_rpc.profiling import Profiler
+
+
+def _work():
+    return sum(i * i for i in range(1000))
+
+
+def _in_thread(profiler, request_id):
+    def run():
+        with profiler.profile(request_id):
+            _work()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+
+
+def _refused(profile):
+    raise ValueError("Another profiling tool is already active")
+
+
+def _functions(path):
+    return {name for _, _, name in pstats.Stats(str(path)).stats}  # type: ignore[attr-defined]
+
+
+class TestWindows:
+    def test_cpu_window_merges_work_units(self, tmp_path):
+        profiler = Profiler(tmp_path)
+
+        profiler.start("cpu")
+        assert profiler.active == "cpu"
+        _in_thread(profiler, None)
+        path = profiler.stop()["profile_path"]
+
+        assert profiler.active is None
+        assert "_work" in _functions(path)
+
+    def test_memory_window_writes_snapshot_and_summary(self, tmp_path):
+        profiler = Profiler(tmp_path)
+
+        profiler.start("memory")
+        data = [bytes(1000) for _ in range(100)]
+        path = profiler.stop()["profile_path"]
+
+        assert data
+        assert not tracemalloc.is_tracing()
+        assert tracemalloc.Snapshot.load(path).traces
+        assert (tmp_path / path).with_suffix(".txt").read_text()
+
+    def test_memory_window_leaves_tracing_started_elsewhere(self, tmp_path):
+        tracemalloc.start()
+        try:
+            profiler = Profiler(tmp_path)
+            profiler.start("memory")
+            profiler.stop()
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+
+    def test_timed_window_stops_on_poll(self, tmp_path):
+        profiler = Profiler(tmp_path)
+        profiler.start("cpu", duration=0.0)
+
+        profiler.poll()
+
+        assert profiler.active is None
+        assert list(tmp_path.glob("cpu-*.prof"))
+
+    def test_toggle_starts_then_stops(self, tmp_path):
+        profiler = Profiler(tmp_path)
+        assert profiler.toggle() == {"profiling": "cpu", "duration": None}
+        assert "profile_path" in profiler.toggle()
+
+    def test_close_writes_open_window(self, tmp_path):
+        profiler = Profiler(tmp_path)
+        profiler.start("cpu")
+        profiler.close()
+        assert profiler.active is None
+        assert list(tmp_path.glob("cpu-*.prof"))
+
+    def test_rejects_unknown_kind(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown profile kind"):
+            Profiler(tmp_path).start("disk")
+
+    def test_one_window_at_a_time(self, tmp_path):
+        profiler = Profiler(tmp_path)
+        profiler.start("cpu")
+        try:
+            with pytest.raises(RuntimeError, match="already running"):
+                profiler.start("memory")
+        finally:
+            profiler.stop()
+
+    def test_reports_work_units_refused_a_profiler(self, tmp_path):
+        profiler = Profiler(tmp_path)
+        profiler.start("cpu")
+        # As on Python 3.12+ while another thread is being profiled
+        with patch("cProfile.Profile.enable", _refused):
+            _in_thread(profiler, None)
+            _in_thread(profiler, None)
+        stopped = profiler.stop()
+
+        assert stopped["unprofiled_work_units"] == 2
+
+    def test_stop_without_window(self, tmp_path):
+        with pytest.raises(RuntimeError, match="No profile"):
+            Profiler(tmp_path).stop()
+
+
+class TestSlowRequests:
+    def test_inactive_profiler_shares_one_noop_context(self, tmp_path):
+        profiler = Profiler(tmp_path)
+        assert profiler.profile("abc") is profiler.profile(None)
+
+    def test_slow_request_profile_and_details_saved(self, tmp_path):
+        profiler = Profiler(tmp_path, slow_threshold=0.5)
+        _in_thread(profiler, "abc")
+        _in_thread(profiler, "abc")
+
+        path = profiler.finish("abc", 0.75, lambda: {"type": "ProgramRequest", "size": 3})
+
+        assert path is not None
+        details = json.loads(path.read_text())
+        assert details == {
+            "request_id": "abc",
+            "elapsed": 0.75,
+            "profile": path.with_suffix(".prof").name,
+            "type": "ProgramRequest",
+            "size": 3,
+        }
+        assert "_work" in _functions(path.with_suffix(".prof"))
+
+    def test_fast_request_discarded_without_describing(self, tmp_path):
+        profiler = Profiler(tmp_path, slow_threshold=0.5)
+        _in_thread(profiler, "abc")
+
+        def describe():
+            raise AssertionError("fast requests are not described")
+
+        assert profiler.finish("abc", 0.25, describe) is None
+        assert list(tmp_path.iterdir()) == []
+        assert profiler._requests == {}
+
+    def test_slow_request_without_work_units_saves_details(self, tmp_path):
+        profiler = Profiler(tmp_path, slow_threshold=0.5)
+
+        path = profiler.finish("abc", 1.0, dict)
+
+        assert path is not None
+        assert json.loads(path.read_text())["profile"] is None
+
+    def test_nested_profiles_left_to_outer(self, tmp_path):
+        profiler = Profiler(tmp_path, slow_threshold=0.0)
+
+        def run():
+            with profiler.profile("outer"), profiler.profile("inner"):
+                _work()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+
+        assert set(profiler._requests) == {"outer"}
+
+    def test_slow_request_reports_work_units_refused_a_profiler(self, tmp_path):
+        profiler = Profiler(tmp_path, slow_threshold=0.5)
+        with patch("cProfile.Profile.enable", _refused):
+            _in_thread(profiler, "abc")
+
+        path = profiler.finish("abc", 1.0, dict)
+
+        assert path is not None
+        details = json.loads(path.read_text())
+        assert details["profile"] is None
+        assert details["unprofiled_work_units"] == 1
+        assert profiler._unprofiled == {}
@@ -0,0 +1,159 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Unit tests for structured, sampled request logging."""
+
+import logging
+import zlib
+from concurrent.futures import Future
+from unittest.mock import patch
+
+import pytest
+from compiler_config.config import CompilerConfig
+
+from qat_rpc.models import CompileRequest, ExecuteRequest, ProgramRequest, VersionRequest
+from qat_rpc.request_log import RequestLogger, RequestSummary
+
+
+@pytest.fixture
+def info_enabled():
+    with patch("qat_rpc.request_log._info_enabled", return_value=True):
+        yield
+
+
+class TestRequestSummary:
+    def test_reports_size_and_checksum_of_program(self):
+        program = "OPENQASM 2.0;" * 1000
+        summary = str(
+            RequestSummary(ProgramRequest(program=program, config=CompilerConfig()))
+        )
+
+        checksum = f"{zlib.crc32(program.encode()):08x}"
+        assert "type=ProgramRequest" in summary
+        assert f"size={len(program)}B" in summary
+        assert f"crc32={checksum}" in summary
+
+    def test_details_for_structured_records(self):
+        program = b"\x00bitcode"
+        details = RequestSummary(
+            CompileRequest(program=program, config=CompilerConfig())
+        ).details()
+
+        assert details == {
+            "type": "CompileRequest",
+            "size": len(program),
+            "crc32": f"{zlib.crc32(program):08x}",
+        }
+        assert RequestSummary(VersionRequest()).details() == {"type": "VersionRequest"}
+
+    def test_truncates_payload_preview(self):
+        program = "x" * 10_000
+        summary = str(
+            RequestSummary(
+                ProgramRequest(program=program, config=CompilerConfig()),
+                max_payload_chars=16,
+            )
+        )
+
+        assert "x" * 17 not in summary
+        assert "(+9984 chars)" in summary
+        assert len(summary) < 200
+
+    def test_bytes_payload_previewed_as_hex(self):
+        request = CompileRequest(program=b"\x00\xff" * 1000, config=CompilerConfig())
+        summary = str(RequestSummary(request))
+
+        assert "size=2000B" in summary
+        assert "00ff00ff" in summary
+
+    def test_execute_request_summarises_package(self):
+        package = "{" + "0" * 500 + "}"
+        summary = str(
+            RequestSummary(ExecuteRequest(package=package, config=CompilerConfig()))
+        )
+
+        assert "type=ExecuteRequest" in summary
+        assert f"size={len(package)}B" in summary
+
+    def test_legacy_tuple_uses_largest_element(self):
+        program = "OPENQASM 2.0;" * 100
+        summary = str(RequestSummary(("program", program, CompilerConfig().to_json())))
+
+        assert f"size={len(program)}B" in summary
+        assert "tag='program'" in summary
+
+    def test_requests_without_payload(self):
+        assert str(RequestSummary(VersionRequest())) == "type=VersionRequest"
+
+    def test_rendering_is_lazy_and_cached(self):
+        summary = RequestSummary(
+            ProgramRequest(program="OPENQASM 2.0;", config=CompilerConfig())
+        )
+        with patch.object(RequestSummary, "_fields", return_value=["rendered"]) as fields:
+            fields.assert_not_called()
+            assert str(summary) == "rendered"
+            assert str(summary) == "rendered"
+        fields.assert_called_once()
+
+
+class TestRequestLogger:
+    @pytest.mark.parametrize("rate", [-0.1, 1.5])
+    def test_rejects_invalid_sample_rate(self, rate):
+        with pytest.raises(ValueError, match="sample_rate"):
+            RequestLogger(sample_rate=rate)
+
+    @pytest.mark.usefixtures("info_enabled")
+    def test_zero_sample_rate_skips_logging(self):
+        assert RequestLogger(sample_rate=0.0).start(VersionRequest()) is None
+
+    @pytest.mark.usefixtures("info_enabled")
+    def test_sampled_request_logs_start_and_finish(self):
+        with patch("qat_rpc.request_log.log") as log:
+            record = RequestLogger().start(VersionRequest())
+            assert record is not None
+            record.finish()
+
+        messages = [call.args[0] for call in log.info.call_args_list]
+        assert messages[0].startswith("Handling request")
+        assert messages[1].startswith("Handled request")
+
+    @pytest.mark.usefixtures("info_enabled")
+    def test_failed_request_logged_with_error_type(self):
+        with patch("qat_rpc.request_log.log") as log:
+            record = RequestLogger().start(VersionRequest())
+            assert record is not None
+            record.finish(error=RuntimeError("boom"))
+
+        assert log.info.call_args.args[0].startswith("Request failed")
+        assert "RuntimeError" in log.info.call_args.args
+
+    @pytest.mark.usefixtures("info_enabled")
+    def test_cancelled_request_logged_as_cancelled(self):
+        future = Future()
+        future.cancel()
+        with patch("qat_rpc.request_log.log") as log:
+            record = RequestLogger().start(VersionRequest())
+            assert record is not None
+            record.finish(future)
+
+        assert log.info.call_args.args[0].startswith("Request cancelled")
+
+    def test_disabled_info_skips_summary(self):
+        with (
+            patch("qat_rpc.request_log._info_enabled", return_value=False),
+            patch.object(RequestLogger, "summarize") as summarize,
+        ):
+            assert RequestLogger().start(VersionRequest()) is None
+        summarize.assert_not_called()
+
+    def test_info_enabled_follows_logger_level(self):
+        from qat_rpc.request_log import _info_enabled, log
+
+        loggers = getattr(log, "loggers", None) or [log]
+        levels = [logger.level for logger in loggers]
+        try:
+            for logger in loggers:
+                logger.setLevel(logging.WARNING)
+            assert not _info_enabled()
+        finally:
+            for logger, level in zip(loggers, levels, strict=True):
+                logger.setLevel(level)
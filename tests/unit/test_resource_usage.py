@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Unit tests for per-request resource accounting."""
+
+import threading
+import time
+import tracemalloc
+
+import pytest
+
+from qat_rpc.resource_usage import ResourceMeter
+
+
+@pytest.fixture
+def memory_meter():
+    meter = ResourceMeter(track_memory=True)
+    yield meter
+    meter.close()
+
+
+def _spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestResourceMeter:
+    def test_measures_wall_and_cpu_time(self):
+        with ResourceMeter().measure() as measurement:
+            _spin(0.05)
+            time.sleep(0.05)
+
+        usage = measurement.usage
+        assert usage is not None
+        assert usage.wall_time >= 0.1
+        assert 0.02 < usage.cpu_time < usage.wall_time
+        assert usage.peak_memory is None
+
+    def test_cpu_time_is_the_measured_thread_only(self):
+        busy = threading.Thread(target=_spin, args=(0.2,))
+        busy.start()
+        with ResourceMeter().measure() as measurement:
+            time.sleep(0.1)
+        busy.join()
+
+        assert measurement.usage is not None
+        assert measurement.usage.cpu_time < 0.05
+
+    def test_peak_memory_includes_freed_allocations(self, memory_meter):
+        with memory_meter.measure() as measurement:
+            data = bytes(4_000_000)
+            del data
+
+        assert measurement.usage is not None
+        peak = measurement.usage.peak_memory
+        assert peak is not None
+        assert peak >= 3_500_000
+
+    def test_peak_restarts_for_each_measurement(self, memory_meter):
+        with memory_meter.measure():
+            bytes(4_000_000)
+        with memory_meter.measure() as measurement:
+            bytes(1000)
+
+        assert measurement.usage is not None
+        assert measurement.usage.peak_memory is not None
+        assert measurement.usage.peak_memory < 1_000_000
+
+    def test_close_stops_tracing_it_started(self):
+        meter = ResourceMeter(track_memory=True)
+        assert tracemalloc.is_tracing()
+        meter.close()
+        assert not tracemalloc.is_tracing()
+
+    def test_close_leaves_tracing_started_elsewhere(self):
+        tracemalloc.start()
+        try:
+            ResourceMeter(track_memory=True).close()
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+
+    def test_no_peak_once_tracing_stopped_elsewhere(self):
+        meter = ResourceMeter(track_memory=True)
+        meter.close()
+
+        with meter.measure() as measurement:
+            pass
+
+        assert measurement.usage is not None
+        assert measurement.usage.peak_memory is None
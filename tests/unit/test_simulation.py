@@ -0,0 +1,135 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Unit tests for simulated latency and faults."""
+
+import random
+import time
+from concurrent.futures import Future
+
+import pytest
+from compiler_config.config import CompilerConfig
+from pydantic import ValidationError
+
+from qat_rpc.simulation import (
+    DEFAULT_SHOTS,
+    LatencyModel,
+    SimulatedFaultError,
+    Simulation,
+    SimulationSettings,
+)
+
+
+def _simulation(**settings):
+    sleeps = []
+    simulation = Simulation(SimulationSettings(seed=0, **settings), sleep=sleeps.append)
+    return simulation, sleeps
+
+
+class TestLatencyModel:
+    def test_median_scales_with_units(self):
+        model = LatencyModel(base=0.1, per_unit=0.01)
+        assert model.sample(10, random.Random(0)) == pytest.approx(0.2)  # noqa: S311
+
+    def test_scatter_around_median(self):
+        model = LatencyModel(base=1.0, sigma=0.5)
+        rng = random.Random(0)  # noqa: S311
+        samples = sorted(model.sample(0, rng) for _ in range(1001))
+        assert samples[0] < 1.0 < samples[-1]
+        assert samples[500] == pytest.approx(1.0, rel=0.1)
+
+    def test_rejects_negative_latency(self):
+        with pytest.raises(ValidationError):
+            LatencyModel(base=-1.0)
+
+
+class TestSimulation:
+    def test_disabled_by_default(self):
+        simulation = Simulation(sleep=pytest.fail)
+        assert not simulation.enabled
+        simulation.compile("OPENQASM 2.0;")
+        simulation.execute(CompilerConfig())
+        future = Future()
+        assert simulation.delay_reply(future) is future
+
+    def test_compile_latency_scales_with_program_size(self):
+        simulation, sleeps = _simulation(compile_latency=LatencyModel(per_unit=1.0))
+        simulation.compile("x" * 2048)
+        simulation.compile(b"x" * 512)
+        assert sleeps == [2.0, 0.5]
+
+    def test_execute_latency_scales_with_shots(self):
+        simulation, sleeps = _simulation(execute_latency=LatencyModel(per_unit=0.001))
+        simulation.execute(CompilerConfig(repeats=500))
+        simulation.execute(CompilerConfig())
+        assert sleeps == pytest.approx([0.5, DEFAULT_SHOTS * 0.001])
+
+    def test_failures(self):
+        simulation, sleeps = _simulation(failure_rate=1.0)
+        with pytest.raises(SimulatedFaultError, match="compile failure"):
+            simulation.compile("prog")
+        assert sleeps == []
+
+    def test_timeouts_hold_the_stage(self):
+        simulation, sleeps = _simulation(timeout_rate=1.0, timeout_delay=30.0)
+        with pytest.raises(SimulatedFaultError, match="execute timeout"):
+            simulation.execute(CompilerConfig())
+        assert sleeps == [30.0]
+
+    def test_fault_rates(self):
+        simulation, _ = _simulation(failure_rate=0.2, timeout_rate=0.1)
+        faults = []
+        for _ in range(1000):
+            try:
+                simulation.compile("prog")
+            except SimulatedFaultError as e:
+                faults.append(str(e))
+        assert 150 < sum("failure" in fault for fault in faults) < 250
+        assert 60 < sum("timeout" in fault for fault in faults) < 140
+
+    def test_seed_repeats_a_run(self):
+        latency = LatencyModel(base=1.0, sigma=1.0)
+        runs = []
+        for _ in range(2):
+            simulation, sleeps = _simulation(compile_latency=latency)
+            for _ in range(5):
+                simulation.compile("prog")
+            runs.append(sleeps)
+        assert runs[0] == runs[1]
+
+    def test_slow_send_delays_reply(self):
+        simulation = Simulation(
+            SimulationSettings(slow_send_rate=1.0, slow_send_delay=0.05)
+        )
+        future = Future()
+        delayed = simulation.delay_reply(future)
+
+        started = time.perf_counter()
+        future.set_result("reply")
+        assert not delayed.done()
+        assert delayed.result(timeout=5) == "reply"
+        assert time.perf_counter() - started >= 0.05
+        simulation.close()
+
+    def test_slow_send_delays_errors(self):
+        simulation = Simulation(
+            SimulationSettings(slow_send_rate=1.0, slow_send_delay=0.01)
+        )
+        future = Future()
+        delayed = simulation.delay_reply(future)
+
+        future.set_exception(ValueError("boom"))
+        simulation.close()
+        with pytest.raises(ValueError, match="boom"):
+            delayed.result(timeout=5)
+
+    def test_close_waits_for_held_replies(self):
+        simulation = Simulation(
+            SimulationSettings(slow_send_rate=1.0, slow_send_delay=0.05)
+        )
+        future = Future()
+        delayed = simulation.delay_reply(future)
+        future.set_result("reply")
+
+        simulation.close()
+
+        assert delayed.done()
@@ -0,0 +1,109 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Unit tests for request tracing spans and their file exporters."""
+
+import json
+import time
+
+import pytest
+
+from qat_rpc.tracing import (
+    ChromeTraceSpanExporter,
+    InMemorySpanExporter,
+    JsonLinesSpanExporter,
+    SpanExporter,
+    Tracer,
+    new_request_id,
+    span_exporter,
+)
+
+
+class _FailingExporter(SpanExporter):
+    def export(self, span):
+        raise OSError("disk full")
+
+
+class TestTracer:
+    def test_span_records_name_id_and_duration(self):
+        exporter = InMemorySpanExporter()
+        tracer = Tracer(exporter)
+
+        before = time.time()
+        with tracer.span("compile", "abc", pipeline="default"):
+            time.sleep(0.01)
+
+        [span] = exporter.spans
+        assert (span.name, span.request_id) == ("compile", "abc")
+        assert span.attributes == {"pipeline": "default"}
+        assert span.duration >= 0.01
+        assert before - 0.01 <= span.start <= time.time()
+
+    def test_span_recorded_when_block_raises(self):
+        exporter = InMemorySpanExporter()
+        with pytest.raises(RuntimeError), Tracer(exporter).span("execute", "abc"):
+            raise RuntimeError("boom")
+        assert [span.name for span in exporter.spans] == ["execute"]
+
+    def test_record_interval_timed_elsewhere(self):
+        exporter = InMemorySpanExporter()
+        Tracer(exporter).record("receive", "abc", 10.0, 10.5)
+        assert exporter.spans[0].duration == 0.5
+
+    def test_disabled_tracer_shares_one_noop_span(self):
+        tracer = Tracer()
+        assert not tracer.enabled
+        assert tracer.span("a", None) is tracer.span("b", "abc")
+        with tracer.span("a", None):
+            pass
+
+    def test_export_errors_do_not_propagate(self):
+        with Tracer(_FailingExporter()).span("compile", "abc"):
+            pass
+
+    def test_request_ids_are_unique(self):
+        assert len({new_request_id() for _ in range(1000)}) == 1000
+
+
+class TestFileExporters:
+    def test_json_lines(self, tmp_path):
+        path = tmp_path / "trace.jsonl"
+        tracer = Tracer(JsonLinesSpanExporter(path))
+        for name in ("decode", "compile"):
+            with tracer.span(name, "abc", pipeline="default"):
+                pass
+        tracer.close()
+
+        spans = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [span["name"] for span in spans] == ["decode", "compile"]
+        assert spans[0]["request_id"] == "abc"
+        assert spans[0]["attributes"] == {"pipeline": "default"}
+
+    def test_chrome_trace_events(self, tmp_path):
+        path = tmp_path / "trace.json"
+        tracer = Tracer(ChromeTraceSpanExporter(path))
+        tracer.record("compile", "abc", 1.0, 1.25, pipeline="default")
+        tracer.close()
+
+        events = json.loads(path.read_text())
+        [thread] = [event for event in events if event.get("ph") == "M"]
+        [span] = [event for event in events if event.get("ph") == "X"]
+        assert span["name"] == "compile"
+        assert span["dur"] == pytest.approx(250_000)
+        assert span["tid"] == thread["tid"]
+        assert span["args"] == {"request_id": "abc", "pipeline": "default"}
+
+    def test_chrome_trace_readable_before_close(self, tmp_path):
+        path = tmp_path / "trace.json"
+        tracer = Tracer(ChromeTraceSpanExporter(path))
+        tracer.record("compile", "abc", 1.0, 1.25)
+        tracer.flush()
+
+        # Trace viewers accept the unterminated array; check each event parses
+        lines = path.read_text().splitlines()
+        assert lines[0] == "["
+        assert all(json.loads(line.rstrip(",")) for line in lines[1:])
+        tracer.close()
+
+    def test_unknown_format_rejected(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown trace format"):
+            span_exporter(tmp_path / "trace", "xml")
@@ -47,6 +47,20 @@ class TestReceive:
         base._socket.setsockopt.assert_called_once_with(zmq.RCVTIMEO, 1500)
         base._socket.recv_pyobj.assert_called_once_with()
 
+    def test_non_blocking_multipart_receive(self, base):
+        base._socket.recv_multipart.return_value = [b"id", b"", b"payload"]
+
+        result = base._receive_multipart(timeout=None)
+
+        assert result == [b"id", b"", b"payload"]
+        base._socket.recv_multipart.assert_called_once_with(zmq.NOBLOCK)
+
+    def test_multipart_receive_timeout_raises(self, base):
+        base._socket.recv_multipart.side_effect = zmq.ZMQError(zmq.EAGAIN)
+
+        with pytest.raises(TimeoutError):
+            base._receive_multipart(timeout=0.1)
+
     @pytest.mark.parametrize("error_code", [zmq.EAGAIN, zmq.ETERM])
     def test_non_blocking_error_returns_none(self, base, error_code):
         base._socket.recv_pyobj.side_effect = zmq.ZMQError(error_code)
@@ -76,6 +90,12 @@ class TestSend:
         base._socket.setsockopt.assert_called_once_with(zmq.SNDTIMEO, 30000)
         base._socket.send_pyobj.assert_called_once_with({"payload": "x"})
 
+    def test_send_multipart_sets_timeout_and_sends_frames(self, base):
+        base._send_multipart([b"id", b"", b"payload"])
+
+        base._socket.setsockopt.assert_called_once_with(zmq.SNDTIMEO, 30000)
+        base._socket.send_multipart.assert_called_once_with([b"id", b"", b"payload"])
+
     @pytest.mark.parametrize(
         ("error_code", "expected_exception"),
         [
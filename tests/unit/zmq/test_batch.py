@@ -0,0 +1,139 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Unit tests for batch submission of program files."""
+
+import io
+import json
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from qat_rpc.zmq import batch
+
+
+@pytest.fixture
+def programs(tmp_path):
+    for name in ("a.qasm", "b.qasm", "c.ll"):
+        (tmp_path / name).write_text(f"program {name}")
+    return tmp_path
+
+
+def _lines(output):
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def _reply(reply):
+    if isinstance(reply, Exception):
+        raise reply
+    return reply
+
+
+class TestExpandPrograms:
+    def test_paths_and_patterns(self, programs):
+        paths = batch.expand_programs([str(programs / "c.ll"), str(programs / "*.qasm")])
+        assert [path.name for path in paths] == ["c.ll", "a.qasm", "b.qasm"]
+
+    def test_manifest_relative_to_its_directory(self, programs):
+        manifest = programs / "manifest.txt"
+        manifest.write_text("# nightly\n\nc.ll\n*.qasm\n")
+
+        paths = batch.expand_programs([], manifest)
+
+        assert paths == [programs / "c.ll", programs / "a.qasm", programs / "b.qasm"]
+
+    @pytest.mark.parametrize(
+        ("name", "message"),
+        [("missing.qasm", "not found"), ("*.bc", "No program files match")],
+    )
+    def test_missing_programs_rejected(self, programs, name, message):
+        with pytest.raises(FileNotFoundError, match=message):
+            batch.expand_programs([str(programs / name)])
+
+
+class TestRunBatch:
+    def test_streams_a_line_per_program(self, programs):
+        client = MagicMock()
+        client.execute_task.side_effect = lambda program, config: {"ran": program}
+        paths = batch.expand_programs([str(programs / "*")])
+        output = io.StringIO()
+
+        report = batch.run_batch(lambda: client, paths, '{"repeats": 5}', output, 2)
+
+        lines = sorted(_lines(output), key=lambda line: line["index"])
+        assert [line["program"] for line in lines] == [str(path) for path in paths]
+        assert lines[0]["results"] == {"ran": "program a.qasm"}
+        assert all(line["latency"] >= 0 for line in lines)
+        client.execute_task.assert_any_call("program c.ll", '{"repeats": 5}')
+        assert report["requests"] == 3
+        assert report["errors"] == 0
+        assert set(report["by_kind"]) == {"qasm", "ll"}
+
+    def test_failures_reported_per_program(self, programs):
+        clients = []
+        replies = iter([TimeoutError("no reply"), {"Exception": "ValueError('bad')"}])
+
+        def connect():
+            client = MagicMock()
+            client.execute_task.side_effect = lambda *_: _reply(next(replies))
+            clients.append(client)
+            return client
+
+        output = io.StringIO()
+        paths = [programs / "a.qasm", programs / "b.qasm", programs / "missing.qasm"]
+
+        report = batch.run_batch(connect, paths, None, output, 1)
+
+        lines = _lines(output)
+        assert lines[0]["error"] == "TimeoutError: no reply"
+        assert lines[1]["error"] == "ValueError('bad')"
+        assert lines[2]["error"].startswith("FileNotFoundError")
+        assert report["errors_by_type"] == {
+            "TimeoutError": 1,
+            "server_error": 1,
+            "FileNotFoundError": 1,
+        }
+        # The timed out client is replaced, and every client closed
+        assert len(clients) == 2
+        assert all(client.close.called for client in clients)
+
+    def test_results_with_tuple_keys(self, programs):
+        client = MagicMock()
+        client.execute_task.return_value = {"c": {(0, 1): 3}, "q": [{(1,): 2}]}
+        output = io.StringIO()
+
+        report = batch.run_batch(lambda: client, [programs / "a.qasm"], None, output)
+
+        [line] = _lines(output)
+        assert line["results"] == {"c": {"(0, 1)": 3}, "q": [{"(1,)": 2}]}
+        assert report["errors"] == 0
+
+    def test_concurrency_bounded_by_connections(self, programs):
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+
+        def execute_task(program, config):
+            with lock:
+                in_flight.append(program)
+                peak.append(len(in_flight))
+            threading.Event().wait(0.02)
+            with lock:
+                in_flight.remove(program)
+            return {}
+
+        def connect():
+            client = MagicMock()
+            client.execute_task.side_effect = execute_task
+            return client
+
+        paths = [programs / "a.qasm"] * 12
+
+        report = batch.run_batch(connect, paths, None, io.StringIO(), 3)
+
+        assert report["requests"] == 12
+        assert max(peak) <= 3
+
+    def test_rejects_no_connections(self):
+        with pytest.raises(ValueError, match="connections"):
+            batch.run_batch(MagicMock, [], None, io.StringIO(), 0)
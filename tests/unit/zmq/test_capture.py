@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Unit tests for request capture files."""
+
+import pytest
+from compiler_config.config import CompilerConfig
+
+from qat_rpc.models import (
+    HelloRequest,
+    ProfileRequest,
+    ProgramRequest,
+    ReloadHardwareRequest,
+    VersionRequest,
+)
+from qat_rpc.zmq.capture import CAPTURE_HEADER, TrafficRecorder, read_capture
+
+PROGRAM = ProgramRequest(program="OPENQASM 2.0;", config=CompilerConfig())
+
+
+class TestTrafficRecorder:
+    def test_records_round_trip(self, tmp_path):
+        path = tmp_path / "capture.bin"
+        recorder = TrafficRecorder(path)
+
+        recorder.record(PROGRAM, 10.0, 10.25, False, [b"reply"])
+        recorder.record(VersionRequest(), 11.0, 11.5, True, [b"error"])
+        recorder.close()
+
+        program, version = read_capture(path)
+        assert program.request().program == PROGRAM.program
+        assert program.request_type == "ProgramRequest"
+        assert program.elapsed == 0.25
+        assert not program.failed
+        assert program.response is None
+        assert version.timestamp - program.timestamp == pytest.approx(1.0)
+        assert version.failed
+
+    def test_records_responses_on_request(self, tmp_path):
+        path = tmp_path / "capture.bin"
+        recorder = TrafficRecorder(path, record_responses=True)
+
+        recorder.record(VersionRequest(), 0.0, 1.0, False, [b"a", memoryview(b"b")])
+        recorder.close()
+
+        [record] = read_capture(path)
+        assert record.response == [b"a", b"b"]
+
+    @pytest.mark.parametrize(
+        "request_",
+        [
+            None,
+            HelloRequest(protocol_version=1),
+            ProfileRequest(action="start"),
+            ReloadHardwareRequest(),
+        ],
+    )
+    def test_handshakes_and_admin_requests_skipped(self, tmp_path, request_):
+        path = tmp_path / "capture.bin"
+        recorder = TrafficRecorder(path)
+
+        recorder.record(request_, 0.0, 1.0, False, [b"reply"])
+        recorder.close()
+
+        assert list(read_capture(path)) == []
+
+    def test_sampling(self, tmp_path):
+        path = tmp_path / "capture.bin"
+        recorder = TrafficRecorder(path, sample_rate=0.0)
+
+        recorder.record(PROGRAM, 0.0, 1.0, False, [b"reply"])
+        recorder.close()
+
+        assert list(read_capture(path)) == []
+
+    def test_appends_across_recorders(self, tmp_path):
+        path = tmp_path / "capture.bin"
+        for _ in range(2):
+            recorder = TrafficRecorder(path)
+            recorder.record(VersionRequest(), 0.0, 1.0, False, [b"reply"])
+            recorder.close()
+
+        assert path.read_bytes().count(CAPTURE_HEADER) == 1
+        assert len(list(read_capture(path))) == 2
+
+    def test_disabled_without_path(self):
+        recorder = TrafficRecorder()
+        assert not recorder.enabled
+        recorder.record(PROGRAM, 0.0, 1.0, False, [b"reply"])
+        recorder.flush()
+        recorder.close()
+
+    def test_rejects_invalid_sample_rate(self):
+        with pytest.raises(ValueError, match="sample_rate"):
+            TrafficRecorder(sample_rate=1.5)
+
+
+class TestReadCapture:
+    def test_stops_at_truncated_record(self, tmp_path):
+        path = tmp_path / "capture.bin"
+        recorder = TrafficRecorder(path)
+        recorder.record(VersionRequest(), 0.0, 1.0, False, [b"reply"])
+        recorder.record(PROGRAM, 0.0, 1.0, False, [b"reply"])
+        recorder.close()
+        path.write_bytes(path.read_bytes()[:-5])
+
+        assert [record.request_type for record in read_capture(path)] == ["VersionRequest"]
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "capture.bin"
+        path.write_bytes(b"not a capture")
+
+        with pytest.raises(ValueError, match="not a request capture"):
+            list(read_capture(path))
@@ -1,11 +1,25 @@
 # SPDX-License-Identifier: BSD-3-Clause
 # Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
-"""Unit tests for ZMQ client config normalisation."""
+"""Unit tests for the ZMQ client: config handling, presets, uploads and handshake."""
+
+import pickle
+from unittest.mock import MagicMock
 
 import pytest
 from compiler_config.config import CompilerConfig
 
+from qat_rpc.models import (
+    ConfigRef,
+    ExecuteRequest,
+    PackageRef,
+    ProgramRequest,
+    RegisterConfigRequest,
+    UploadPackageRequest,
+    VersionRequest,
+)
+from qat_rpc.tracing import InMemorySpanExporter, Tracer
 from qat_rpc.zmq.client import ZMQClient
+from qat_rpc.zmq.wire import COMPACT_HEADER, PROTOCOL_VERSION, REQUEST_ID_HEADER
 
 
 class TestBuildConfig:
@@ -33,3 +47,198 @@ class TestBuildConfig:
         result = ZMQClient._build_config(config.to_json())
         assert isinstance(result, CompilerConfig)
         assert result.repeats == 123
+
+    def test_string_parsed_once(self):
+        text = self._config(repeats=321).to_json()
+        assert ZMQClient._build_config(text) is ZMQClient._build_config(text)
+
+    def test_config_reference_passthrough(self):
+        ref = ConfigRef(name="preset")
+        assert ZMQClient._build_config(ref) is ref
+
+
+@pytest.fixture
+def client():
+    client = ZMQClient.__new__(ZMQClient)
+    client._uploads = {}
+    client._configs = {}
+    client._send_and_receive = MagicMock()
+    return client
+
+
+class TestUploadedPackages:
+    def test_upload_returns_reference(self, client):
+        client._send_and_receive.return_value = {"package_digest": "abc"}
+
+        ref = client.upload_package("pkg")
+
+        assert ref == PackageRef(digest="abc")
+        sent = client._send_and_receive.call_args.args[0]
+        assert sent == UploadPackageRequest(package="pkg")
+
+    def test_failed_upload_raises(self, client):
+        client._send_and_receive.return_value = {"Exception": "ValueError('too big')"}
+        with pytest.raises(RuntimeError, match="too big"):
+            client.upload_package("pkg")
+
+    def test_evicted_package_reuploaded_transparently(self, client):
+        client._send_and_receive.side_effect = [
+            {"package_digest": "abc"},
+            {"Exception": "PackageNotFoundError('abc')", "package_not_found": "abc"},
+            {"package_digest": "abc"},
+            {"results": {"00": 100}},
+        ]
+        ref = client.upload_package("pkg")
+
+        response = client.execute_compiled(ref)
+
+        assert response == {"results": {"00": 100}}
+        requests = [call.args[0] for call in client._send_and_receive.call_args_list]
+        assert requests[2] == UploadPackageRequest(package="pkg")
+        assert isinstance(requests[3], ExecuteRequest)
+        assert requests[3].package == ref
+
+    def test_unknown_package_not_retried(self, client):
+        missing = {"Exception": "PackageNotFoundError('abc')", "package_not_found": "abc"}
+        client._send_and_receive.return_value = missing
+
+        assert client.execute_compiled(PackageRef(digest="abc")) == missing
+        client._send_and_receive.assert_called_once()
+
+
+class TestRegisteredConfigs:
+    def test_register_returns_reference(self, client):
+        client._send_and_receive.return_value = {"config_name": "fast"}
+        config = CompilerConfig()
+
+        ref = client.register_config(config, name="fast")
+
+        assert ref == ConfigRef(name="fast")
+        sent = client._send_and_receive.call_args.args[0]
+        assert sent == RegisterConfigRequest(config=config, name="fast")
+
+    def test_failed_registration_raises(self, client):
+        client._send_and_receive.return_value = {"Exception": "ValueError('taken')"}
+        with pytest.raises(RuntimeError, match="taken"):
+            client.register_config(CompilerConfig())
+
+    def test_evicted_config_reregistered_transparently(self, client):
+        config = CompilerConfig()
+        client._send_and_receive.side_effect = [
+            {"config_name": "abc"},
+            {"Exception": "ConfigNotFoundError('abc')", "config_not_found": "abc"},
+            {"config_name": "abc"},
+            {"results": {"00": 100}},
+        ]
+        ref = client.register_config(config)
+
+        response = client.execute_task("prog", ref)
+
+        assert response == {"results": {"00": 100}}
+        requests = [call.args[0] for call in client._send_and_receive.call_args_list]
+        assert requests[2] == RegisterConfigRequest(config=config)
+        assert isinstance(requests[3], ProgramRequest)
+        assert requests[3].config == ref
+
+
+class TestHandshake:
+    @pytest.fixture
+    def client(self):
+        client = ZMQClient.__new__(ZMQClient)
+        client._codec = None
+        client._capabilities = None
+        client._tracer = Tracer()
+        client._send = MagicMock()
+        client._send_multipart = MagicMock()
+        client._await_results = MagicMock()
+        return client
+
+    @staticmethod
+    def _server(**capabilities):
+        return {"protocol_version": PROTOCOL_VERSION, **capabilities}
+
+    def test_hello_sent_as_plain_tuple(self, client):
+        client._await_results.return_value = self._server(codecs=["compact"])
+
+        client.capabilities  # noqa: B018 - triggers the handshake
+
+        hello = client._send.call_args.args[0]
+        assert hello[:2] == ("hello", PROTOCOL_VERSION)
+        assert "compact" in hello[2]["codecs"]
+
+    def test_negotiates_fastest_common_codec_once(self, client):
+        client._await_results.side_effect = [
+            self._server(codecs=["pickle", "compact"]),
+            {"qat_rpc_version": "1"},
+            {"qat_rpc_version": "1"},
+        ]
+
+        client.api_version()
+        client.api_version()
+
+        client._send.assert_called_once()
+        frames = client._send_multipart.call_args.args[0]
+        assert frames[0] == COMPACT_HEADER
+
+    def test_older_server_falls_back_to_pickle(self, client):
+        client._await_results.side_effect = [
+            {"Exception": "ValueError('Unrecognized legacy message type: hello')"},
+            {"qat_rpc_version": "0.9"},
+        ]
+
+        assert client.api_version() == {"qat_rpc_version": "0.9"}
+
+        assert client.capabilities == {}
+        frames = client._send_multipart.call_args.args[0]
+        assert len(frames) == 1
+        assert isinstance(pickle.loads(frames[0]), VersionRequest)  # noqa: S301
+
+    def test_explicit_codec_skips_handshake(self, client):
+        client._codec = "pickle"
+        client._await_results.return_value = {"qat_rpc_version": "1"}
+
+        client.api_version()
+
+        client._send.assert_not_called()
+
+    def test_oversized_request_refused(self, client):
+        client._await_results.return_value = self._server(
+            codecs=["compact"], max_message_size=64
+        )
+
+        with pytest.raises(ValueError, match="64 byte message limit"):
+            client.execute_compiled("x" * 1000)
+        client._send_multipart.assert_not_called()
+
+    def test_request_id_sent_to_servers_that_accept_it(self, client):
+        client._await_results.return_value = self._server(
+            codecs=["compact"], features=["request_id"]
+        )
+
+        client.api_version()
+
+        frames = client._send_multipart.call_args.args[0]
+        assert frames[:2] == [REQUEST_ID_HEADER, client.last_request_id.encode()]
+        assert frames[2] == COMPACT_HEADER
+
+    def test_request_id_withheld_from_older_servers(self, client):
+        client._await_results.return_value = self._server(codecs=["compact"])
+
+        client.api_version()
+
+        frames = client._send_multipart.call_args.args[0]
+        assert frames[0] == COMPACT_HEADER
+        assert client.last_request_id is not None
+
+    def test_client_span_recorded(self, client):
+        exporter = InMemorySpanExporter()
+        client._tracer = Tracer(exporter)
+        client._codec = "compact"
+        client._await_results.return_value = {"qat_rpc_version": "1"}
+
+        client.api_version()
+
+        [span] = exporter.spans
+        assert span.name == "client.request"
+        assert span.request_id == client.last_request_id
+        assert span.attributes == {"request_type": "VersionRequest"}
@@ -2,18 +2,34 @@
 # Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
 """Unit tests for command-line client behavior."""
 
+import json
+import subprocess
+import sys
+import threading
 from unittest.mock import MagicMock
 
 import pytest
+import zmq
+from compiler_config.config import CompilerConfig
 
-import qat_rpc.zmq.client_cli as client_cli
+from qat_rpc.zmq import batch, client_cli
+
+DEFAULT_CONFIG = CompilerConfig().to_json()
+
+
+@pytest.fixture
+def fake_execute(monkeypatch):
+    """Patch the single-program sender with a MagicMock, reset between tests."""
+    mock = MagicMock()
+    monkeypatch.setattr(client_cli, "_execute_program", mock)
+    return mock
 
 
 @pytest.fixture
 def fake_client(monkeypatch):
-    """Patch ZMQClient with a MagicMock, reset between tests."""
+    """Patch the batch runner's ZMQClient with a MagicMock, reset between tests."""
     mock_cls = MagicMock()
-    monkeypatch.setattr(client_cli, "ZMQClient", mock_cls)
+    monkeypatch.setattr(batch, "ZMQClient", mock_cls)
     return mock_cls
 
 
@@ -51,22 +67,23 @@ class TestReadFileOrString:
 
 
 class TestQatRun:
-    def test_success_with_inline_program(self, fake_client, capsys):
-        fake_client.return_value.execute_task.return_value = {"ok": True}
+    def test_success_with_inline_program(self, fake_execute, capsys):
+        fake_execute.return_value = {"ok": True}
 
         client_cli.qat_run(["OPENQASM 2.0;"])
 
-        fake_client.assert_called_once_with(client_ip="127.0.0.1", client_port=5556)
-        fake_client.return_value.execute_task.assert_called_once_with("OPENQASM 2.0;", None)
+        fake_execute.assert_called_once_with(
+            "127.0.0.1", 5556, "OPENQASM 2.0;", DEFAULT_CONFIG, 30.0
+        )
         assert "{'ok': True}" in capsys.readouterr().out
 
-    def test_success_with_program_and_config_files(self, tmp_path, fake_client):
+    def test_success_with_program_and_config_files(self, tmp_path, fake_execute):
         program_file = tmp_path / "program.qasm"
         config_file = tmp_path / "config.json"
         program_file.write_text("OPENQASM 2.0;")
         config_file.write_text('{"repeats": 10}')
 
-        fake_client.return_value.execute_task.return_value = {"results": {}}
+        fake_execute.return_value = {"results": {}}
 
         client_cli.qat_run(
             [
@@ -80,14 +97,150 @@ class TestQatRun:
             ]
         )
 
-        fake_client.assert_called_once_with(client_ip="localhost", client_port=6000)
-        fake_client.return_value.execute_task.assert_called_once_with(
-            "OPENQASM 2.0;", '{"repeats": 10}'
+        fake_execute.assert_called_once_with(
+            "localhost", 6000, "OPENQASM 2.0;", CompilerConfig(repeats=10).to_json(), 30.0
         )
 
     @pytest.mark.parametrize("error", [TimeoutError("timeout"), RuntimeError("boom")])
-    def test_errors_exit_with_code_1(self, fake_client, error):
-        fake_client.return_value.execute_task.side_effect = error
+    def test_errors_exit_with_code_1(self, fake_execute, error):
+        fake_execute.side_effect = error
 
         with pytest.raises(SystemExit, match="1"):
             client_cli.qat_run(["OPENQASM 2.0;"])
+
+
+class TestBatch:
+    @pytest.fixture
+    def programs(self, tmp_path):
+        for name in ("a.qasm", "b.qasm"):
+            (tmp_path / name).write_text("OPENQASM 2.0;")
+        return tmp_path
+
+    def test_several_programs_stream_json_lines(self, programs, fake_client, capsys):
+        fake_client.return_value.execute_task.return_value = {"results": {"00": 1}}
+
+        client_cli.qat_run(
+            [str(programs / "a.qasm"), str(programs / "b.qasm"), "--connections", "2"]
+        )
+
+        out, err = capsys.readouterr()
+        lines = [json.loads(line) for line in out.splitlines()]
+        assert sorted(line["index"] for line in lines) == [0, 1]
+        assert lines[0]["results"] == {"results": {"00": 1}}
+        assert "requests: 2" in err
+
+    def test_pattern_and_output_file(self, programs, fake_client, tmp_path):
+        fake_client.return_value.execute_task.return_value = {"results": {}}
+        output = tmp_path / "results.jsonl"
+
+        client_cli.qat_run([str(programs / "*.qasm"), "--output", str(output)])
+
+        assert len(output.read_text().splitlines()) == 2
+
+    def test_manifest(self, programs, fake_client, capsys):
+        fake_client.return_value.execute_task.return_value = {"results": {}}
+        manifest = programs / "manifest.txt"
+        manifest.write_text("a.qasm\n")
+
+        client_cli.qat_run(["--manifest", str(manifest)])
+
+        [line] = capsys.readouterr().out.splitlines()
+        assert json.loads(line)["program"] == str(programs / "a.qasm")
+
+    def test_failed_program_exits_with_code_1(self, programs, fake_client):
+        fake_client.return_value.execute_task.side_effect = RuntimeError("boom")
+
+        with pytest.raises(SystemExit, match="1"):
+            client_cli.qat_run([str(programs / "*.qasm")])
+
+    def test_unmatched_pattern_rejected(self, programs, fake_client):
+        with pytest.raises(SystemExit):
+            client_cli.qat_run([str(programs / "a.qasm"), str(programs / "*.ll")])
+        fake_client.assert_not_called()
+
+
+class TestConfigJson:
+    def test_default_config(self):
+        assert client_cli._config_json(None) == DEFAULT_CONFIG
+
+    def test_serialized_config_passed_through(self):
+        config = CompilerConfig(repeats=5).to_json()
+        assert client_cli._config_json(config) is config
+
+    def test_config_fields(self):
+        config = CompilerConfig.create_from_json(
+            client_cli._config_json('{"repeats": 7, "passive_reset_time": 1e-4}')
+        )
+        assert config.repeats == 7
+        assert config.passive_reset_time == 1e-4
+
+    @pytest.mark.parametrize("config", ["{", "[1]", '{"shots": 7}'])
+    def test_invalid_config_exits(self, fake_execute, config):
+        with pytest.raises(SystemExit):
+            client_cli.qat_run(["OPENQASM 2.0;", "--config", config])
+        fake_execute.assert_not_called()
+
+
+class TestExecuteProgram:
+    def test_sends_legacy_program_tuple(self):
+        context = zmq.Context()
+        server = context.socket(zmq.REP)
+        port = server.bind_to_random_port("tcp://127.0.0.1")
+        try:
+
+            def _reply():
+                request = server.recv_pyobj()
+                server.send_pyobj({"results": {"00": 1}, "request": request})
+
+            replier = threading.Thread(target=_reply)
+            replier.start()
+            reply = client_cli._execute_program(
+                "127.0.0.1", port, "OPENQASM 2.0;", DEFAULT_CONFIG, timeout=5
+            )
+            replier.join()
+        finally:
+            server.close(linger=0)
+            context.term()
+
+        assert reply["results"] == {"00": 1}
+        assert reply["request"] == ("program", "OPENQASM 2.0;", DEFAULT_CONFIG)
+
+    def test_no_reply_times_out(self):
+        context = zmq.Context()
+        server = context.socket(zmq.ROUTER)
+        port = server.bind_to_random_port("tcp://127.0.0.1")
+        try:
+            with pytest.raises(TimeoutError):
+                client_cli._execute_program(
+                    "127.0.0.1", port, "OPENQASM 2.0;", DEFAULT_CONFIG, timeout=0.1
+                )
+        finally:
+            server.close(linger=0)
+            context.term()
+
+
+class TestStartup:
+    """``qat_comexe`` must not wait for QAT to import before sending a program."""
+
+    @staticmethod
+    def _run(code):
+        result = subprocess.run(  # noqa: S603 - runs this interpreter
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        return result.stdout.strip()
+
+    def test_qat_not_imported(self):
+        code = (
+            "import sys, qat_rpc.zmq.client_cli; "
+            "print(sorted({m.split('.')[0] for m in sys.modules} & {'qat', 'pydantic'}))"
+        )
+        assert self._run(code) == "[]"
+
+    def test_qat_not_imported_before_sending(self):
+        code = (
+            "import sys\n"
+            "from qat_rpc.zmq import client_cli\n"
+            "client_cli._execute_program = lambda *_: print('qat' in sys.modules)\n"
+            "client_cli.qat_run(['OPENQASM 2.0;', '--config', '{\"repeats\": 10}'])\n"
+        )
+        assert self._run(code).splitlines()[0] == "False"
@@ -0,0 +1,192 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Unit tests for the open-loop load generator."""
+
+import json
+import random
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from qat_rpc.zmq import loadgen
+from qat_rpc.zmq.loadgen import (
+    LoadGenerator,
+    Sample,
+    arrival_times,
+    parse_mix,
+    percentile,
+    summarize,
+)
+
+
+class TestParseMix:
+    def test_weights(self):
+        assert parse_mix("program=1, metadata=4") == {"program": 1.0, "metadata": 4.0}
+
+    def test_weight_defaults_to_one(self):
+        assert parse_mix("compile") == {"compile": 1.0}
+
+    @pytest.mark.parametrize(
+        ("text", "match"),
+        [
+            ("upload=1", "Unknown request kind"),
+            ("program=x", "Invalid weight"),
+            ("program=-1", "must not be negative"),
+            ("program=0", "no positive weights"),
+        ],
+    )
+    def test_rejects(self, text, match):
+        with pytest.raises(ValueError, match=match):
+            parse_mix(text)
+
+
+class TestArrivalTimes:
+    def test_uniform_arrivals_are_evenly_spaced(self):
+        assert arrival_times(4, 1, poisson=False) == [0.0, 0.25, 0.5, 0.75]
+
+    def test_poisson_arrivals_average_the_rate(self):
+        times = arrival_times(100, 50, rng=random.Random(1))  # noqa: S311
+        assert times == sorted(times)
+        assert all(0 <= t < 50 for t in times)
+        assert len(times) == pytest.approx(5000, rel=0.05)
+
+    def test_rejects_non_positive_rate(self):
+        with pytest.raises(ValueError, match="rate must be positive"):
+            arrival_times(0, 1)
+
+
+class TestSummary:
+    def test_percentile_by_nearest_rank(self):
+        ordered = [float(i) for i in range(1, 101)]
+        assert percentile(ordered, 50) == 50
+        assert percentile(ordered, 99) == 99
+        assert percentile(ordered, 99.9) == 100
+        assert percentile([1.0], 50) == 1
+
+    def test_summarize(self):
+        samples = [
+            Sample("program", 0.1),
+            Sample("program", 0.3, "TimeoutError"),
+            Sample("metadata", 0.2),
+            Sample("metadata", 0.4, "server_error"),
+        ]
+
+        report = summarize(samples, elapsed=2.0)
+
+        assert report["requests"] == 4
+        assert report["throughput"] == 2.0
+        assert report["errors"] == 2
+        assert report["error_rate"] == 0.5
+        assert report["errors_by_type"] == {"TimeoutError": 1, "server_error": 1}
+        assert report["latency"]["p50"] == 0.2
+        assert report["latency"]["max"] == 0.4
+        assert report["by_kind"]["program"]["errors"] == 1
+        assert report["by_kind"]["metadata"]["latency"]["p99"] == 0.4
+        assert json.loads(json.dumps(report)) == report
+
+    def test_format_report(self):
+        report = summarize([Sample("program", 0.01)], elapsed=1.0)
+        text = loadgen.format_report(report)
+        assert "requests: 1 in 1.0s" in text
+        assert "program" in text
+
+
+def _client(reply=None, delay=0.0):
+    client = MagicMock()
+
+    def respond(*_args, **_kwargs):
+        time.sleep(delay)
+        return reply if reply is not None else {"results": {}}
+
+    for method in ("execute_task", "compile_program", *loadgen._METADATA):
+        getattr(client, method).side_effect = respond
+    return client
+
+
+class TestLoadGenerator:
+    def test_sends_mix_over_connections(self):
+        clients = []
+
+        def factory():
+            clients.append(_client())
+            return clients[-1]
+
+        generator = LoadGenerator(factory, parse_mix("program,metadata"), connections=3)
+        report = generator.run(rate=200, duration=0.25, poisson=False, seed=0)
+
+        assert len(clients) == 3
+        assert report["requests"] == 50
+        assert report["errors"] == 0
+        assert set(report["by_kind"]) == {"program", "metadata"}
+        assert all(client.close.called for client in clients)
+        metadata_calls = sum(
+            getattr(client, method).call_count
+            for client in clients
+            for method in loadgen._METADATA
+        )
+        assert metadata_calls == report["by_kind"]["metadata"]["requests"]
+
+    def test_latency_includes_time_queued_behind_busy_connections(self):
+        generator = LoadGenerator(
+            lambda: _client(delay=0.05), parse_mix("metadata"), connections=1
+        )
+        # Ten requests in 0.1s for one connection taking 0.05s each
+        report = generator.run(rate=100, duration=0.1, poisson=False)
+
+        assert report["latency"]["max"] >= 0.4
+
+    def test_errors_counted_and_failed_client_replaced(self):
+        lock = threading.Lock()
+        clients = []
+
+        def factory():
+            with lock:
+                client = _client()
+                if not clients:
+                    client.api_version.side_effect = TimeoutError
+                clients.append(client)
+                return client
+
+        generator = LoadGenerator(factory, parse_mix("metadata"), connections=1)
+        report = generator.run(rate=100, duration=0.05, poisson=False)
+
+        assert report["errors_by_type"] == {"TimeoutError": 1}
+        assert len(clients) == 2
+        assert clients[0].close.called
+
+    def test_server_errors_counted(self):
+        generator = LoadGenerator(
+            lambda: _client(reply={"Exception": "boom"}), parse_mix("compile"), 1
+        )
+        report = generator.run(rate=100, duration=0.03, poisson=False)
+        assert report["errors_by_type"] == {"server_error": 3}
+
+    def test_rejects_no_connections(self):
+        with pytest.raises(ValueError, match="connections"):
+            LoadGenerator(MagicMock, parse_mix("program"), connections=0)
+
+
+class TestMain:
+    def test_prints_report_and_writes_json(self, monkeypatch, tmp_path, capsys):
+        fake_client = MagicMock(side_effect=lambda **_: _client())
+        monkeypatch.setattr(loadgen, "ZMQClient", fake_client)
+        output = tmp_path / "report.json"
+
+        loadgen.main(
+            [
+                *("--rate", "100", "--duration", "0.05", "--connections", "2"),
+                *("--arrivals", "uniform", "--json", str(output)),
+            ]
+        )
+
+        assert "requests: 5" in capsys.readouterr().out
+        assert json.loads(output.read_text())["target_rate"] == 100
+        fake_client.assert_called_with(
+            client_ip="127.0.0.1", client_port=5556, timeout=30.0
+        )
+
+    def test_rejects_bad_mix(self):
+        with pytest.raises(SystemExit):
+            loadgen.main(["--mix", "upload=1"])
@@ -0,0 +1,93 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Unit tests for replaying captured traffic."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from qat_rpc.models import CouplingsRequest, VersionRequest
+from qat_rpc.zmq import replay
+from qat_rpc.zmq.capture import CaptureRecord, TrafficRecorder
+from qat_rpc.zmq.wire import encode_request
+
+
+def _record(timestamp, request=None, elapsed=0.01, failed=False):
+    request = request or VersionRequest()
+    return CaptureRecord(
+        timestamp, type(request).__name__, encode_request(request), elapsed, failed
+    )
+
+
+class TestReplaySchedule:
+    def test_original_pace(self):
+        schedule = replay.replay_schedule([_record(100.0), _record(100.5), _record(102.0)])
+        assert [scheduled.offset for scheduled in schedule] == [0.0, 0.5, 2.0]
+        assert {scheduled.kind for scheduled in schedule} == {"VersionRequest"}
+
+    def test_scaled_pace(self):
+        schedule = replay.replay_schedule([_record(100.0), _record(102.0)], speed=4)
+        assert [scheduled.offset for scheduled in schedule] == [0.0, 0.5]
+
+    def test_max_speed_sends_at_once(self):
+        schedule = replay.replay_schedule(
+            [_record(100.0), _record(102.0)], speed=replay.MAX_SPEED
+        )
+        assert [scheduled.offset for scheduled in schedule] == [0.0, 0.0]
+
+    def test_sends_captured_request(self):
+        [scheduled] = replay.replay_schedule([_record(0.0, CouplingsRequest())])
+        client = MagicMock()
+
+        scheduled.send(client)
+
+        client.send_request.assert_called_once_with(CouplingsRequest())
+
+    def test_rejects_negative_speed(self):
+        with pytest.raises(ValueError, match="speed"):
+            replay.replay_schedule([_record(0.0)], speed=-1)
+
+
+class TestReplay:
+    def test_reports_replayed_and_captured_latencies(self):
+        client = MagicMock()
+        client.send_request.return_value = {"qat_rpc_version": "1"}
+        records = [
+            _record(1.0, elapsed=0.02),
+            _record(0.0, CouplingsRequest(), elapsed=0.04, failed=True),
+        ]
+
+        report = replay.replay(lambda: client, records, speed=100, connections=2)
+
+        assert report["replayed"]["requests"] == 2
+        assert report["replayed"]["errors"] == 0
+        assert report["captured"]["errors"] == 1
+        assert report["captured"]["by_kind"]["VersionRequest"]["latency"]["p99"] == 0.02
+        assert report["captured"]["elapsed"] == pytest.approx(1.02)
+        # Sent in capture order
+        assert client.send_request.call_args_list[0].args == (CouplingsRequest(),)
+        assert "VersionRequest" in replay.format_comparison(report)
+
+
+class TestMain:
+    def test_replays_capture_file(self, monkeypatch, tmp_path, capsys):
+        client = MagicMock()
+        client.send_request.return_value = {"qat_rpc_version": "1"}
+        monkeypatch.setattr(replay, "ZMQClient", MagicMock(return_value=client))
+        capture = tmp_path / "capture.bin"
+        recorder = TrafficRecorder(capture)
+        recorder.record(VersionRequest(), 0.0, 0.01, False, [b"reply"])
+        recorder.close()
+        output = tmp_path / "report.json"
+
+        replay.main([str(capture), "--max-speed", "--json", str(output)])
+
+        assert "captured p50" in capsys.readouterr().out
+        report = json.loads(output.read_text())
+        assert report["speed"] == replay.MAX_SPEED
+        assert report["replayed"]["requests"] == 1
+
+    def test_rejects_missing_capture(self, tmp_path):
+        with pytest.raises(SystemExit):
+            replay.main([str(tmp_path / "missing.bin")])
@@ -2,27 +2,71 @@
 # Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
 """Unit tests for ZMQ server static and pure functions."""
 
-from signal import SIGINT, SIGTERM, getsignal
+import json
+import os
+import pickle
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from signal import SIGHUP, SIGINT, SIGTERM, SIGUSR1, getsignal
 from unittest.mock import MagicMock
 
+import numpy as np
 import pytest
 from compiler_config.config import CompilerConfig
-
+from qat.core.metrics_base import MetricsManager, MetricsType
+
+import qat_rpc.zmq.server as server_module
+from qat_rpc.config_presets import ConfigNotFoundError
+from qat_rpc.memory import MemorySample
+from qat_rpc.metrics import (
+    IncrementMutableOutcome,
+    LabelledTimingMutableOutcome,
+    LabelledValueMutableOutcome,
+    MetricExporter,
+    NullReceiverBackend,
+    ValueMutableOutcome,
+)
 from qat_rpc.models import (
+    CompiledProgram,
     CompileRequest,
     CouplingsRequest,
     ExecuteRequest,
+    HelloRequest,
     ProgramRequest,
     QpuInfoRequest,
     QubitInfoRequest,
+    ReadoutArray,
+    ResourceUsage,
     Results,
     VersionRequest,
 )
+from qat_rpc.package_store import PackageNotFoundError
+from qat_rpc.profiling import Profiler
+from qat_rpc.request_log import RequestLogger
+from qat_rpc.simulation import Simulation
+from qat_rpc.tracing import InMemorySpanExporter, Tracer
+from qat_rpc.zmq.capture import TrafficRecorder, read_capture
 from qat_rpc.zmq.server import (
+    UNLIMITED_MESSAGE_SIZE,
     GracefulKill,
+    HardwareReloadTrigger,
+    MemoryWatchdog,
+    ProfilingTrigger,
     ZMQServer,
     resolve_qat_config_path,
+    validate_fraction,
     validate_port,
+    validate_positive_float,
+    validate_positive_int,
+)
+from qat_rpc.zmq.wire import (
+    COMPACT_HEADER,
+    PROTOCOL_VERSION,
+    REQUEST_ID_HEADER,
+    encode_request,
+    hello_message,
 )
 
 
@@ -60,6 +104,24 @@ class TestConvertLegacyMessage:
         assert msg.compile_pipeline is None
         assert msg.execute_pipeline is None
 
+    def test_hello(self):
+        msg = ZMQServer._convert_legacy_message(
+            ("hello", 1, {"codecs": ["compact"], "future_field": True})
+        )
+        assert msg == HelloRequest(protocol_version=1, codecs=("compact",))
+
+    def test_repeated_config_gets_private_copies(self):
+        """Parsing is memoized, but QAT may modify each message's config."""
+        config = CompilerConfig()
+        config.repeats = 77
+        raw = ("program", "OPENQASM 2.0;", config.to_json())
+
+        first = ZMQServer._convert_legacy_message(raw)
+        second = ZMQServer._convert_legacy_message(raw)
+
+        assert first.config is not second.config
+        assert first.config.repeats == second.config.repeats == 77
+
     @pytest.mark.parametrize(
         ("raw", "expected_cls"),
         [
@@ -104,6 +166,414 @@ class TestSerializeResponse:
         assert isinstance(result, dict)
         resp.model_dump.assert_called_once()
 
+    def test_results_match_model_dump(self):
+        """Copy-free serialization is indistinguishable on the wire."""
+        metrics = MetricsManager()
+        metrics.record_metric(MetricsType.OptimizedInstructionCount, 12)
+        resp = Results(results={"c": {"00": 60, "11": 40}}, execution_metrics=metrics)
+
+        result = ZMQServer._serialize_response(resp)
+
+        expected = resp.model_dump(exclude={"diagnostics"})
+        assert result == expected
+        assert list(result) == list(expected)
+
+    def test_results_are_not_copied(self):
+        resp = Results(results={"c": {"00": 100}}, execution_metrics=MetricsManager())
+        assert ZMQServer._serialize_response(resp)["results"] is resp.results
+
+    @pytest.mark.parametrize(
+        "resp",
+        [
+            Results(results={}, execution_metrics=MetricsManager()),
+            CompiledProgram(package="pkg", compilation_metrics=MetricsManager()),
+        ],
+    )
+    def test_unreported_diagnostics_left_off_the_wire(self, resp):
+        assert "diagnostics" not in ZMQServer._serialize_response(resp)
+
+    def test_reported_diagnostics_serialized(self):
+        usage = ResourceUsage(wall_time=0.5, cpu_time=0.25, peak_memory=1024)
+        resp = Results(results={}, execution_metrics=MetricsManager(), diagnostics=usage)
+
+        result = ZMQServer._serialize_response(resp)
+
+        assert result["diagnostics"] == {
+            "wall_time": 0.5,
+            "cpu_time": 0.25,
+            "peak_memory": 1024,
+        }
+
+
+class _LatencyBackend(NullReceiverBackend):
+    def __init__(self):
+        super().__init__()
+        self.requests: list[tuple[dict[str, str], float]] = []
+        self.phases: list[dict[str, str]] = []
+        self.dispatch_waits: list[dict[str, str]] = []
+        self.executed: list[float] = []
+        self.sizes: list[tuple[str, dict[str, str], float]] = []
+        self.levels: list[tuple[str, float]] = []
+
+    def request_bytes(self, outcome: LabelledValueMutableOutcome) -> None:
+        self.sizes.append(("request", outcome.labels, float(outcome)))
+
+    def response_bytes(self, outcome: LabelledValueMutableOutcome) -> None:
+        self.sizes.append(("response", outcome.labels, float(outcome)))
+
+    def requests_in_flight(self, outcome: ValueMutableOutcome) -> None:
+        self.levels.append(("in_flight", float(outcome)))
+
+    def requests_queued(self, outcome: ValueMutableOutcome) -> None:
+        self.levels.append(("queued", float(outcome)))
+
+    def executed_messages(self, outcome: IncrementMutableOutcome) -> None:
+        self.executed.append(float(outcome))
+
+    def request_duration(self, outcome: LabelledTimingMutableOutcome) -> None:
+        self.requests.append((outcome.labels, float(outcome)))
+
+    def request_phase_duration(self, outcome: LabelledTimingMutableOutcome) -> None:
+        self.phases.append(outcome.labels)
+
+    def request_dispatch_wait(self, outcome: LabelledTimingMutableOutcome) -> None:
+        self.dispatch_waits.append(outcome.labels)
+
+
+@pytest.fixture
+def replying_server():
+    server = ZMQServer.__new__(ZMQServer)
+    server._handler = MagicMock()
+    server._completed = queue.SimpleQueue()
+    server._send_multipart = MagicMock()
+    server._tracer = Tracer()
+    server._profiler = Profiler()
+    server._recorder = TrafficRecorder()
+    server._in_flight = 0
+    return server
+
+
+class TestReplyCompleted:
+    def test_missing_package_reply_names_digest(self, replying_server):
+        server = replying_server
+        future = Future()
+        future.set_exception(PackageNotFoundError("abc"))
+        server._completed.put(([b"id", b""], None, None, None, 0.0, future))
+
+        server._reply_completed()
+
+        frames = server._send_multipart.call_args.args[0]
+        reply = pickle.loads(frames[-1])  # noqa: S301
+        assert reply["package_not_found"] == "abc"
+        assert "PackageNotFoundError" in reply["Exception"]
+
+    def test_missing_config_reply_names_preset(self, replying_server):
+        server = replying_server
+        future = Future()
+        future.set_exception(ConfigNotFoundError("fast"))
+        server._completed.put(([b"id", b""], None, None, None, 0.0, future))
+
+        server._reply_completed()
+
+        frames = server._send_multipart.call_args.args[0]
+        reply = pickle.loads(frames[-1])  # noqa: S301
+        assert reply["config_not_found"] == "fast"
+
+
+class TestLatencyMetrics:
+    @pytest.mark.parametrize(
+        ("msg", "labels"),
+        [
+            (
+                ProgramRequest(program="p", config=CompilerConfig(), execute_pipeline="x"),
+                {"request_type": "ProgramRequest", "pipeline": "x"},
+            ),
+            (
+                CompileRequest(program="p", config=CompilerConfig()),
+                {"request_type": "CompileRequest", "pipeline": "default"},
+            ),
+            (VersionRequest(), {"request_type": "VersionRequest", "pipeline": ""}),
+            (None, {"request_type": "invalid", "pipeline": ""}),
+        ],
+    )
+    def test_request_labels(self, msg, labels):
+        assert ZMQServer._request_labels(msg) == labels
+
+    def test_reply_records_serialize_phase_and_request_duration(self, replying_server):
+        backend = _LatencyBackend()
+        replying_server._handler.metric = MetricExporter(backend)
+        future = Future()
+        future.set_result({"qat_rpc_version": "1"})
+        received = time.perf_counter()
+        replying_server._completed.put(
+            ([b"id", b""], None, VersionRequest(), None, received, future)
+        )
+
+        replying_server._reply_completed()
+
+        assert backend.phases == [{"phase": "serialize", "pipeline": ""}]
+        [(labels, seconds)] = backend.requests
+        assert labels == {"request_type": "VersionRequest", "pipeline": ""}
+        assert 0.0 < seconds < time.perf_counter() - received + 1e-6
+
+    def test_failed_request_duration_recorded(self, replying_server):
+        backend = _LatencyBackend()
+        replying_server._handler.metric = MetricExporter(backend)
+        future = Future()
+        future.set_exception(RuntimeError("boom"))
+        replying_server._completed.put(([b"id", b""], None, None, None, 0.0, future))
+
+        replying_server._reply_completed()
+
+        assert backend.phases == []
+        assert backend.requests[0][0] == {"request_type": "invalid", "pipeline": ""}
+
+    def test_batched_counters_reported_on_flush(self, replying_server):
+        backend = _LatencyBackend()
+        replying_server._handler.metric = MetricExporter(backend, batched=True)
+        for _ in range(2):
+            future = Future()
+            future.set_result({"qat_rpc_version": "1"})
+            replying_server._completed.put(
+                ([b"id", b""], None, VersionRequest(), None, time.perf_counter(), future)
+            )
+
+        replying_server._reply_completed()
+        assert backend.executed == []
+        assert len(backend.requests) == 2
+
+        replying_server._handler.metric.flush()
+        assert backend.executed == [2.0]
+
+
+class TestSaturationMetrics:
+    @pytest.fixture
+    def server(self, replying_server):
+        replying_server._handler.queued = 3
+        replying_server._wakeup_read, replying_server._wakeup_write = os.pipe()
+        future = Future()
+        future.set_result({"qat_rpc_version": "1"})
+        replying_server._handler.submit.return_value = future
+        yield replying_server
+        os.close(replying_server._wakeup_read)
+        os.close(replying_server._wakeup_write)
+
+    def test_request_and_response_sizes_by_type(self, server):
+        backend = _LatencyBackend()
+        server._handler.metric = MetricExporter(backend)
+        payload = encode_request(VersionRequest())
+
+        server._dispatch([b"id", b"", COMPACT_HEADER, payload])
+        server._reply_completed()
+
+        reply = server._send_multipart.call_args.args[0][2:]
+        labels = {"request_type": "VersionRequest"}
+        assert backend.sizes == [
+            ("request", labels, len(COMPACT_HEADER) + len(payload)),
+            ("response", labels, sum(len(frame) for frame in reply)),
+        ]
+
+    def test_in_flight_counts_until_reply(self, server):
+        backend = _LatencyBackend()
+        server._handler.metric = MetricExporter(backend)
+
+        server._dispatch([b"id", b"", pickle.dumps(("version",))])
+        server._report_saturation()
+        server._reply_completed()
+        server._report_saturation()
+
+        assert backend.levels == [
+            ("in_flight", 1.0),
+            ("queued", 3.0),
+            ("in_flight", 0.0),
+            ("queued", 3.0),
+        ]
+
+
+class TestHello:
+    @pytest.fixture
+    def server(self):
+        server = ZMQServer.__new__(ZMQServer)
+        server._handler = MagicMock()
+        server._completed = queue.SimpleQueue()
+        server._max_message_size = UNLIMITED_MESSAGE_SIZE
+        server._tracer = Tracer()
+        server._profiler = Profiler()
+        server._in_flight = 0
+        server._wakeup_read, server._wakeup_write = os.pipe()
+        yield server
+        os.close(server._wakeup_read)
+        os.close(server._wakeup_write)
+
+    def test_capabilities(self, server):
+        capabilities = server.capabilities()
+
+        assert capabilities["protocol_version"] == PROTOCOL_VERSION
+        assert capabilities["codecs"][0] == "compact"
+        assert capabilities["max_message_size"] is None
+
+    def test_capabilities_advertise_message_limit(self, server):
+        server._max_message_size = 1024
+        assert server.capabilities()["max_message_size"] == 1024
+
+    def test_hello_answered_without_handler(self, server):
+        backend = _LatencyBackend()
+        server._handler.metric = MetricExporter(backend)
+        hello = HelloRequest(protocol_version=PROTOCOL_VERSION)
+
+        server._dispatch([b"id", b"", pickle.dumps(hello_message(hello))])
+
+        *_, future = server._completed.get_nowait()
+        assert future.result() == server.capabilities()
+        server._handler.submit.assert_not_called()
+        assert backend.dispatch_waits == [{"request_type": "HelloRequest"}]
+
+
+class TestTracing:
+    @pytest.fixture
+    def exporter(self):
+        return InMemorySpanExporter()
+
+    @pytest.fixture
+    def server(self, replying_server, exporter):
+        replying_server._tracer = Tracer(exporter)
+        replying_server._wakeup_read, replying_server._wakeup_write = os.pipe()
+        future = Future()
+        future.set_result({"qat_rpc_version": "1"})
+        replying_server._handler.submit.return_value = future
+        yield replying_server
+        os.close(replying_server._wakeup_read)
+        os.close(replying_server._wakeup_write)
+
+    def test_spans_tagged_with_client_request_id(self, server, exporter):
+        spans = exporter.spans
+        body = [COMPACT_HEADER, encode_request(VersionRequest())]
+
+        server._dispatch([b"id", b"", REQUEST_ID_HEADER, b"abc123", *body])
+        server._reply_completed()
+
+        assert server._handler.submit.call_args.args == (VersionRequest(), "abc123")
+        assert [span.name for span in spans] == [
+            "receive",
+            "decode",
+            "serialize",
+            "send",
+            "request",
+        ]
+        assert {span.request_id for span in spans} == {"abc123"}
+        assert spans[-1].attributes == {"request_type": "VersionRequest", "pipeline": ""}
+
+    def test_legacy_request_gets_generated_id(self, server, exporter):
+        spans = exporter.spans
+        server._dispatch([b"id", b"", pickle.dumps(("version",))])
+
+        names = [span.name for span in spans]
+        assert names == ["receive", "convert_legacy", "decode"]
+        request_id = server._handler.submit.call_args.args[1]
+        assert len(request_id) == 16
+        assert {span.request_id for span in spans} == {request_id}
+
+    def test_disabled_tracer_sends_no_id(self, replying_server):
+        replying_server._wakeup_read, replying_server._wakeup_write = os.pipe()
+        try:
+            replying_server._dispatch([b"id", b"", pickle.dumps(("version",))])
+        finally:
+            os.close(replying_server._wakeup_read)
+            os.close(replying_server._wakeup_write)
+
+        assert replying_server._handler.submit.call_args.args[1] is None
+
+
+class TestProfiling:
+    @pytest.fixture
+    def server(self, replying_server, tmp_path):
+        replying_server._profiler = Profiler(tmp_path, slow_threshold=1e-9)
+        replying_server._handler.request_log = RequestLogger()
+        replying_server._wakeup_read, replying_server._wakeup_write = os.pipe()
+        future = Future()
+        future.set_result({"qat_rpc_version": "1"})
+        replying_server._handler.submit.return_value = future
+        yield replying_server
+        os.close(replying_server._wakeup_read)
+        os.close(replying_server._wakeup_write)
+
+    def test_slow_request_details_saved(self, server, tmp_path):
+        request = CompileRequest(program="OPENQASM 2.0;", config=CompilerConfig())
+
+        server._dispatch([b"id", b"", COMPACT_HEADER, encode_request(request)])
+        server._reply_completed()
+
+        request_id = server._handler.submit.call_args.args[1]
+        [path] = tmp_path.glob(f"slow-*-{request_id}.json")
+        details = json.loads(path.read_text())
+        assert details["type"] == "CompileRequest"
+        assert details["size"] == len("OPENQASM 2.0;")
+        assert details["elapsed"] > 0.0
+
+    def test_toggle_deferred_to_server_loop(self, server):
+        server._profile_toggle_requested = False
+
+        server.request_profile_toggle()
+
+        assert server._profile_toggle_requested
+        assert server._profiler.active is None
+
+
+class TestCapture:
+    @pytest.fixture
+    def server(self, replying_server, tmp_path):
+        replying_server._recorder = TrafficRecorder(
+            tmp_path / "capture.bin", record_responses=True
+        )
+        replying_server._wakeup_read, replying_server._wakeup_write = os.pipe()
+        yield replying_server
+        os.close(replying_server._wakeup_read)
+        os.close(replying_server._wakeup_write)
+
+    def _reply(self, server, request, result):
+        future = Future()
+        if isinstance(result, Exception):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+        server._handler.submit.return_value = future
+        server._dispatch([b"id", b"", COMPACT_HEADER, encode_request(request)])
+        server._reply_completed()
+
+    def test_replied_requests_captured(self, server, tmp_path):
+        request = CompileRequest(program="OPENQASM 2.0;", config=CompilerConfig())
+
+        self._reply(server, VersionRequest(), {"qat_rpc_version": "1"})
+        self._reply(server, request, ValueError("bad program"))
+        server._recorder.close()
+
+        version, compile_ = read_capture(tmp_path / "capture.bin")
+        assert version.request() == VersionRequest()
+        assert not version.failed
+        assert version.response == [pickle.dumps({"qat_rpc_version": "1"})]
+        assert compile_.request_type == "CompileRequest"
+        assert compile_.request().program == "OPENQASM 2.0;"
+        assert compile_.failed
+        assert compile_.elapsed > 0.0
+
+
+class TestEncodeReply:
+    def test_plain_reply_is_one_frame(self):
+        frames = ZMQServer._encode_reply({"results": {"c": {"00": 100}}})
+        assert len(frames) == 1
+        assert pickle.loads(frames[0]) == {"results": {"c": {"00": 100}}}  # noqa: S301
+
+    def test_packed_results_send_arrays_out_of_band(self):
+        readouts = np.arange(100_000, dtype=np.int8) % 2
+        reply = {"results": {"c": ReadoutArray(values=readouts)}}
+
+        payload, *buffers = ZMQServer._encode_reply(reply)
+
+        assert buffers
+        assert len(payload) < 1_000
+        decoded = pickle.loads(payload, buffers=buffers)  # noqa: S301
+        assert np.array_equal(decoded["results"]["c"].values, readouts)
+
 
 class TestValidatePort:
     def test_none_returns_default(self):
@@ -138,6 +608,33 @@ class TestValidatePort:
         assert validate_port("8080", "test", 5556, excluded_ports={9090, 7070}) == 8080
 
 
+class TestValidatePositiveInt:
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [(None, 4), ("8", 8), ("1", 1), ("0", 4), ("-2", 4), ("abc", 4)],
+    )
+    def test_positive_int_cases(self, value, expected):
+        assert validate_positive_int(value, "test", 4) == expected
+
+
+class TestValidateFraction:
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [(None, 0.5), ("0.1", 0.1), ("0", 0.0), ("1", 1.0), ("1.5", 0.5), ("abc", 0.5)],
+    )
+    def test_fraction_cases(self, value, expected):
+        assert validate_fraction(value, "test", 0.5) == expected
+
+
+class TestValidatePositiveFloat:
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [(None, None), ("0.5", 0.5), ("2", 2.0), ("0", None), ("-1", None), ("x", None)],
+    )
+    def test_positive_float_cases(self, value, expected):
+        assert validate_positive_float(value, "test", None) == expected
+
+
 class TestResolveQatConfigPath:
     def test_none_returns_none(self):
         assert resolve_qat_config_path(None) is None
@@ -176,16 +673,199 @@ class TestGracefulKill:
         assert getsignal(SIGTERM) == original_sigterm_handler
 
 
+class TestHardwareReloadTrigger:
+    def test_sighup_requests_reload(self):
+        server = MagicMock(spec=ZMQServer)
+        trigger = HardwareReloadTrigger(server)
+
+        trigger._handle_signal(SIGHUP, None)
+
+        server.request_hardware_reload.assert_called_once()
+
+    def test_context_manager_installs_and_restores_handler(self):
+        server = MagicMock(spec=ZMQServer)
+        original_sighup_handler = getsignal(SIGHUP)
+
+        with HardwareReloadTrigger(server) as trigger:
+            assert getsignal(SIGHUP) == trigger._handle_signal
+
+        assert getsignal(SIGHUP) == original_sighup_handler
+
+    def test_file_change_requests_reload(self, tmp_path):
+        calibration = tmp_path / "calibration.json"
+        calibration.write_text("{}")
+        server = MagicMock(spec=ZMQServer)
+
+        with HardwareReloadTrigger(server, calibration, poll_interval=0.01):
+            stat = calibration.stat()
+            os.utime(calibration, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            for _ in range(500):
+                if server.request_hardware_reload.called:
+                    break
+                threading.Event().wait(0.01)
+
+        server.request_hardware_reload.assert_called()
+
+    def test_unchanged_file_does_not_request_reload(self, tmp_path):
+        calibration = tmp_path / "calibration.json"
+        calibration.write_text("{}")
+        server = MagicMock(spec=ZMQServer)
+
+        with HardwareReloadTrigger(server, calibration, poll_interval=0.01):
+            threading.Event().wait(0.05)
+
+        server.request_hardware_reload.assert_not_called()
+
+
+class TestProfilingTrigger:
+    def test_sigusr1_requests_toggle(self):
+        server = MagicMock(spec=ZMQServer)
+
+        ProfilingTrigger(server)._handle_signal(SIGUSR1, None)
+
+        server.request_profile_toggle.assert_called_once()
+
+    def test_context_manager_installs_and_restores_handler(self):
+        server = MagicMock(spec=ZMQServer)
+        original_sigusr1_handler = getsignal(SIGUSR1)
+
+        with ProfilingTrigger(server) as trigger:
+            assert getsignal(SIGUSR1) == trigger._handle_signal
+
+        assert getsignal(SIGUSR1) == original_sigusr1_handler
+
+
+class _MemoryBackend(NullReceiverBackend):
+    def __init__(self):
+        super().__init__()
+        self.resident: list[float] = []
+        self.blocks: list[float] = []
+
+    def resident_memory(self, outcome: ValueMutableOutcome) -> None:
+        self.resident.append(float(outcome))
+
+    def python_allocated_blocks(self, outcome: ValueMutableOutcome) -> None:
+        self.blocks.append(float(outcome))
+
+
+class TestMemoryWatchdog:
+    @pytest.fixture
+    def collect(self, monkeypatch):
+        # Collecting here would finalize other tests' leftovers, e.g. ZMQ contexts
+        collect = MagicMock(return_value=0)
+        monkeypatch.setattr(server_module.gc, "collect", collect)
+        return collect
+
+    @pytest.fixture
+    def samples(self, monkeypatch, collect):
+        """Memory samples the watchdog reads, in order; the last one repeats."""
+        samples = []
+
+        def _sample():
+            return samples.pop(0) if len(samples) > 1 else samples[0]
+
+        monkeypatch.setattr(server_module, "sample_memory", _sample)
+        return samples
+
+    def test_publishes_samples_without_a_limit(self, samples):
+        samples.append(MemorySample(resident_bytes=10**12, allocated_blocks=7))
+        backend = _MemoryBackend()
+        server = MagicMock(spec=ZMQServer)
+
+        assert not MemoryWatchdog(server, MetricExporter(backend)).check()
+
+        assert backend.resident == [1e12]
+        assert backend.blocks == [7.0]
+        server.request_restart.assert_not_called()
+
+    def test_over_limit_requests_restart(self, samples):
+        samples.append(MemorySample(resident_bytes=2000, allocated_blocks=7))
+        server = MagicMock(spec=ZMQServer)
+        watchdog = MemoryWatchdog(
+            server, MetricExporter(NullReceiverBackend()), limit_bytes=1000
+        )
+
+        assert watchdog.check()
+
+        server.request_restart.assert_called_once()
+
+    def test_collecting_garbage_can_avoid_a_restart(self, samples, collect):
+        samples.extend(
+            [
+                MemorySample(resident_bytes=2000, allocated_blocks=7),
+                MemorySample(resident_bytes=500, allocated_blocks=3),
+            ]
+        )
+        backend = _MemoryBackend()
+        server = MagicMock(spec=ZMQServer)
+        watchdog = MemoryWatchdog(server, MetricExporter(backend), limit_bytes=1000)
+
+        assert not watchdog.check()
+
+        collect.assert_called_once()
+        assert backend.resident == [2000.0, 500.0]
+        server.request_restart.assert_not_called()
+
+    def test_unreadable_resident_memory_never_restarts(self, samples):
+        samples.append(MemorySample(resident_bytes=None, allocated_blocks=7))
+        backend = _MemoryBackend()
+        server = MagicMock(spec=ZMQServer)
+        watchdog = MemoryWatchdog(server, MetricExporter(backend), limit_bytes=1)
+
+        assert not watchdog.check()
+
+        assert backend.resident == []
+        assert backend.blocks == [7.0]
+
+    def test_watches_until_restart_requested(self, samples):
+        samples.append(MemorySample(resident_bytes=2000, allocated_blocks=7))
+        server = MagicMock(spec=ZMQServer)
+        watchdog = MemoryWatchdog(
+            server,
+            MetricExporter(NullReceiverBackend()),
+            limit_bytes=1000,
+            poll_interval=0.01,
+        )
+
+        with watchdog:
+            for _ in range(500):
+                if server.request_restart.called:
+                    break
+                threading.Event().wait(0.01)
+            assert watchdog._watcher is not None
+            watchdog._watcher.join(timeout=5)
+            assert not watchdog._watcher.is_alive()
+
+        server.request_restart.assert_called_once()
+
+
+class TestRequestRestart:
+    def test_stops_the_server_for_a_restart(self):
+        server = ZMQServer.__new__(ZMQServer)
+        server._handler = MagicMock()
+        server._running = True
+        server._restart_requested = False
+
+        server.request_restart()
+
+        assert server.restart_requested
+        assert not server._running
+
+
 class TestCompileEndpointFeatureFlag:
     @pytest.fixture
     def handler(self):
         """QATServiceHandler with QAT mocked out, compile disabled."""
         from qat_rpc.handler import QATServiceHandler
+        from qat_rpc.request_log import RequestLogger
 
         handler = QATServiceHandler.__new__(QATServiceHandler)
         handler._metric = MagicMock()
+        handler._request_log = RequestLogger()
         handler._qat = MagicMock()
         handler._compile_enabled = False
+        handler._profiler = Profiler()
+        handler._simulation = Simulation()
         return handler
 
     def test_compile_request_blocked_when_disabled(self, handler):
@@ -193,6 +873,12 @@ class TestCompileEndpointFeatureFlag:
         with pytest.raises(NotImplementedError, match="Compile endpoint is disabled"):
             handler.handle(request)
 
+    def test_compile_request_blocked_when_disabled_via_submit(self, handler):
+        request = CompileRequest(program="OPENQASM 2.0;", config=CompilerConfig())
+        future = handler.submit(request)
+        with pytest.raises(NotImplementedError, match="Compile endpoint is disabled"):
+            future.result()
+
     def test_execute_request_allowed_when_compile_disabled(self, handler):
         """ExecuteRequest is not gated by the compile flag."""
         handler.execute = MagicMock(return_value={"results": {}})
@@ -0,0 +1,156 @@
+# SPDX-License-Identifier: BSD-3-Clause
+# Copyright (c) 2023-2026 Oxford Quantum Circuits Ltd
+"""Unit tests for the compact request envelope."""
+
+import pickle
+from typing import get_args
+
+import pytest
+from compiler_config.config import CompilerConfig
+from pydantic import ValidationError
+
+from qat_rpc.models import (
+    CompilePipelinesRequest,
+    CompileRequest,
+    ConfigRef,
+    CouplingsRequest,
+    ExecutePipelinesRequest,
+    ExecuteRequest,
+    HelloRequest,
+    ProfileRequest,
+    ProgramRequest,
+    QpuInfoRequest,
+    QubitInfoRequest,
+    RegisterConfigRequest,
+    ReloadHardwareRequest,
+    Request,
+    VersionRequest,
+)
+from qat_rpc.zmq.wire import (
+    COMPACT_HEADER,
+    REQUEST_ID_HEADER,
+    REQUEST_TAGS,
+    choose_codec,
+    decode_message,
+    decode_request,
+    encode_request,
+    hello_message,
+    split_envelope,
+    split_request_id,
+)
+
+_REQUESTS = [
+    ProgramRequest(
+        program="OPENQASM 2.0;",
+        config=CompilerConfig(),
+        compile_pipeline="compile",
+        execute_pipeline="execute",
+    ),
+    CompileRequest(program=b"\x00bitcode", config=CompilerConfig(), pipeline="p"),
+    ExecuteRequest(package="{}", config=CompilerConfig()),
+    VersionRequest(),
+    CouplingsRequest(pipeline="p"),
+    QubitInfoRequest(),
+    QpuInfoRequest(pipeline="p"),
+    CompilePipelinesRequest(),
+    ExecutePipelinesRequest(),
+    ReloadHardwareRequest(),
+    RegisterConfigRequest(config=CompilerConfig(), name="preset"),
+    ProgramRequest(program="OPENQASM 2.0;", config=ConfigRef(name="preset")),
+    HelloRequest(protocol_version=1, codecs=("compact", "pickle")),
+    ProfileRequest(action="start", kind="memory", duration=5.0),
+]
+
+
+class TestRequestTags:
+    def test_every_request_type_has_a_tag(self):
+        assert set(REQUEST_TAGS) == set(get_args(Request))
+
+    def test_tags_are_unique(self):
+        assert len(set(REQUEST_TAGS.values())) == len(REQUEST_TAGS)
+
+
+class TestEncodeDecode:
+    @pytest.mark.parametrize("request_", _REQUESTS, ids=lambda r: type(r).__name__)
+    def test_round_trip(self, request_):
+        decoded = decode_request(encode_request(request_))
+
+        assert type(decoded) is type(request_)
+        for name in type(request_).model_fields:
+            value = getattr(request_, name)
+            if isinstance(value, CompilerConfig):
+                assert getattr(decoded, name).to_json() == value.to_json()
+            else:
+                assert getattr(decoded, name) == value
+
+    def test_envelope_smaller_than_pickled_model(self):
+        request = VersionRequest()
+        assert len(encode_request(request)) < len(pickle.dumps(request))
+
+    def test_unknown_tag_rejected(self):
+        with pytest.raises(ValueError, match="Unknown request tag"):
+            decode_request(pickle.dumps((999, ())))
+
+    def test_older_clients_may_omit_trailing_fields(self):
+        payload = pickle.dumps((REQUEST_TAGS[CouplingsRequest], ()))
+        assert decode_request(payload) == CouplingsRequest()
+
+    def test_too_many_values_rejected(self):
+        payload = pickle.dumps((REQUEST_TAGS[VersionRequest], ("extra",)))
+        with pytest.raises(ValueError, match="Too many values"):
+            decode_request(payload)
+
+    def test_decoded_fields_are_validated(self):
+        payload = pickle.dumps((REQUEST_TAGS[ProgramRequest], ([1, 2], None)))
+        with pytest.raises(ValidationError):
+            decode_request(payload)
+
+
+class TestHandshake:
+    def test_hello_message_is_builtin_types_only(self):
+        hello = HelloRequest(protocol_version=1, codecs=("compact",), max_message_size=9)
+        tag, version, capabilities = hello_message(hello)
+
+        assert (tag, version) == ("hello", 1)
+        assert capabilities["codecs"] == ("compact",)
+        assert capabilities["max_message_size"] == 9
+        # Unpicklable by servers that do not know the request models
+        assert b"qat_rpc" not in pickle.dumps(hello_message(hello))
+
+    @pytest.mark.parametrize(
+        ("offered", "expected"),
+        [(["pickle", "compact"], "compact"), (["pickle"], "pickle"), ([], "pickle")],
+    )
+    def test_choose_codec(self, offered, expected):
+        assert choose_codec({"codecs": offered}) == expected
+
+    def test_choose_codec_for_older_servers(self):
+        assert choose_codec({}) == "pickle"
+
+
+class TestFrames:
+    def test_split_envelope_at_delimiter(self):
+        assert split_envelope([b"id", b"", b"payload"]) == ([b"id", b""], [b"payload"])
+
+    def test_split_envelope_with_header(self):
+        frames = [b"id", b"", COMPACT_HEADER, b"payload"]
+        assert split_envelope(frames) == ([b"id", b""], [COMPACT_HEADER, b"payload"])
+
+    def test_decode_single_frame_unpickles(self):
+        assert decode_message([pickle.dumps(("version",))]) == ("version",)
+
+    def test_decode_compact_frames(self):
+        body = [COMPACT_HEADER, encode_request(VersionRequest())]
+        assert isinstance(decode_message(body), VersionRequest)
+
+    def test_decode_rejects_unexpected_frames(self):
+        with pytest.raises(ValueError, match="3-frame"):
+            decode_message([b"a", b"b", b"c"])
+
+    def test_split_request_id(self):
+        body = [REQUEST_ID_HEADER, b"abc123", COMPACT_HEADER, b"payload"]
+        assert split_request_id(body) == ("abc123", [COMPACT_HEADER, b"payload"])
+
+    def test_split_request_id_absent(self):
+        body = [COMPACT_HEADER, b"payload"]
+        assert split_request_id(body) == (None, body)